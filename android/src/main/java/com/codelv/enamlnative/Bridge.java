@@ -16,6 +16,7 @@ import android.text.format.Formatter;
 import android.view.KeyEvent;
 import android.view.MotionEvent;
 import android.view.View;
+import android.view.ViewGroup;
 import android.util.Log;
 
 import com.codelv.enamlnative.python.PythonInterpreter;
@@ -31,6 +32,8 @@ import org.msgpack.value.IntegerValue;
 import org.msgpack.value.Value;
 
 import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
 import java.lang.reflect.Array;
 import java.lang.reflect.Constructor;
 import java.lang.reflect.Field;
@@ -43,6 +46,7 @@ import java.lang.reflect.Proxy;
 import java.util.ArrayList;
 import java.util.Arrays;
 import java.util.HashMap;
+import java.util.HashSet;
 import java.util.Map;
 import java.util.List;
 import java.util.concurrent.ConcurrentHashMap;
@@ -62,6 +66,7 @@ public class Bridge implements PythonInterpreter.EventListener {
 
     // Result handling
     public static final int TYPE_REF = 1;
+    public static final int TYPE_ARRAY = 3;
     public static final int IGNORE_RESULT = 0;
 
     // Bridge commands
@@ -71,8 +76,10 @@ public class Bridge implements PythonInterpreter.EventListener {
     public static final String STATIC_METHOD = "sm";
     public static final String FIELD = "f";
     public static final String DELETE = "d";
+    public static final String BULK_DELETE = "bd";
     public static final String RESULT = "r";
     public static final String ERROR = "e";
+    public static final String DEF = "def";
 
     final EnamlActivity mActivity;
 
@@ -97,9 +104,15 @@ public class Bridge implements PythonInterpreter.EventListener {
 
     final HashMap<Class,HashMap<Integer,Object>> mReflectionCache = new HashMap<>();
 
+    // Schema definitions (owner, name) sent by python keyed by bridge id
+    final HashMap<Integer, String[]> mDefinitions = new HashMap<Integer, String[]>();
+
     // Cache for objects
     final ConcurrentHashMap<Integer,Object> mObjectCache = new ConcurrentHashMap<Integer, Object>();
 
+    // Ids of results that returned null, calls pipelined on them are dropped
+    final HashSet<Integer> mNullResults = new HashSet<>();
+
     // Cache for results
     final ConcurrentHashMap<Integer,BridgeFuture<Object>> mResultCache = new ConcurrentHashMap<Integer, BridgeFuture<Object>>();
 
@@ -181,10 +194,9 @@ public class Bridge implements PythonInterpreter.EventListener {
 
         addPacker(new Class[]{int[].class,Integer[].class}, (packer, id, object)->{
             int[] argList = (int[]) object;
-            packer.packArrayHeader(argList.length);
-            for (int v:argList) {
-                packer.packInt(v);
-            }
+            ByteBuffer buf = createTypedArray('i', 4, argList.length);
+            buf.asIntBuffer().put(argList);
+            packTypedArray(packer, buf);
         });
 
         addPacker(new Class[]{long.class, Long.class}, (packer, id, object)->{
@@ -193,10 +205,9 @@ public class Bridge implements PythonInterpreter.EventListener {
 
         addPacker(new Class[]{long[].class, Long[].class}, (packer, id, object)->{
             long[] argList = (long[]) object;
-            packer.packArrayHeader(argList.length);
-            for (long v:argList) {
-                packer.packLong(v);
-            }
+            ByteBuffer buf = createTypedArray('q', 8, argList.length);
+            buf.asLongBuffer().put(argList);
+            packTypedArray(packer, buf);
         });
 
         addPacker(new Class[]{float.class, Float.class}, (packer, id, object)->{
@@ -205,10 +216,9 @@ public class Bridge implements PythonInterpreter.EventListener {
 
         addPacker(new Class[]{float[].class, Float[].class}, (packer, id, object)->{
             float[] argList = (float[]) object;
-            packer.packArrayHeader(argList.length);
-            for (float v:argList) {
-                packer.packFloat(v);
-            }
+            ByteBuffer buf = createTypedArray('f', 4, argList.length);
+            buf.asFloatBuffer().put(argList);
+            packTypedArray(packer, buf);
         });
 
         addPacker(new Class[]{double.class, Double.class}, (packer, id, object)->{
@@ -217,10 +227,9 @@ public class Bridge implements PythonInterpreter.EventListener {
 
         addPacker(new Class[]{double[].class, Double[].class}, (packer, id, object)->{
             double[] argList = (double[]) object;
-            packer.packArrayHeader(argList.length);
-            for (double v:argList) {
-                packer.packDouble(v);
-            }
+            ByteBuffer buf = createTypedArray('d', 8, argList.length);
+            buf.asDoubleBuffer().put(argList);
+            packTypedArray(packer, buf);
         });
 
         addPacker(new Class[]{short.class, Short.class}, (packer, id, object)->{
@@ -229,10 +238,9 @@ public class Bridge implements PythonInterpreter.EventListener {
 
         addPacker(new Class[]{short[].class, Short[].class}, (packer, id, object)->{
             short[] argList = (short[]) object;
-            packer.packArrayHeader(argList.length);
-            for (short v:argList) {
-                packer.packShort(v);
-            }
+            ByteBuffer buf = createTypedArray('h', 2, argList.length);
+            buf.asShortBuffer().put(argList);
+            packTypedArray(packer, buf);
         });
 
         addPacker(new Class[]{byte[].class}, (packer, id, object)->{
@@ -343,10 +351,9 @@ public class Bridge implements PythonInterpreter.EventListener {
             packer.packString("time");
             packer.packLong(event.timestamp);
             packer.packString("data");
-            packer.packArrayHeader(event.values.length);
-            for (float v: event.values) {
-                packer.packFloat(v);
-            }
+            ByteBuffer buf = createTypedArray('f', 4, event.values.length);
+            buf.asFloatBuffer().put(event.values);
+            packTypedArray(packer, buf);
         });
 
         // Unpack Wifi objects
@@ -787,6 +794,8 @@ public class Bridge implements PythonInterpreter.EventListener {
                         if (arg == null) {
                             arg = new UnpackedRef(objId );
                         }
+                    } else if (extType==TYPE_ARRAY) {
+                        arg = unpackTypedArray(ev.getData());
                     }
             }
             return new UnpackedValue(spec, arg);
@@ -822,6 +831,31 @@ public class Bridge implements PythonInterpreter.EventListener {
 
     }
 
+    /**
+     * Save the owner class and name of a constructor, method, or field so events
+     * can reference it using only the cacheId.
+     * @param cacheId
+     * @param owner
+     * @param name
+     */
+    public void defineSchema(int cacheId, String owner, String name) {
+        mDefinitions.put(cacheId, new String[]{owner, name});
+    }
+
+    /**
+     * Lookup the owner class and name of a definition sent by python.
+     * @param cacheId
+     * @return
+     * @throws IOException
+     */
+    public String[] getDefinition(int cacheId) throws IOException {
+        String[] definition = mDefinitions.get(cacheId);
+        if (definition==null) {
+            throw new IOException("No definition exists for id="+cacheId);
+        }
+        return definition;
+    }
+
     /**
      * Create a view with the given id.
      *
@@ -951,6 +985,11 @@ public class Bridge implements PythonInterpreter.EventListener {
         //Log.d(TAG,"Update object  obid="+objId+" method="+method);
         Object obj = mObjectCache.get(objId);
         if (obj==null) {
+            if (mNullResults.contains(objId)) {
+                // Pipelined on a null result, pass the null along
+                onResult(resultId, null);
+                return;
+            }
             mActivity.showErrorMessage(
                     "Error: Null object reference when updating id="+objId+" method="+method);
             return;
@@ -1012,6 +1051,9 @@ public class Bridge implements PythonInterpreter.EventListener {
     public void updateObjectField(int objId, int cacheId, String field, UnpackedValues uv) {
         Object obj = mObjectCache.get(objId);
         if (obj==null) {
+            if (mNullResults.contains(objId)) {
+                return;
+            }
             mActivity.showErrorMessage(
                     "Error: Null object reference when updating id="+objId+" field="+field);
             return;
@@ -1059,6 +1101,7 @@ public class Bridge implements PythonInterpreter.EventListener {
             mObjectCache.remove(objId);
             //obj = null; Will GC handle this??
         }
+        mNullResults.remove(objId);
     }
 
     /**
@@ -1168,7 +1211,10 @@ public class Bridge implements PythonInterpreter.EventListener {
         //mBridgeHandler.post(()-> {
         // Unpacking in the bridge thread messes up maps
         // as some object packing is required to be done on the UI thread
-        if (result!=null && !isPackableResult(result)) {
+        if (result==null) {
+            // Any calls pipelined on this result are dropped
+            mNullResults.add(pythonObjectId);
+        } else if (!isPackableResult(result)) {
             // Store the result with the given ID, the python implementation
             // guarantees that the ID is unique and will not overwrite an existing object
             mObjectCache.put(pythonObjectId, result);
@@ -1437,7 +1483,10 @@ public class Bridge implements PythonInterpreter.EventListener {
                         case CREATE:
                             int objId = unpacker.unpackInt();
                             int cacheId = unpacker.unpackInt();
-                            String objClass = unpacker.unpackString();
+                            // The class name is omitted if it was defined
+                            String objClass = (paramCount==3)?
+                                    getDefinition(cacheId)[1]:
+                                    unpacker.unpackString();
                             int argCount = unpacker.unpackArrayHeader();
                             Value[] args = new Value[argCount];
                             for (int j=0; j<argCount; j++) {
@@ -1459,7 +1508,10 @@ public class Bridge implements PythonInterpreter.EventListener {
                             objId = unpacker.unpackInt();
                             int resultId = unpacker.unpackInt();
                             cacheId = unpacker.unpackInt();
-                            String objMethod = unpacker.unpackString();
+                            // The method name is omitted if it was defined
+                            String objMethod = (paramCount==4)?
+                                    getDefinition(cacheId)[1]:
+                                    unpacker.unpackString();
                             argCount = unpacker.unpackArrayHeader();
                             args = new Value[argCount];
                             for (int j=0; j<argCount; j++) {
@@ -1470,10 +1522,19 @@ public class Bridge implements PythonInterpreter.EventListener {
                             mTaskQueue.add(()->{updateObject(objId, resultId, cacheId, objMethod, uv);});
                             break;
                         case STATIC_METHOD:
-                            objClass = unpacker.unpackString();
-                            resultId = unpacker.unpackInt();
-                            cacheId = unpacker.unpackInt();
-                            objMethod = unpacker.unpackString();
+                            if (paramCount==3) {
+                                // The class and method name were defined
+                                resultId = unpacker.unpackInt();
+                                cacheId = unpacker.unpackInt();
+                                String[] definition = getDefinition(cacheId);
+                                objClass = definition[0];
+                                objMethod = definition[1];
+                            } else {
+                                objClass = unpacker.unpackString();
+                                resultId = unpacker.unpackInt();
+                                cacheId = unpacker.unpackInt();
+                                objMethod = unpacker.unpackString();
+                            }
                             argCount = unpacker.unpackArrayHeader();
                             args = new Value[argCount];
                             for (int j=0; j<argCount; j++) {
@@ -1487,7 +1548,10 @@ public class Bridge implements PythonInterpreter.EventListener {
                         case FIELD:
                             objId = unpacker.unpackInt();
                             cacheId = unpacker.unpackInt();
-                            String objField = unpacker.unpackString();
+                            // The field name is omitted if it was defined
+                            String objField = (paramCount==3)?
+                                    getDefinition(cacheId)[1]:
+                                    unpacker.unpackString();
                             argCount = unpacker.unpackArrayHeader();
                             args = new Value[argCount];
                             for (int j=0; j<argCount; j++) {
@@ -1503,6 +1567,19 @@ public class Bridge implements PythonInterpreter.EventListener {
                             mTaskQueue.add(()->{deleteObject(objId);});
                             break;
 
+                        case BULK_DELETE:
+                            int deleteCount = unpacker.unpackArrayHeader();
+                            final int[] deleteIds = new int[deleteCount];
+                            for (int j=0; j<deleteCount; j++) {
+                                deleteIds[j] = unpacker.unpackInt();
+                            }
+                            mTaskQueue.add(()->{
+                                for (int deleteId: deleteIds) {
+                                    deleteObject(deleteId);
+                                }
+                            });
+                            break;
+
                         case RESULT:
                             objId = unpacker.unpackInt();
                             Value arg = unpacker.unpackValue();
@@ -1513,6 +1590,15 @@ public class Bridge implements PythonInterpreter.EventListener {
                             String errorMessage = unpacker.unpackString();
                             mTaskQueue.add(()->{mActivity.showErrorMessage(errorMessage);});
                             break;
+
+                        case DEF:
+                            // Definitions are used while unpacking so save them now
+                            cacheId = unpacker.unpackInt();
+                            String defOwner = unpacker.unpackString();
+                            String defName = unpacker.unpackString();
+                            unpacker.skipValue(); // Signature is not needed (yet)
+                            defineSchema(cacheId, defOwner, defName);
+                            break;
                     }
                 }
             } catch (IOException e) {
@@ -1525,9 +1611,10 @@ public class Bridge implements PythonInterpreter.EventListener {
                 });
             }
 
-            // Process requested tasks
+            // Process requested tasks and tell python when the next frame starts
             mActivity.runOnUiThread(()->{
                 runUntilCurrent();
+                mActivity.requestFrame();
             });
             if (mActivity.showDebugMessages()) {
                 Log.i(TAG, "processEvents took (" + (System.currentTimeMillis() - start) + " ms) to run");
@@ -1567,6 +1654,118 @@ public class Bridge implements PythonInterpreter.EventListener {
         }, mEventDelay);
     }
 
+    /**
+     * Add several views to a parent with one bridge call. Views are inserted
+     * in order starting at the given index.
+     *
+     * @param parent: ViewGroup to add the views to
+     * @param views: Views to add
+     * @param start: Index of the first view within the parent
+     * @param params: LayoutParams of each view or null to use the defaults
+     */
+    public static void addViews(ViewGroup parent, View[] views, int start,
+                                ViewGroup.LayoutParams[] params) {
+        for (int i=0; i<views.length; i++) {
+            ViewGroup.LayoutParams lp = (params != null && i < params.length)? params[i] : null;
+            if (lp != null) {
+                parent.addView(views[i], start + i, lp);
+            } else {
+                parent.addView(views[i], start + i);
+            }
+        }
+    }
+
+    /**
+     * Move a view of a parent to the given index with one bridge call. The view
+     * keeps its LayoutParams.
+     *
+     * @param parent: ViewGroup containing the view
+     * @param view: View to move
+     * @param index: Index of the view within the parent after the move
+     */
+    public static void moveView(ViewGroup parent, View view, int index) {
+        if (parent.indexOfChild(view) == index) {
+            return;
+        }
+        parent.removeView(view);
+        parent.addView(view, index);
+    }
+
+    /**
+     * Create a buffer for a one dimensional typed array of the given length. The header
+     * is already written so the items can be put using a view of the buffer.
+     *
+     * @param dtype: Typecode of the items (see the python bridge ARRAY_TYPECODES)
+     * @param itemSize: Size of each item in bytes
+     * @param length: Number of items
+     * @return
+     */
+    public static ByteBuffer createTypedArray(char dtype, int itemSize, int length) {
+        ByteBuffer buf = ByteBuffer.allocate(6 + itemSize*length);
+        buf.order(ByteOrder.LITTLE_ENDIAN);
+        buf.put((byte) dtype);
+        buf.put((byte) 1);
+        buf.putInt(length);
+        return buf;
+    }
+
+    /**
+     * Pack a buffer created with createTypedArray as a typed array extension.
+     * @param packer
+     * @param buf
+     * @throws IOException
+     */
+    public static void packTypedArray(MessageBufferPacker packer, ByteBuffer buf) throws IOException {
+        byte[] data = buf.array();
+        packer.packExtensionTypeHeader((byte) TYPE_ARRAY, data.length);
+        packer.addPayload(data);
+    }
+
+    /**
+     * Unpack a typed array extension into a flat primitive array.
+     * @param data
+     * @return
+     */
+    public static Object unpackTypedArray(byte[] data) {
+        ByteBuffer buf = ByteBuffer.wrap(data);
+        buf.order(ByteOrder.LITTLE_ENDIAN);
+        char dtype = (char) buf.get();
+        int ndim = buf.get();
+        int length = 1;
+        for (int i=0; i<ndim; i++) {
+            length *= buf.getInt();
+        }
+        switch (dtype) {
+            case 'f':
+                float[] floats = new float[length];
+                buf.asFloatBuffer().get(floats);
+                return floats;
+            case 'd':
+                double[] doubles = new double[length];
+                buf.asDoubleBuffer().get(doubles);
+                return doubles;
+            case 'i':
+            case 'I':
+                int[] ints = new int[length];
+                buf.asIntBuffer().get(ints);
+                return ints;
+            case 'q':
+            case 'Q':
+                long[] longs = new long[length];
+                buf.asLongBuffer().get(longs);
+                return longs;
+            case 'h':
+            case 'H':
+                short[] shorts = new short[length];
+                buf.asShortBuffer().get(shorts);
+                return shorts;
+            default:
+                byte[] bytes = new byte[length];
+                buf.get(bytes);
+                return bytes;
+        }
+    }
+
     /**
      * Save a "packer" that is used based on a (arg.class==Class) lookup and is hence
      * faster than the "GenericPacker" counterpart.
@@ -11,6 +11,7 @@ import androidx.annotation.NonNull;
 import androidx.appcompat.app.AppCompatActivity;
 import android.os.Bundle;
 import android.util.DisplayMetrics;
+import android.view.Choreographer;
 import android.view.View;
 import android.view.ViewGroup;
 import android.widget.FrameLayout;
@@ -45,6 +46,14 @@ public class EnamlActivity extends AppCompatActivity {
     final List<ActivityLifecycleListener> mActivityLifecycleListeners = new ArrayList<ActivityLifecycleListener>();
     final List<BackPressedListener> mBackPressedListeners = new ArrayList<BackPressedListener>();
     final List<ConfigurationChangedListener> mConfigurationChangedListeners = new ArrayList<ConfigurationChangedListener>();
+    final List<FrameListener> mFrameListeners = new ArrayList<FrameListener>();
+    boolean mFrameRequested = false;
+    final Choreographer.FrameCallback mFrameCallback = (frameTimeNanos) -> {
+        mFrameRequested = false;
+        for (FrameListener listener: mFrameListeners) {
+            listener.onFrame(frameTimeNanos);
+        }
+    };
 
     final HashMap<String, Long> mProfilers = new HashMap<>();
     final Handler mHandler = new Handler();
@@ -482,6 +491,43 @@ public class EnamlActivity extends AppCompatActivity {
         void onConfigurationChanged(HashMap<String, Object> configuration);
     }
 
+    /**
+     * Add a frame listener. Meant to be used from python so it can send
+     * its events in step with the frames.
+     * @param listener
+     */
+    public void addFrameListener(FrameListener listener) {
+        mFrameListeners.add(listener);
+    }
+
+    public void removeFrameListener(FrameListener listener) {
+        mFrameListeners.remove(listener);
+    }
+
+    /**
+     * Notify the frame listeners at the start of the next frame. The bridge
+     * requests a frame after each batch from python is applied so the
+     * listeners only get frames while the UI is being updated.
+     *
+     * This must be called from the UI thread.
+     */
+    public void requestFrame() {
+        if (mFrameRequested || mFrameListeners.isEmpty()) {
+            return;
+        }
+        mFrameRequested = true;
+        Choreographer.getInstance().postFrameCallback(mFrameCallback);
+    }
+
+    public interface FrameListener {
+        /**
+         * Called at the start of a frame that was requested with requestFrame.
+         *
+         * Handlers must be fast or they will block the UI.
+         */
+        void onFrame(long frameTimeNanos);
+    }
+
 
     /**
      * Return build info. Called from python at startup to get info like screen density
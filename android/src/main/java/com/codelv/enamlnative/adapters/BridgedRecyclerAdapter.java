@@ -1,11 +1,13 @@
 package com.codelv.enamlnative.adapters;
 
 import androidx.recyclerview.widget.RecyclerView;
+import android.util.SparseIntArray;
 import android.view.View;
 import android.view.ViewGroup;
 import android.widget.FrameLayout;
 
 import java.util.ArrayList;
+import java.util.Arrays;
 
 /**
  * Created by jrm on 5/3/18.
@@ -18,6 +20,24 @@ public class BridgedRecyclerAdapter extends RecyclerView.Adapter<BridgedRecycler
     BridgedListAdapterListener mListener;
     final ArrayList<View> mRecycleViews = new ArrayList<>();
 
+    // View type of each item and of each recycle view. Views are only
+    // recycled for items of their own type.
+    int[] mItemViewTypes;
+    int[] mRecycleViewTypes;
+    final SparseIntArray mTypeRecycleIndex = new SparseIntArray();
+
+    // When enabled the rows bound during a frame are sent in one callback
+    boolean mBatchBinding = false;
+    int[] mBindIndexes = new int[16];
+    int[] mBindPositions = new int[16];
+    int mBindCount = 0;
+    final Runnable mBindRunnable = new Runnable() {
+        @Override
+        public void run() {
+            flushBindings();
+        }
+    };
+
     // Provide a reference to the views for each data item
     // Complex data items may need more than one view per item, and
     // you provide access to all the views for a data item in a view holder
@@ -42,25 +62,123 @@ public class BridgedRecyclerAdapter extends RecyclerView.Adapter<BridgedRecycler
     public BridgedRecyclerAdapter.ViewHolder onCreateViewHolder(ViewGroup parent,
                                                                 int viewType) {
         // create a new view
-        mRecycleIndex += 1;
-        if (mRecycleIndex==mRecycleViews.size()) {
-            mRecycleIndex = 0;
+        FrameLayout frame = new FrameLayout(parent.getContext());
+        int index = nextRecycleIndex(viewType);
+        if (index < 0) {
+            // No view of this type to show, leave the row empty
+            return new ViewHolder(frame, index);
         }
-        View v = mRecycleViews.get(mRecycleIndex);
+        mRecycleIndex = index;
+        View v = mRecycleViews.get(index);
         ViewGroup vp = (ViewGroup) v.getParent();
         if (vp!=null) {
             vp.removeView(v);
         }
-        FrameLayout frame = new FrameLayout(parent.getContext());
         frame.addView(v);
-        return new ViewHolder(frame, mRecycleIndex);
+        return new ViewHolder(frame, index);
+    }
+
+
+    /**
+     * Return the index of the next recycle view of the given type or -1 if
+     * there are no views of that type. A view of another type is never used
+     * as its contents would be bound to the wrong kind of item.
+     */
+    int nextRecycleIndex(int viewType) {
+        int n = mRecycleViews.size();
+        if (n == 0) {
+            return -1;
+        }
+        int[] types = mRecycleViewTypes;
+        if (types == null || types.length != n) {
+            return (mRecycleIndex + 1) % n;
+        }
+        int last = mTypeRecycleIndex.get(viewType, -1);
+        for (int i = 1; i <= n; i++) {
+            int index = (last + i + n) % n;
+            if (types[index] == viewType) {
+                mTypeRecycleIndex.put(viewType, index);
+                return index;
+            }
+        }
+        return -1;
+    }
+
+    @Override
+    public int getItemViewType(int position) {
+        int[] types = mItemViewTypes;
+        if (types == null || position >= types.length) {
+            return 0;
+        }
+        return types[position];
+    }
+
+    /**
+     * Set the view type of each item.
+     */
+    public void setItemViewTypes(int[] types) {
+        mItemViewTypes = types;
     }
 
+    /**
+     * Set the view type of each of the recycle views.
+     */
+    public void setRecycleViewTypes(int[] types) {
+        mRecycleViewTypes = types;
+        mTypeRecycleIndex.clear();
+    }
+
+    /**
+     * Set the maximum number of detached views of a type kept for reuse.
+     */
+    public void setMaxRecycledViews(int viewType, int max) {
+        mListView.getRecycledViewPool().setMaxRecycledViews(viewType, max);
+    }
 
     // Replace the contents of a view (invoked by the layout manager)
     @Override
     public void onBindViewHolder(ViewHolder holder, int position) {
-        mListener.onRecycleView(holder.mIndex, position);
+        if (holder.mIndex < 0) {
+            // Empty row, there is no view to update
+            return;
+        }
+        if (!mBatchBinding) {
+            mListener.onRecycleView(holder.mIndex, position);
+            return;
+        }
+        if (mBindCount == 0) {
+            mListView.post(mBindRunnable);
+        } else if (mBindCount == mBindIndexes.length) {
+            mBindIndexes = Arrays.copyOf(mBindIndexes, mBindCount * 2);
+            mBindPositions = Arrays.copyOf(mBindPositions, mBindCount * 2);
+        }
+        mBindIndexes[mBindCount] = holder.mIndex;
+        mBindPositions[mBindCount] = position;
+        mBindCount += 1;
+    }
+
+    /**
+     * Send the rows bound since the last flush in one callback
+     */
+    void flushBindings() {
+        if (mBindCount == 0) {
+            return;
+        }
+        int[] indexes = Arrays.copyOf(mBindIndexes, mBindCount);
+        int[] positions = Arrays.copyOf(mBindPositions, mBindCount);
+        mBindCount = 0;
+        mListener.onRecycleViews(indexes, positions);
+    }
+
+    /**
+     * Send the rows bound during a frame in one onRecycleViews callback
+     * instead of an onRecycleView callback for each row.
+     */
+    public void setBatchBinding(boolean enabled) {
+        if (!enabled) {
+            flushBindings();
+        }
+        mBatchBinding = enabled;
     }
 
     public void setRecyleListener(BridgedListAdapterListener listener) {
@@ -118,10 +236,13 @@ public class BridgedRecyclerAdapter extends RecyclerView.Adapter<BridgedRecycler
 
     public void clearRecycleViews() {
         mRecycleViews.clear();
+        mRecycleViewTypes = null;
+        mTypeRecycleIndex.clear();
     }
 
 
     interface BridgedListAdapterListener {
         void onRecycleView(int index, int position);
+        void onRecycleViews(int[] indexes, int[] positions);
     }
 }
@@ -2,7 +2,15 @@ package com.codelv.enamlnative.python;
 
 import com.codelv.enamlnative.BuildConfig;
 
+import org.json.JSONArray;
+import org.json.JSONException;
+import org.json.JSONObject;
+
+import java.io.ByteArrayOutputStream;
 import java.util.concurrent.TimeUnit;
+import java.util.zip.DataFormatException;
+import java.util.zip.Deflater;
+import java.util.zip.Inflater;
 
 import okhttp3.WebSocket;
 import okhttp3.OkHttpClient;
@@ -19,7 +27,15 @@ import okio.ByteString;
  * Created by jrm on 12/16/17.
  */
 public class RemotePythonInterpreter extends PythonInterpreter {
+    // Flag byte of a compressed frame. Bridge events are always a msgpack
+    // array so an uncompressed frame never starts with it.
+    static final byte FRAME_ZLIB = 0x01;
+
+    // Events smaller than this are sent uncompressed
+    static final int COMPRESSION_THRESHOLD = 1024;
+
     static boolean mDone = false;
+    static boolean mCompress = false;
     static boolean mConnecting = false;
     static OkHttpClient mClient;
     static DevClient mDevClient;
@@ -82,11 +98,64 @@ public class RemotePythonInterpreter extends PythonInterpreter {
      */
     public int sendEvents(byte[] data) {
         if (mWebsocket != null) {
-            mWebsocket.send(ByteString.of(data));
+            mWebsocket.send(ByteString.of(mCompress ? encodeFrame(data) : data));
         }
         return 0;
     }
 
+    /**
+     * Compress the events if they're large enough and it makes them smaller
+     *
+     * @param data Bridge encoded data
+     * @return The data as is or the FRAME_ZLIB flag followed by the compressed data
+     */
+    static byte[] encodeFrame(byte[] data) {
+        if (data.length < COMPRESSION_THRESHOLD) {
+            return data;
+        }
+        Deflater deflater = new Deflater(Deflater.BEST_SPEED);
+        deflater.setInput(data);
+        deflater.finish();
+        ByteArrayOutputStream out = new ByteArrayOutputStream(data.length / 2);
+        out.write(FRAME_ZLIB);
+        byte[] buf = new byte[8192];
+        while (!deflater.finished()) {
+            out.write(buf, 0, deflater.deflate(buf));
+        }
+        deflater.end();
+        return (out.size() < data.length) ? out.toByteArray() : data;
+    }
+
+    /**
+     * Decompress a frame created with encodeFrame
+     *
+     * @param data The frame as received
+     * @return Bridge encoded data
+     */
+    static byte[] decodeFrame(byte[] data) {
+        if (data.length == 0 || data[0] != FRAME_ZLIB) {
+            return data;
+        }
+        Inflater inflater = new Inflater();
+        inflater.setInput(data, 1, data.length - 1);
+        ByteArrayOutputStream out = new ByteArrayOutputStream(data.length * 4);
+        byte[] buf = new byte[8192];
+        try {
+            while (!inflater.finished()) {
+                int n = inflater.inflate(buf);
+                if (n == 0 && inflater.needsInput()) {
+                    break;
+                }
+                out.write(buf, 0, n);
+            }
+        } catch (DataFormatException e) {
+            e.printStackTrace();
+        } finally {
+            inflater.end();
+        }
+        return out.toByteArray();
+    }
+
     /**
      * Stops the Python interpreter.
      *
@@ -106,16 +175,35 @@ public class RemotePythonInterpreter extends PythonInterpreter {
             // Tell the enaml-native dev server this is the android app
             mWebsocket = webSocket;
             mConnecting = false;
+            mCompress = false;
         }
 
         @Override
         public void onMessage(WebSocket webSocket, String text) {
-            // This should never happen
+            // Python offers the codecs it can read when it connects
+            try {
+                JSONObject msg = new JSONObject(text);
+                if (!"framing".equals(msg.optString("type"))) {
+                    return;
+                }
+                JSONArray codecs = msg.optJSONArray("codecs");
+                boolean zlib = false;
+                for (int i = 0; codecs != null && i < codecs.length(); i++) {
+                    zlib = zlib || "zlib".equals(codecs.optString(i));
+                }
+                JSONObject reply = new JSONObject();
+                reply.put("type", "framing");
+                reply.put("codecs", new JSONArray().put("zlib"));
+                webSocket.send(reply.toString());
+                mCompress = zlib;
+            } catch (JSONException e) {
+                e.printStackTrace();
+            }
         }
 
         @Override
         public void onMessage(WebSocket webSocket, ByteString bytes) {
-            publishEvents(bytes.toByteArray());
+            publishEvents(decodeFrame(bytes.toByteArray()));
         }
 
         @Override
@@ -74,13 +74,15 @@ int start_logger() {
  * This sends data to the java's PythonInterpreter.publishEvents for handling.
  */
 static PyObject *NativeHooks_publish(PyObject *self, PyObject *args) {
-    Py_ssize_t count;
-    const char* data;
-    if (!PyArg_ParseTuple(args, "s#", &data, &count)) {
+    // Accept any buffer (bytes, bytearray, memoryview) so the
+    // batch can be passed without copying it in python
+    Py_buffer data;
+    if (!PyArg_ParseTuple(args, "s*", &data)) {
         return NULL;
     }
-    jbyteArray buf = (*jenv)->NewByteArray(jenv, count);
-    (*jenv)->SetByteArrayRegion(jenv,buf, 0, count, data);
+    jbyteArray buf = (*jenv)->NewByteArray(jenv, data.len);
+    (*jenv)->SetByteArrayRegion(jenv,buf, 0, data.len, data.buf);
+    PyBuffer_Release(&data);
     (*jenv)->CallStaticVoidMethod(jenv, mPythonInterpreter, mPublishEvents, buf);
 
     // Cleanup
@@ -87,3 +87,13 @@ class Activity(Context):
 
     #: Called with the lifecycle state like 'pause', 'resume', etc...
     onConfigurationChanged = JavaCallback('java.lang.HashMap')
+
+    #: Frame listener
+    addFrameListener = JavaMethod(
+        'com.codelv.enamlnative.EnamlActivity$FrameListener')
+    removeFrameListener = JavaMethod(
+        'com.codelv.enamlnative.EnamlActivity$FrameListener')
+
+    #: Called with the frame time in nanoseconds at the start of the frame
+    #: after a batch of events was applied
+    onFrame = JavaCallback('long')
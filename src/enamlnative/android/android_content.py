@@ -262,7 +262,15 @@ class SystemService(JavaBridgeObject):
 
     @classmethod
     def get(cls):
-        """ Acquires the WifiManager service async. """
+        """ Acquires the service async. The future resolves to the service
+        or None if it is not available.
+
+        The instance is bound to the pending result so methods of the
+        `instance()` can be called immediately. The calls are pipelined and
+        invoked once the service is acquired without waiting for the
+        round trip.
+
+        """
         from .app import AndroidApplication
         app = AndroidApplication.instance()
         f = app.create_future()
@@ -271,15 +279,19 @@ class SystemService(JavaBridgeObject):
             f.set_result(cls._instance)
             return f
 
+        service = app.get_system_service(cls.SERVICE_TYPE)
+        m = cls(__id__=service)
+
         def on_service(obj_id):
-            #: Create the manager
-            if not cls.instance():
-                m = cls(__id__=obj_id)
+            if obj_id is None:
+                #: Not available, allow requesting it again
+                if cls._instance is m:
+                    cls._instance = None
+                f.set_result(None)
             else:
-                m = cls.instance()
-            f.set_result(m)
+                f.set_result(m)
 
-        app.get_system_service(cls.SERVICE_TYPE).then(on_service)
+        service.then(on_service)
 
         return f
 
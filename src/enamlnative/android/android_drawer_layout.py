@@ -185,9 +185,9 @@ class AndroidDrawerLayout(AndroidViewGroup, ProxyDrawerLayout):
     def set_status_bar_background_color(self, color):
         self.widget.setStatusBarBackgroundColor(color)
 
-    def create_layout_params(self, child, layout):
-        params = super(AndroidDrawerLayout, self).create_layout_params(child,
-                                                                       layout)
+    def get_layout_params_setup(self, child, layout):
+        setup = super(AndroidDrawerLayout, self).get_layout_params_setup(
+            child, layout)
         if 'gravity' in layout:
-            params.gravity = layout['gravity']
-        return params
+            setup += (('gravity', layout['gravity']),)
+        return setup
@@ -120,6 +120,9 @@ class AndroidFlexbox(AndroidViewGroup, ProxyFlexbox):
     #: Update default
     layout_param_type = set_default(FlexboxLayoutParams)
 
+    #: The params of the children are never modified so they can be shared
+    intern_layout_params = set_default(True)
+
     # -------------------------------------------------------------------------
     # Initialization API
     # -------------------------------------------------------------------------
@@ -148,28 +151,28 @@ class AndroidFlexbox(AndroidViewGroup, ProxyFlexbox):
     def set_justify_content(self, justify):
         self.widget.setJustifyContent(Flexbox.JUSTIFY_CONTENT[justify])
 
-    def create_layout_params(self, child, layout):
-        params = super(AndroidFlexbox, self).create_layout_params(child,
-                                                                  layout)
+    def get_layout_params_setup(self, child, layout):
+        setup = super(AndroidFlexbox, self).get_layout_params_setup(child,
+                                                                    layout)
         dp = self.dp
         if 'align_self' in layout:
-            params.setAlignSelf(Flexbox.ALIGN_SELF[layout['align_self']])
+            setup += (('setAlignSelf',
+                       (Flexbox.ALIGN_SELF[layout['align_self']],)),)
         if 'flex_basis' in layout:
-            params.setFlexBasisPercent(layout['flex_basis'])
+            setup += (('setFlexBasisPercent', (layout['flex_basis'],)),)
         if 'flex_grow' in layout:
-            params.setFlexGrow(layout['flex_grow'])
+            setup += (('setFlexGrow', (layout['flex_grow'],)),)
         if 'flex_shrink' in layout:
-            params.setFlexShrink(layout['flex_shrink'])
+            setup += (('setFlexShrink', (layout['flex_shrink'],)),)
         if 'min_height' in layout:
-            params.setMinHeight(int(layout['min_height']*dp))
+            setup += (('setMinHeight', (int(layout['min_height']*dp),)),)
         if 'max_height' in layout:
-            params.setMinHeight(int(layout['max_height']*dp))
+            setup += (('setMinHeight', (int(layout['max_height']*dp),)),)
         if 'min_width' in layout:
-            params.setMinWidth(int(layout['min_width']*dp))
+            setup += (('setMinWidth', (int(layout['min_width']*dp),)),)
         if 'max_width' in layout:
-            params.setMaxWidth(int(layout['max_width']*dp))
-
-        return params
+            setup += (('setMaxWidth', (int(layout['max_width']*dp),)),)
+        return setup
 
     def apply_layout(self, child, layout):
         """ Apply the flexbox specific layout.
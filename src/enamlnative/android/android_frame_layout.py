@@ -41,6 +41,9 @@ class AndroidFrameLayout(AndroidViewGroup, ProxyFrameLayout):
     #: Update default
     layout_param_type = set_default(FrameLayoutParams)
 
+    #: The params of the children are never modified so they can be shared
+    intern_layout_params = set_default(True)
+
     # -------------------------------------------------------------------------
     # Initialization API
     # -------------------------------------------------------------------------
@@ -57,9 +60,9 @@ class AndroidFrameLayout(AndroidViewGroup, ProxyFrameLayout):
     def set_foreground_gravity(self, gravity):
         self.widget.setForegroundGravity(gravity)
 
-    def create_layout_params(self, child, layout):
-        params = super(AndroidFrameLayout, self).create_layout_params(child,
-                                                                      layout)
+    def get_layout_params_setup(self, child, layout):
+        setup = super(AndroidFrameLayout, self).get_layout_params_setup(
+            child, layout)
         if 'gravity' in layout:
-            params.gravity = layout['gravity']
-        return params
+            setup += (('gravity', layout['gravity']),)
+        return setup
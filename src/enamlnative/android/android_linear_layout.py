@@ -39,6 +39,9 @@ class AndroidLinearLayout(AndroidViewGroup, ProxyLinearLayout):
     #: Use LinearLayout params
     layout_param_type = set_default(LinearLayoutParams)
 
+    #: The params of the children are never modified so they can be shared
+    intern_layout_params = set_default(True)
+
     # -------------------------------------------------------------------------
     # Initialization API
     # -------------------------------------------------------------------------
@@ -58,9 +61,9 @@ class AndroidLinearLayout(AndroidViewGroup, ProxyLinearLayout):
         """
         self.widget.setOrientation(0 if orientation == 'horizontal' else 1)
 
-    def create_layout_params(self, child, layout):
-        params = super(AndroidLinearLayout, self).create_layout_params(child,
-                                                                       layout)
+    def get_layout_params_setup(self, child, layout):
+        setup = super(AndroidLinearLayout, self).get_layout_params_setup(
+            child, layout)
         if 'gravity' in layout:
-            params.gravity = layout['gravity']
-        return params
\ No newline at end of file
+            setup += (('gravity', layout['gravity']),)
+        return setup
\ No newline at end of file
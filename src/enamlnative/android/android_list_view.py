@@ -9,7 +9,11 @@ Created on May 20, 2017
 
 @author: jrm
 """
-from atom.api import Typed, Instance, Property, Dict, set_default, observe
+from atom.api import (
+    Typed, Instance, Property, Dict, Value, set_default, observe
+)
+from array import array
+from bisect import bisect_left
 
 from enamlnative.widgets.list_view import ProxyListView, ProxyListItem
 
@@ -103,9 +107,14 @@ class BridgedRecyclerAdapter(JavaBridgeObject):
     setItemCount = JavaMethod('int')
     setRecycleViews = JavaMethod('[Landroid.view.View;')
     clearRecycleViews = JavaMethod()
+    setBatchBinding = JavaMethod('boolean')
+    setItemViewTypes = JavaMethod('[I')
+    setRecycleViewTypes = JavaMethod('[I')
+    setMaxRecycledViews = JavaMethod('int', 'int')
 
     #: BridgedListAdapterListener API
     onRecycleView = JavaCallback('int', 'int')
+    onRecycleViews = JavaCallback('[I', '[I', buffers=True)
     onVisibleCountChanged = JavaCallback('int', 'int')
     onScrollStateChanged = JavaCallback('android.widget.AbsListView','int')
 
@@ -116,6 +125,112 @@ class BridgedRecyclerAdapter(JavaBridgeObject):
     notifyItemRangeChanged = JavaMethod('int', 'int')
     notifyItemRangeInserted = JavaMethod('int', 'int')
     notifyItemRangeRemoved = JavaMethod('int', 'int')
+    notifyItemMoved = JavaMethod('int', 'int')
+
+
+def _ranges(indices):
+    """ Group sorted indices into (start, count) ranges """
+    ranges = []
+    for i in indices:
+        if ranges and ranges[-1][0] + ranges[-1][1] == i:
+            ranges[-1][1] += 1
+        else:
+            ranges.append([i, 1])
+    return [tuple(r) for r in ranges]
+
+
+def _longest_increasing(seq):
+    """ Return the indices of a longest increasing subsequence of seq """
+    tails = []  # Index in seq of the smallest tail of each length
+    values = []  # Value of each tail
+    prev = [-1] * len(seq)
+    for i, v in enumerate(seq):
+        j = bisect_left(values, v)
+        if j:
+            prev[i] = tails[j-1]
+        if j == len(tails):
+            tails.append(i)
+            values.append(v)
+        else:
+            tails[j] = i
+            values[j] = v
+    result = []
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        result.append(i)
+        i = prev[i]
+    return result[::-1]
+
+
+def diff_items(old, new, key=None, max_moves=100):
+    """ Compute the changes that turn the old list of items into the new
+    one. Items are matched up by their key.
+
+    Parameters
+    ----------
+    old: list
+        The items the adapter has
+    new: list
+        The items it should have
+    key: callable or None
+        Returns the unique key of an item. Defaults to the item's identity.
+    max_moves: int
+        If more items than this moved, the span of reordered rows is
+        reported as changed instead of moving each row.
+
+    Returns
+    -------
+    ops: list or None
+        A list of ('remove', start, count), ('move', from, to),
+        ('insert', start, count) and ('change', start, count) operations
+        in the order they must be applied, or None if the keys are not
+        unique.
+
+    """
+    key = key or id
+    old_keys = [key(item) for item in old]
+    new_keys = [key(item) for item in new]
+    old_index = {k: i for i, k in enumerate(old_keys)}
+    new_index = {k: i for i, k in enumerate(new_keys)}
+    if len(old_index) != len(old) or len(new_index) != len(new):
+        return None
+
+    #: Remove from the end so the start of each range is still valid
+    ops = [('remove', start, count) for start, count in reversed(_ranges(
+        [i for i, k in enumerate(old_keys) if k not in new_index]))]
+
+    #: The rows kept in their current and final order. The rows on a
+    #: longest increasing run of their final positions stay, the rest move.
+    current = [k for k in old_keys if k in new_index]
+    target = [k for k in new_keys if k in old_index]
+    position = {k: i for i, k in enumerate(target)}
+    stable = set(current[i] for i in _longest_increasing(
+        [position[k] for k in current]))
+    if len(current) - len(stable) > max_moves:
+        moved = [i for i, k in enumerate(target) if current[i] != k]
+        ops.append(('change', moved[0], moved[-1] - moved[0] + 1))
+    else:
+        for i, k in enumerate(target):
+            if k in stable:
+                continue
+            j = current.index(k)
+            del current[j]
+            to = current.index(target[i-1]) + 1 if i else 0
+            current.insert(to, k)
+            ops.append(('move', j, to))
+
+    #: Insert in order so the rows before each are already in place
+    ops.extend(('insert', start, count) for start, count in _ranges(
+        [i for i, k in enumerate(new_keys) if k not in old_index]))
+
+    #: Rows with the same key whose item was replaced
+    changed = []
+    for i, k in enumerate(new_keys):
+        j = old_index.get(k)
+        if j is not None and old[j] is not new[i] and old[j] != new[i]:
+            changed.append(i)
+    ops.extend(('change', start, count) for start, count in _ranges(changed))
+    return ops
 
 
 class AndroidListView(AndroidViewGroup, ProxyListView):
@@ -140,6 +255,12 @@ class AndroidListView(AndroidViewGroup, ProxyListView):
     #: List mapping from index to view
     item_mapping = Dict()
 
+    #: Copy of the items the adapter was last updated with
+    _items = Value()
+
+    #: Data source being observed for loaded pages
+    _data_source = Value()
+
     # -------------------------------------------------------------------------
     # Initialization API
     # -------------------------------------------------------------------------
@@ -193,9 +314,17 @@ class AndroidListView(AndroidViewGroup, ProxyListView):
         # I'm sure this will make someone upset haha
         adapter.setRecyleListener(adapter.getId())
         adapter.onRecycleView.connect(self.on_recycle_view)
+        adapter.onRecycleViews.connect(self.on_recycle_views)
+        if d.batch_binding:
+            self.set_batch_binding(d.batch_binding)
+        if d.pool_sizes:
+            self.set_pool_sizes(d.pool_sizes)
         #adapter.onVisibleCountChanged.connect(self.on_visible_count_changed)
         #adapter.onScrollStateChanged.connect(self.on_scroll_state_changed)
-        self.set_items(d.items)
+        if d.data_source is not None:
+            self.set_data_source(d.data_source)
+        else:
+            self.set_items(d.items)
         w.setAdapter(adapter)
         #self.set_selected(d.selected)
         self.refresh_views()
@@ -210,6 +339,16 @@ class AndroidListView(AndroidViewGroup, ProxyListView):
         self.item_mapping[position] = item
         item.recycle_view(position)
 
+    def on_recycle_views(self, indexes, positions):
+        """ Update the items of the views bound during a frame at once. If
+        a view was bound more than once only the last position is used.
+
+        """
+        bindings = dict(zip(indexes, positions))
+        with self.get_context().batch():
+            for index, position in bindings.items():
+                self.on_recycle_view(index, position)
+
     def on_scroll_state_changed(self, view, state):
         pass
 
@@ -230,36 +369,161 @@ class AndroidListView(AndroidViewGroup, ProxyListView):
            adapter.clearRecycleViews()
            adapter.setRecycleViews(
                 [encode(li.get_view()) for li in self.list_items])
+           if self.declaration.view_type:
+               adapter.setRecycleViewTypes(array('i', [
+                   li.declaration.view_type for li in self.list_items]))
 
     def set_items(self, items):
+        """ Update the adapter with the changes from the previous items """
+        if self.declaration.data_source is not None:
+            return
+        old = self._items
+        self._items = list(items)
+        if old is None:
+            adapter = self.adapter
+            adapter.setItemCount(len(items))
+            self.update_view_types()
+            adapter.notifyDataSetChanged()
+        else:
+            self.update_items(old, self._items)
+
+    def update_items(self, old, new):
+        """ Notify the adapter of the minimal changes between the old and
+        new items in one batch.
+
+        """
         adapter = self.adapter
-        adapter.setItemCount(len(items))
-        adapter.notifyDataSetChanged()
+        ops = diff_items(old, new, self.declaration.key)
+        with self.get_context().batch():
+            adapter.setItemCount(len(new))
+            self.update_view_types()
+            if ops is None:
+                #: Keys are not unique
+                adapter.notifyDataSetChanged()
+                return
+            for op, a, b in ops:
+                if op == 'remove':
+                    adapter.notifyItemRangeRemoved(a, b)
+                elif op == 'move':
+                    adapter.notifyItemMoved(a, b)
+                elif op == 'insert':
+                    adapter.notifyItemRangeInserted(a, b)
+                else:
+                    adapter.notifyItemRangeChanged(a, b)
+
+    def update_view_types(self):
+        """ Send the view type of each item to the adapter """
+        view_type = self.declaration.view_type
+        if not view_type or self._items is None:
+            return
+        self.adapter.setItemViewTypes(
+            array('i', [view_type(item) for item in self._items]))
+
+    def set_view_type(self, view_type):
+        """ Rebind the rows with their new view types """
+        with self.get_context().batch():
+            self.refresh_views()
+            if view_type:
+                self.update_view_types()
+            else:
+                self.adapter.setItemViewTypes(array('i'))
+            self.adapter.notifyDataSetChanged()
+
+    def set_pool_sizes(self, sizes):
+        """ Set the number of detached views of each type kept for reuse """
+        for view_type, size in sizes.items():
+            self.adapter.setMaxRecycledViews(view_type, size)
+
+    def set_batch_binding(self, enabled):
+        """ Bind the rows of each frame with one callback """
+        self.adapter.setBatchBinding(enabled)
+
+    def set_data_source(self, source):
+        """ Load the items from the data source as they are displayed """
+        old = self._data_source
+        if old is not None:
+            old.unobserve('loaded', self._on_rows_loaded)
+            old.unobserve('invalidated', self._on_data_invalidated)
+        self._data_source = source
+        if source is None:
+            self._items = None
+            self.set_items(self.declaration.items)
+            return
+        source.observe('loaded', self._on_rows_loaded)
+        source.observe('invalidated', self._on_data_invalidated)
+        self._on_data_invalidated()
+
+    def _on_rows_loaded(self, change):
+        """ Update the list items displaying placeholders for the loaded
+        rows.
+
+        """
+        start, count = change['value']
+        with self.get_context().batch():
+            for item in self.list_items:
+                index = item.declaration.index
+                if start <= index < start + count:
+                    item.recycle_view(index)
+
+    def _on_data_invalidated(self, change=None):
+        """ Reload the visible rows when the data source changed """
+        adapter = self.adapter
+        with self.get_context().batch():
+            adapter.setItemCount(len(self._data_source))
+            adapter.notifyDataSetChanged()
+
+    def destroy(self):
+        """ Stop observing the data source """
+        source = self._data_source
+        if source is not None:
+            source.unobserve('loaded', self._on_rows_loaded)
+            source.unobserve('invalidated', self._on_data_invalidated)
+            self._data_source = None
+        super(AndroidListView, self).destroy()
 
     @observe('declaration.items')
     def _on_items_changed(self, change):
         """ Observe container events on the items list and update the
         adapter appropriately.
         """
-        if change['type'] != 'container':
+        if change['type'] != 'container' or self._items is None:
             return
+        if self.declaration.data_source is not None:
+            return
+        items = self._items
+        index = change.get('index')
+        if isinstance(index, int) and index < 0:
+            index += len(items)
         op = change['operation']
+        adapter = self.adapter
         if op == 'append':
-            i = len(change['value'])-1
-            self.adapter.notifyItemInserted(i)
-        elif op == 'insert':
-            self.adapter.notifyItemInserted(change['index'])
-        elif op in ('pop', '__delitem__'):
-            self.adapter.notifyItemRemoved(change['index'])
-        elif op == '__setitem__':
-            self.adapter.notifyItemChanged(change['index'])
-        elif op == 'extend':
+            items.append(change['item'])
+            adapter.setItemCount(len(items))
+            self.update_view_types()
+            adapter.notifyItemInserted(len(items)-1)
+        elif op == 'insert' and 0 <= index <= len(items):
+            items.insert(index, change['item'])
+            adapter.setItemCount(len(items))
+            self.update_view_types()
+            adapter.notifyItemInserted(index)
+        elif op in ('pop', '__delitem__') and isinstance(index, int):
+            del items[index]
+            adapter.setItemCount(len(items))
+            self.update_view_types()
+            adapter.notifyItemRemoved(index)
+        elif op == '__setitem__' and isinstance(index, int):
+            items[index] = change['newitem']
+            self.update_view_types()
+            adapter.notifyItemChanged(index)
+        elif op in ('extend', '__iadd__'):
             n = len(change['items'])
-            i = len(change['value'])-n
-            self.adapter.notifyItemRangeInserted(i, n)
-        elif op in ('remove', 'reverse', 'sort'):
-            # Reset everything for these
-            self.adapter.notifyDataSetChanged()
+            items.extend(change['items'])
+            adapter.setItemCount(len(items))
+            self.update_view_types()
+            adapter.notifyItemRangeInserted(len(items)-n, n)
+        else:
+            #: Diff anything else (sort, reverse, remove, slices, ...)
+            self.set_items(self.declaration.items)
 
     def set_arrangement(self, arrangement):
         ctx = self.get_context()
@@ -323,8 +587,16 @@ class AndroidListItem(AndroidToolkitObject, ProxyListItem):
     def recycle_view(self, position):
         """ Tell the view to render the item at the given position """
         d = self.declaration
-
-        if position < len(d.parent.items):
+        source = d.parent.data_source
+
+        if source is not None:
+            if position < len(source):
+                d.index = position
+                d.item = source.get(position)
+            else:
+                d.index = -1
+                d.item = None
+        elif position < len(d.parent.items):
             d.index = position
             d.item = d.parent.items[position]
         else:
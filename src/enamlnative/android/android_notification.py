@@ -24,6 +24,7 @@ from .bridge import (
     JavaBridgeObject, JavaStaticMethod, JavaCallback, JavaMethod
 )
 
+from enamlnative.core.bridge import Priority
 from enamlnative.widgets.notification import ProxyNotification
 
 
@@ -84,7 +85,9 @@ class NotificationManager(JavaBridgeObject):
 
     @classmethod
     def get(cls):
-        """ Acquires the NotificationManager service async. """
+        """ Acquires the NotificationManager service async. Methods of the
+        `instance()` can be called before the future resolves.
+        """
         app = AndroidApplication.instance()
         f = app.create_future()
 
@@ -92,15 +95,18 @@ class NotificationManager(JavaBridgeObject):
             f.set_result(cls._instance)
             return f
 
+        service = cls.from_(app)
+        m = cls(__id__=service)
+
         def on_service(obj_id):
-            #: Create the manager
-            if not cls.instance():
-                m = cls(__id__=obj_id)
+            if obj_id is None:
+                if cls._instance is m:
+                    cls._instance = None
+                f.set_result(None)
             else:
-                m = cls.instance()
-            f.set_result(m)
+                f.set_result(m)
 
-        cls.from_(app).then(on_service)
+        service.then(on_service)
 
         return f
 
@@ -661,11 +667,14 @@ class AndroidNotification(AndroidToolkitObject, ProxyNotification):
 
     def set_progress(self, progress):
         d = self.declaration
-        if d.show_progress:
-            self.builder.setProgress(100, progress, d.progress_indeterminate)
-        else:
-            self.builder.setProgress(0, 0, False)
-        self.refresh()
+        #: Progress updates can be frequent, don't let them delay the UI
+        with self.get_context().priority(Priority.LOW):
+            if d.show_progress:
+                self.builder.setProgress(100, progress,
+                                         d.progress_indeterminate)
+            else:
+                self.builder.setProgress(0, 0, False)
+            self.refresh()
 
     def set_progress_indeterminate(self, indeterminate):
         self.set_progress(self.declaration.progress)
@@ -116,15 +116,16 @@ class Sensor(JavaBridgeObject):
         app = AndroidApplication.instance()
         f = app.create_future()
 
-        def on_sensor(sid, mgr):
-            if sid is None:
-                f.set_result(None)
-            else:
-                f.set_result(Sensor(__id__=sid, manager=mgr, type=sensor_type))
-
-        SensorManager.get().then(
-            lambda sm: sm.getDefaultSensor(sensor_type).then(
-                lambda sid, sm=sm:on_sensor(sid, sm)))
+        #: The calls are pipelined so this only takes a single round trip
+        SensorManager.get()
+        mgr = SensorManager.instance()
+        result = mgr.getDefaultSensor(sensor_type)
+        sensor = Sensor(__id__=result, manager=mgr, type=sensor_type)
+
+        def on_sensor(sid):
+            f.set_result(None if sid is None else sensor)
+
+        result.then(on_sensor)
 
         return f
 
@@ -23,14 +23,14 @@ class TextView(View):
     __nativeclass__ = set_default('android.widget.TextView')
     setAllCaps = JavaMethod('boolean')
     setAutoLinkMask = JavaMethod('int')
-    setText = JavaMethod('java.lang.CharSequence')
+    setText = JavaMethod('java.lang.CharSequence', idempotent=True)
     setTextKeepState = JavaMethod('java.lang.CharSequence')
-    setTextColor = JavaMethod('android.graphics.Color')
+    setTextColor = JavaMethod('android.graphics.Color', idempotent=True)
     setTextIsSelectable = JavaMethod('boolean')
     setHighlightColor = JavaMethod('android.graphics.Color')
     setLinkTextColor = JavaMethod('android.graphics.Color')
     setGravity = JavaMethod('int')
-    setTextSize = JavaMethod('float')
+    setTextSize = JavaMethod('float', idempotent=True)
     setTypeface = JavaMethod('android.graphics.Typeface', 'int')
     setLines = JavaMethod('int')
     setLineSpacing = JavaMethod('float', 'float')
@@ -69,12 +69,9 @@ class InputMethodManager(SystemService):
         """
         app = AndroidApplication.instance()
         f = app.create_future()
-
-        def on_ready(ims):
-            ims.toggleSoftInput(flag, 0)
-            f.set_result(True)
-
-        cls.get().then(on_ready)
+        cls.get()
+        ims = cls.instance()
+        ims.toggleSoftInput(flag, 0).then(lambda r: f.set_result(True))
         return f
 
     @classmethod
@@ -89,16 +86,13 @@ class InputMethodManager(SystemService):
         """
         app = AndroidApplication.instance()
         f = app.create_future()
+        cls.get()
+        ims = cls.instance()
+        view = app.view.proxy.widget
 
-        def on_ready(ims):
-            view = app.view.proxy.widget
-
-            def on_token(__id__):
-                ims.hideSoftInputFromWindow(
-                    JavaBridgeObject(__id__=__id__), 0).then(f.set_result)
-            view.getWindowToken().then(on_token)
-
-        cls.get().then(on_ready)
+        #: Pass the token without waiting for it to be returned
+        token = JavaBridgeObject(__id__=view.getWindowToken())
+        ims.hideSoftInputFromWindow(token, 0).then(f.set_result)
         return f
 
 
@@ -9,11 +9,14 @@ Created on May 20, 2017
 
 @author: jrm
 """
-from atom.api import Typed, Dict, Instance, Subclass, Float, set_default
+from atom.api import (
+    Typed, Dict, Instance, Subclass, Float, Bool, Value, set_default
+)
 
 from .android_toolkit_object import AndroidToolkitObject
 from .bridge import JavaBridgeObject, JavaMethod, JavaCallback, JavaField
 
+from enamlnative.core.bridge import INTERNED, configure
 from enamlnative.widgets.view import ProxyView, coerce_size
 
 
@@ -24,6 +27,12 @@ LAYOUT_KEYS = (
     'max_width', 'min_width', 'max_height', 'min_height'
 )
 
+#: Compiled init plans keyed by the proxy class and the handlers of the
+#: members bound in the declaration's block. The plan only depends on these
+#: so the engines are not referenced and the plans of templates that are
+#: discarded, ex. when the view is reloaded, don't keep them alive.
+INIT_PLANS = {}
+
 
 class View(JavaBridgeObject):
     __nativeclass__ = set_default('android.view.View')
@@ -47,32 +56,33 @@ class View(JavaBridgeObject):
     setLayoutParams = JavaMethod('android.view.ViewGroup.LayoutParams')
     setBackground = JavaMethod('android.graphics.drawable.Drawable')
     setBackgroundResource = JavaMethod('android.R')
-    setBackgroundColor = JavaMethod('android.graphics.Color')
+    setBackgroundColor = JavaMethod('android.graphics.Color', idempotent=True)
     setClickable = JavaMethod('boolean')
     setLongClickable = JavaMethod('boolean')
-    setAlpha = JavaMethod('float')
+    setAlpha = JavaMethod('float', idempotent=True)
     setTop = JavaMethod('int')
     setBottom = JavaMethod('int')
     setLeft = JavaMethod('int')
     setRight = JavaMethod('int')
     setLayoutDirection = JavaMethod('int')
 
-    setLayoutParams = JavaMethod('android.view.ViewGroup$LayoutParams')
-    setPadding = JavaMethod('int', 'int', 'int', 'int')
+    setLayoutParams = JavaMethod('android.view.ViewGroup$LayoutParams',
+                                 idempotent=True)
+    setPadding = JavaMethod('int', 'int', 'int', 'int', idempotent=True)
 
     getWindowToken = JavaMethod(returns='android.os.IBinder')
 
-    setX = JavaMethod('float')
-    setY = JavaMethod('float')
-    setZ = JavaMethod('float')
+    setX = JavaMethod('float', idempotent=True)
+    setY = JavaMethod('float', idempotent=True)
+    setZ = JavaMethod('float', idempotent=True)
     setMaximumHeight = JavaMethod('int')
     setMaximumWidth = JavaMethod('int')
     setMinimumHeight = JavaMethod('int')
     setMinimumWidth = JavaMethod('int')
-    setEnabled = JavaMethod('boolean')
+    setEnabled = JavaMethod('boolean', idempotent=True)
     setTag = JavaMethod('java.lang.Object')
     setToolTipText = JavaMethod('java.lang.CharSequence')
-    setVisibility = JavaMethod('int')
+    setVisibility = JavaMethod('int', idempotent=True)
 
     LAYOUT_DIRECTIONS = {
         'ltr': 0,
@@ -125,6 +135,17 @@ class AndroidView(AndroidToolkitObject, ProxyView):
     #: Layout params
     layout_params = Instance(LayoutParams)
 
+    #: Layout updates waiting to be applied, see `update_layout`
+    _layout_updates = Value()
+
+    #: Share identical layout params between the children of this view.
+    #: Subclasses enable it with `set_default(True)` if the native view
+    #: does not keep state in the params of its children. Changes to the
+    #: params of a child should be added to the setup returned by
+    #: `get_layout_params_setup`, otherwise the params must be copied with
+    #: `INTERNED.detach` before they're modified.
+    intern_layout_params = Bool()
+
     #: Default layout params
     default_layout = Dict(default={
         'width': 'wrap_content',
@@ -153,8 +174,9 @@ class AndroidView(AndroidToolkitObject, ProxyView):
         the properties that need to be overridden from defaults thus greatly 
         reducing the number of initialization checks, saving time and memory.
         
-        If you don't want this to happen override `get_declared_keys` 
-        to return an empty list. 
+        If you don't want this to happen override `get_declared_items` 
+        to return an empty list. The setters to call are looked up once for
+        each enamldef, see `get_init_plan`.
 
         """
         super(AndroidView, self).init_widget()
@@ -162,10 +184,60 @@ class AndroidView(AndroidToolkitObject, ProxyView):
         # Initialize the widget by updating only the members that
         # have read expressions declared. This saves a lot of time and
         # simplifies widget initialization code
+        d = self.declaration
+        for k, setter, keys in self.get_init_plan():
+            if keys is None:
+                setter(self, getattr(d, k))
+            else:
+                setter(self, {key: getattr(d, key) for key in keys})
+
+    def get_init_plan(self):
+        """ Get the init plan for the members bound by the declaration's
+        engine. The plan is compiled the first time a declaration binding
+        these members is initialized and reused for the rest.
+
+        Returns
+        -------
+        result: tuple
+            A tuple of (key, setter, layout keys) entries. The setter is
+            called with the value of the key or, if layout keys is not None,
+            a dict of the values of the layout keys.
+
+        """
+        engine = self.declaration._d_engine
+        if not engine:
+            return ()
+        key = (type(self), tuple((k, h.read_pair is not None)
+                                 for k, h in engine._handlers.items()))
+        plan = INIT_PLANS.get(key)
+        if plan is None:
+            plan = INIT_PLANS[key] = self.compile_init_plan()
+        return plan
+
+    def compile_init_plan(self):
+        """ Compile the init plan from the items returned by
+        `get_declared_items`. Subclasses that override `get_declared_items`
+        must only filter or reorder the items by their keys so the plan
+        can be shared.
+
+        Returns
+        -------
+        result: tuple
+            The plan as described in `get_init_plan`.
+
+        """
+        cls = type(self)
+        handlers = self.declaration._d_engine._handlers
+        plan = []
         for k, v in self.get_declared_items():
-            handler = getattr(self, 'set_'+k, None)
-            if handler:
-                handler(v)
+            setter = getattr(cls, 'set_'+k, None)
+            if setter is None:
+                continue
+            if k == 'layout' and k not in handlers:
+                plan.append((k, setter, tuple(v)))
+            else:
+                plan.append((k, setter, None))
+        return tuple(plan)
 
     def get_declared_items(self):
         """ Get the members that were set in the enamldef block for this
@@ -362,7 +434,8 @@ class AndroidView(AndroidToolkitObject, ProxyView):
         """ Updates the LayoutParams of this widget. 
            
         This delegates to the parent and expects the parent to update the
-        existing layout without recreating it.
+        existing layout without recreating it. Updates made before the next
+        batch of events is sent are merged and applied once.
         
         Parameters
         ----------
@@ -371,7 +444,29 @@ class AndroidView(AndroidToolkitObject, ProxyView):
             child.  The widget defaults are updated with user passed values. 
         
         """
-        self.parent().apply_layout(self, params)
+        updates = self._layout_updates
+        if updates is None:
+            self._layout_updates = params
+            self.get_context().before_send(self.apply_layout_updates)
+        else:
+            updates.update(params)
+
+    def apply_layout_updates(self):
+        """ Apply the merged layout updates now. This is called before the
+        next batch of events is sent.
+
+        """
+        params = self._layout_updates
+        if params is None:
+            return
+        self._layout_updates = None
+        if not self.widget:
+            return
+        parent = self.parent()
+        if not isinstance(parent, AndroidView):
+            # Root node
+            parent = self
+        parent.apply_layout(self, params)
 
     def create_layout_params(self, child, layout):
         """ Create the LayoutParams for a child with it's requested
@@ -396,13 +491,35 @@ class AndroidView(AndroidToolkitObject, ProxyView):
                 coerce_size(layout.get('height', 'wrap_content')))
         w = w if w < 0 else int(w * dp)
         h = h if h < 0 else int(h * dp)
-        layout_params = self.layout_param_type(w, h)
+        setup = self.get_layout_params_setup(child, layout)
+        if self.intern_layout_params:
+            return INTERNED.acquire(self.layout_param_type, (w, h), setup)
+        return configure(self.layout_param_type(w, h), setup)
+
+    def get_layout_params_setup(self, child, layout):
+        """ Get the fields to set and methods to call on the LayoutParams
+        of a child once they're created. Subclasses should extend this to
+        handle layout specific params.
+
+        Parameters
+        ----------
+        child: AndroidView
+            A view to create layout params for.
+        layout: Dict
+            A dict of layout parameters to use to create the layout.
+
+        Returns
+        -------
+        setup: tuple
+            A tuple of (name, value) pairs as used by `bridge.configure`.
 
+        """
         if layout.get('margin'):
+            dp = self.dp
             l, t, r, b = layout['margin']
-            layout_params.setMargins(int(l*dp), int(t*dp),
-                                     int(r*dp), int(b*dp))
-        return layout_params
+            return (('setMargins', (int(l*dp), int(t*dp),
+                                    int(r*dp), int(b*dp))),)
+        return ()
 
     def apply_layout(self, child, layout):
         """ Apply a layout to a child. This sets the layout_params
@@ -424,39 +541,61 @@ class AndroidView(AndroidToolkitObject, ProxyView):
         w = child.widget
         if w:
             dp = self.dp
+            #: Call the methods through the class so each call does not
+            #: bind them to the widget first
+            cls = type(w)
+
             # padding
             if 'padding' in layout:
                 l, t, r, b = layout['padding']
-                w.setPadding(int(l*dp), int(t*dp),
-                             int(r*dp), int(b*dp))
+                cls.setPadding(w, int(l*dp), int(t*dp),
+                               int(r*dp), int(b*dp))
 
             # left, top, right, bottom
             if 'left' in layout:
-                w.setLeft(int(layout['left']*dp))
+                cls.setLeft(w, int(layout['left']*dp))
             if 'top' in layout:
-                w.setTop(int(layout['top']*dp))
+                cls.setTop(w, int(layout['top']*dp))
             if 'right' in layout:
-                w.setRight(int(layout['right']*dp))
+                cls.setRight(w, int(layout['right']*dp))
             if 'bottom' in layout:
-                w.setBottom(int(layout['bottom']*dp))
+                cls.setBottom(w, int(layout['bottom']*dp))
 
             # x, y, z
             if 'x' in layout:
-                w.setX(layout['x']*dp)
+                cls.setX(w, layout['x']*dp)
             if 'y' in layout:
-                w.setY(layout['y']*dp)
+                cls.setY(w, layout['y']*dp)
             if 'z' in layout:
-                w.setZ(layout['z']*dp)
+                cls.setZ(w, layout['z']*dp)
 
             # set min width and height
             # maximum is not supported by AndroidViews (without flexbox)
             if 'min_height' in layout:
-                w.setMinimumHeight(int(layout['min_height']*dp))
+                cls.setMinimumHeight(w, int(layout['min_height']*dp))
             if 'min_width' in layout:
-                w.setMinimumWidth(int(layout['min_width']*dp))
+                cls.setMinimumWidth(w, int(layout['min_width']*dp))
 
         child.layout_params = layout_params
 
+    def _observe_layout_params(self, change):
+        """ Keep a reference to shared layout params while they're used """
+        if change['type'] == 'delete':
+            INTERNED.release(change['value'])
+            return
+        old = change.get('oldvalue')
+        if old is not None:
+            INTERNED.release(old)
+        if change['value'] is not None:
+            INTERNED.retain(change['value'])
+
+    def destroy(self):
+        """ Release the layout params in case they're shared. """
+        params = self.layout_params
+        if params is not None:
+            INTERNED.release(params)
+        super(AndroidView, self).destroy()
+
     def set_width(self, width):
         self.update_layout(width=width)
 
@@ -9,12 +9,12 @@ Created on May 20, 2017
 
 @author: jrm
 """
-from atom.api import Typed, set_default
+from atom.api import Typed, Value, set_default
 
 from enamlnative.widgets.view_group import ProxyViewGroup
 
 from .android_view import AndroidView, View, LayoutParams
-from .bridge import JavaBridgeObject, JavaMethod
+from .bridge import JavaBridgeObject, JavaMethod, JavaStaticMethod, encode
 
 
 class ViewGroup(View):
@@ -28,6 +28,16 @@ class ViewGroup(View):
     setLayoutTransition = JavaMethod('android.animation.LayoutTransition')
 
 
+class Bridge(JavaBridgeObject):
+    """ Helpers of the native bridge """
+    __nativeclass__ = set_default('com.codelv.enamlnative.Bridge')
+    addViews = JavaStaticMethod('android.view.ViewGroup',
+                                '[Landroid.view.View;', 'int',
+                                '[Landroid.view.ViewGroup$LayoutParams;')
+    moveView = JavaStaticMethod('android.view.ViewGroup', 'android.view.View',
+                                'int')
+
+
 class MarginLayoutParams(LayoutParams):
     __nativeclass__ = set_default('android.view.ViewGroup$MarginLayoutParams')
     __signature__ = set_default(('int', 'int'))
@@ -55,6 +65,17 @@ class AndroidViewGroup(AndroidView, ProxyViewGroup):
         'height': 'match_parent'
     })
 
+    #: Children added since the last batch was sent. Their views are
+    #: inserted in bulk before the batch is sent.
+    _pending_children = Value()
+
+    #: Index of the view of each child within the view group. Only children
+    #: whose views were added are included.
+    _child_index = Value(factory=dict)
+
+    #: Children in the order of their views within the view group
+    _child_views = Value(factory=list)
+
     # -------------------------------------------------------------------------
     # Initialization API
     # -------------------------------------------------------------------------
@@ -68,17 +89,12 @@ class AndroidViewGroup(AndroidView, ProxyViewGroup):
         """ Add all child widgets to the view
         """
         super(AndroidViewGroup, self).init_layout()
-        widget = self.widget
-        i = 0
-        for child in self.children():
-            child_widget = child.widget
-            if child_widget:
-                if child.layout_params:
-                    widget.addView_(child_widget, i,
-                                             child.layout_params)
-                else:
-                    widget.addView(child_widget, i)
-                i += 1
+        children = [c for c in self.children() if c.widget]
+        if children:
+            self.add_views(0, [c.widget for c in children],
+                           [c.layout_params for c in children])
+            self._child_views[0:0] = children
+            self.update_child_index(0)
 
         # Force layout using the default params
         if not self.layout_params:
@@ -92,25 +108,128 @@ class AndroidViewGroup(AndroidView, ProxyViewGroup):
 
         """
         super(AndroidViewGroup, self).child_added(child)
+        if child.widget is None:
+            return
+
+        #: Wait until the batch is sent and insert all the children added in
+        #: the meantime at once.
+        pending = self._pending_children
+        if pending is None:
+            self._pending_children = [child]
+            self.get_context().before_send(self.add_pending_children)
+        else:
+            pending.append(child)
+
+    def add_pending_children(self):
+        """ Insert the views of the children added since the last batch.
+        Each child is placed after the view of its previous sibling and each
+        run of adjacent children is inserted with one call.
 
+        """
+        pending = self._pending_children
+        if pending is None:
+            return
+        self._pending_children = None
+        if not self.widget:
+            return
+        siblings = self.declaration.children
+        positions = {c: siblings.index(c.declaration) for c in pending
+                     if c.widget is not None}
+        placed = {}
+        runs = []
+        for child in sorted(positions, key=positions.get):
+            start = self.find_view_index(positions[child], placed)
+            placed[child] = start
+            if runs and runs[-1][0] + len(runs[-1][1]) == start:
+                runs[-1][1].append(child)
+            else:
+                runs.append((start, [child]))
+        if not runs:
+            return
+        views = self._child_views
+        for start, children in runs:
+            self.add_views(start, [c.widget for c in children],
+                           [c.layout_params for c in children])
+            views[start:start] = children
+        self.update_child_index(runs[0][0])
+
+    def find_view_index(self, position, placed=None):
+        """ Find the index the view of a child should have within the view
+        group. This is one after the view of the nearest previous sibling
+        that has one.
+
+        Parameters
+        ----------
+        position: int
+            Index of the child's declaration within the declaration's children
+        placed: dict
+            Children that are being inserted before this one mapped to the
+            index they will have. Any views after the nearest existing sibling
+            are shifted by the number of these.
+
+        """
+        siblings = self.declaration.children
+        index = self._child_index
+        placed = placed or {}
+        for i in range(position - 1, -1, -1):
+            proxy = getattr(siblings[i], 'proxy', None)
+            if proxy in placed:
+                return placed[proxy] + 1
+            elif proxy in index:
+                return index[proxy] + 1 + len(placed)
+        return len(placed)
+
+    def update_child_index(self, start, end=None):
+        """ Update the index of the children whose views were shifted """
+        index = self._child_index
+        views = self._child_views
+        for i in range(start, len(views) if end is None else end):
+            index[views[i]] = i
+
+    def add_views(self, start, views, params):
+        """ Insert the views at the given index using one bridge call.
+
+        Parameters
+        ----------
+        start: int
+            Index of the first view within this view group
+        views: list
+            The views to insert in order
+        params: list
+            The LayoutParams of each view or None to use the defaults
+
+        """
         widget = self.widget
-        #: TODO: Should index be cached?
-        for i, child_widget in enumerate(self.child_widgets()):
-            if child_widget == child.widget:
-                if child.layout_params:
-                    widget.addView_(child_widget, i,
-                                             child.layout_params)
-                else:
-                    widget.addView(child_widget, i)
+        if len(views) == 1:
+            if params[0]:
+                widget.addView_(views[0], start, params[0])
+            else:
+                widget.addView(views[0], start)
+            return
+        Bridge.addViews(widget, [encode(v) for v in views], start,
+                        [encode(p) if p else None for p in params])
 
     def child_moved(self, child):
-        """ Handle the child moved event from the declaration.
+        """ Handle the child moved event from the declaration. The view is
+        moved after the view of its new previous sibling with one call.
 
         """
-        super(AndroidViewGroup, self).child_moved(child)
-        #: Remove and re-add in correct spot
-        self.child_removed(child)
-        self.child_added(child)
+        index = self._child_index
+        old = index.pop(child, None)
+        if old is None:
+            #: Not added yet, it's placed when the pending children are
+            return
+        siblings = self.declaration.children
+        new = self.find_view_index(siblings.index(child.declaration))
+        if new > old:
+            #: The views after it shift down once it's removed
+            new -= 1
+        views = self._child_views
+        del views[old]
+        views.insert(new, child)
+        self.update_child_index(min(old, new), max(old, new) + 1)
+        if new != old:
+            Bridge.moveView(self.widget, child.widget, new)
 
     def child_removed(self, child):
         """ Handle the child removed event from the declaration.
@@ -120,6 +239,15 @@ class AndroidViewGroup(AndroidView, ProxyViewGroup):
 
         """
         super(AndroidViewGroup, self).child_removed(child)
+        pending = self._pending_children
+        if pending and child in pending:
+            #: Never added to the view
+            pending.remove(child)
+            return
+        index = self._child_index.pop(child, None)
+        if index is not None:
+            del self._child_views[index]
+            self.update_child_index(index)
         if child.widget is not None:
             self.widget.removeView(child.widget)
 
@@ -16,6 +16,7 @@ from enamlnative.widgets.view_pager import (
 )
 from enamlnative.widgets.view import coerce_gravity, coerce_size
 
+from enamlnative.core.bridge import INTERNED
 from .android_view import LayoutParams
 from .android_view_group import AndroidViewGroup, ViewGroup
 from .android_fragment import AndroidFragment
@@ -273,7 +274,10 @@ class AndroidViewPager(AndroidViewGroup, ProxyViewPager):
     def apply_layout(self, child, layout):
         super(AndroidViewPager, self).apply_layout(child, layout)
         if 'gravity' in layout:
-            child.layout_params.gravity = coerce_gravity(layout['gravity'])
+            #: Copy the params if they're shared before changing them
+            params = INTERNED.detach(child.layout_params)
+            params.gravity = coerce_gravity(layout['gravity'])
+            child.layout_params = params
 
 
 class AndroidPagerTitleStrip(AndroidViewGroup, ProxyPagerTitleStrip):
@@ -10,6 +10,7 @@ The full license is in the file LICENSE, distributed with this software.
 """
 import nativehooks #: Created by the ndk-build in pybridge.c
 from atom.api import Float, Value, Int, List, Unicode, Typed, Dict, Event
+from time import time
 from enaml.application import ProxyResolver
 from . import factories
 from .android_activity import Activity
@@ -69,6 +70,14 @@ class AndroidApplication(BridgedApplication):
          """
         return Activity(__id__=-1)
 
+    def _default_bridge_schema(self):
+        """ The java bridge supports referencing definitions by id """
+        return True
+
+    def _default_bridge_bulk_delete(self):
+        """ The java bridge supports deleting objects in bulk """
+        return True
+
     # -------------------------------------------------------------------------
     # AndroidApplication Constructor
     # -------------------------------------------------------------------------
@@ -80,6 +89,9 @@ class AndroidApplication(BridgedApplication):
         super(AndroidApplication, self).__init__(*args, **kwargs)
         self.resolver = ProxyResolver(factories=factories.ANDROID_FACTORIES)
 
+        #: The java bridge decodes typed arrays
+        bridge.TYPED_ARRAYS = True
+
     def init_widget(self):
         """ Initialize on the first call
 
@@ -98,10 +110,21 @@ class AndroidApplication(BridgedApplication):
         activity.addConfigurationChangedListener(activity.getId())
         activity.onConfigurationChanged.connect(self.on_configuration_changed)
 
-        activity.getWindow().then(self.init_window)
+        #: Add a FrameListener if the flush policy aligns with the frames
+        if self.flush_policy.frame_clock:
+            activity.addFrameListener(activity.getId())
+            activity.onFrame.connect(self.on_activity_frame)
+
+        self.init_window(activity.getWindow())
 
     def init_window(self, window):
-        """
+        """ Initialize the window. The window is used immediately so the
+        calls are queued against the pending result of `getWindow`.
+
+        Parameters
+        ----------
+        window: Int or Future
+            The id of the window or a future that resolves to it
 
         """
         self.window = Window(__id__=window)
@@ -179,11 +202,8 @@ class AndroidApplication(BridgedApplication):
         """
         from .android_toast import Toast
 
-        def on_toast(ref):
-            t = Toast(__id__=ref)
-            t.show()
-
-        Toast.makeText(self, msg, 1 if long else 0).then(on_toast)
+        t = Toast(__id__=Toast.makeText(self, msg, 1 if long else 0))
+        t.show()
 
     def on_activity_lifecycle_changed(self, state):
         """ Update the state when the android app is paused, resumed, etc..
@@ -194,6 +214,14 @@ class AndroidApplication(BridgedApplication):
         """
         self.state = state
 
+    def on_activity_frame(self, frame_time):
+        """ Called by the activity's Choreographer at the start of a frame.
+        The frame time uses the native monotonic clock so the time the
+        event is received is passed to the flush policy instead.
+
+        """
+        self.on_frame(time())
+
     def on_back_pressed(self):
         """ Fire the `back_pressed` event with a dictionary with a 'handled'
         key when the back hardware button is pressed
@@ -17,6 +17,74 @@ from ..core.bridge import (
 )
 
 
+def compile_packer(name, signature):
+    """ Create a function that packs the arguments of a call to the java
+    method with the given name and signature. All the work that does not
+    depend on the arguments is done once here instead of on every call.
+
+    Parameters
+    ----------
+    name: str
+        Name of the method, a trailing underscore used to avoid python
+        keywords is removed.
+    signature: tuple
+        The java types of the arguments. If the last type ends with "..."
+        the method takes a variable number of arguments of that type.
+
+    Returns
+    -------
+    packer: callable
+        A function that takes a tuple of arguments and returns the
+        ("methodName", [list, of, encoded, args]) of the call.
+
+    """
+    name = name.rstrip("_")
+    n = len(signature)
+
+    def invalid(args):
+        return ValueError("Invalid number of arguments: Given {}, "
+                          "expected {}".format(args, signature))
+
+    if signature and signature[-1].endswith("..."):
+        varg = signature[-1].replace('...', '')
+        fixed = signature[:-1]
+
+        def pack(args):
+            return (name, [(sig, encode(arg)) for sig, arg in zip(fixed, args)]
+                    + [(varg, encode(arg)) for arg in args[n-1:]])
+
+    elif n == 0:
+        def pack(args):
+            if args:
+                raise invalid(args)
+            return (name, [])
+
+    elif n == 1:
+        sig = signature[0]
+
+        def pack(args):
+            if len(args) != 1:
+                raise invalid(args)
+            return (name, [(sig, encode(args[0]))])
+
+    elif n == 2:
+        sig0, sig1 = signature
+
+        def pack(args):
+            if len(args) != 2:
+                raise invalid(args)
+            return (name, [(sig0, encode(args[0])), (sig1, encode(args[1]))])
+
+    else:
+        def pack(args):
+            if len(args) != n:
+                raise invalid(args)
+            return (name, [(sig, encode(arg))
+                           for sig, arg in zip(signature, args)])
+
+    return pack
+
+
 class JavaMethod(BridgeMethod):
     """ Description of a method of a View (or subclass) in Java. When called, 
     this serializes call, packs the arguments, and delegates handling to a 
@@ -25,45 +93,21 @@ class JavaMethod(BridgeMethod):
     """
 
     def pack_args(self, obj, *args, **kwargs):
-        signature = self.__signature__
-        name = self.name.rstrip("_")
-        vargs = signature and signature[-1].endswith("...")
-        if not vargs and (len(args) != len(signature)):
-            raise ValueError(
-                "Invalid number of arguments: Given {}, expected {}"
-                .format(args, signature))
-        if vargs:
-            varg = signature[-1].replace('...', '')
-            return (name, [
-                msgpack_encoder(
-                    signature[i] if i+1 < len(signature) else varg, args[i])
-                for i in range(len(args))
-            ])
-
-        return (name, [msgpack_encoder(sig, arg)
-                       for sig, arg in zip(signature, args)])
+        packer = self.__packer__
+        if packer is None:
+            packer = self.__packer__ = compile_packer(self.name,
+                                                      self.__signature__)
+        return packer(args)
 
 
 class JavaStaticMethod(BridgeStaticMethod):
 
     def pack_args(self, *args, **kwargs):
-        signature = self.__signature__
-        name = self.name.rstrip("_")
-        vargs = signature and signature[-1].endswith("...")
-        if not vargs and (len(args) != len(signature)):
-            raise ValueError(
-                "Invalid number of arguments: Given {}, expected {}"
-                .format(args, signature))
-        if vargs:
-            varg = signature[-1].replace('...', '')
-            return (name, [
-                msgpack_encoder(signature[i]
-                                if i+1 < len(signature) else varg, args[i])
-                for i in range(len(args))
-                ])
-
-        return (name, [msgpack_encoder(sig, arg)
-                       for sig, arg in zip(signature, args)])
+        packer = self.__packer__
+        if packer is None:
+            packer = self.__packer__ = compile_packer(self.name,
+                                                      self.__signature__)
+        return packer(args)
 
 
 class JavaField(BridgeField):
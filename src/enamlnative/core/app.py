@@ -13,12 +13,15 @@ import json
 import traceback
 from atom.api import (
     Atom, Enum, Callable, List, Instance, Value, Int, Unicode, Bool, Dict,
-    Float
+    Float, set_default
 )
 from enaml.application import Application
 from . import bridge
 from .loop import EventLoop
+from .recorder import BridgeRecorder, Direction
 from time import time
+from weakref import ref
+from contextlib import contextmanager
 
 
 class Plugin(Atom):
@@ -41,6 +44,215 @@ class Plugin(Atom):
         return getattr(module, attr)
 
 
+class FlushPolicy(Atom):
+    """ Decides when events queued with `send_event` are sent over the
+    bridge. The default policy sends them on the next iteration of the event
+    loop or once they have been queued for longer than `max_delay`.
+
+    """
+    #: Maximum time in seconds the first event of a batch may be queued
+    max_delay = Float(0.005)
+
+    #: Maximum number of bytes of lower priority events sent with each batch.
+    #: At least one is sent with each batch so the lanes always drain.
+    lane_budget = Int(8192)
+
+    #: Whether the policy uses the native frame clock, see `on_frame`
+    frame_clock = Bool()
+
+    def schedule(self, app):
+        """ Called when the first event of a batch is queued.
+
+        Parameters
+        ----------
+        app: BridgedApplication
+            The application sending the events
+
+        """
+        app.deferred_call(app._bridge_send)
+
+    def should_flush(self, app, dt):
+        """ Called each time an event is queued.
+
+        Parameters
+        ----------
+        app: BridgedApplication
+            The application sending the events
+        dt: float
+            Time in seconds since the first event of the batch was queued
+
+        Returns
+        -------
+        result: bool
+            Whether the batch should be sent now.
+
+        """
+        return dt > self.max_delay
+
+    def on_frame(self, app, timestamp):
+        """ Called when a frame clock or tick source signals a new frame.
+
+        Parameters
+        ----------
+        app: BridgedApplication
+            The application sending the events
+        timestamp: float
+            Time the frame started in seconds
+
+        """
+        pass
+
+
+class BridgeLane(Atom):
+    """ Encoded events of a priority lower than `Priority.HIGH` that are
+    waiting to be sent.
+
+    """
+    #: Queued (ptrs, data) entries where ptrs are the ids of the objects the
+    #: event depends on. Entries of replaced setters are None.
+    entries = List()
+
+    #: Index of the entry of each queued idempotent setter by ptr then
+    #: bridge id
+    setters = Dict()
+
+    #: Number of queued entries that depend on each object id
+    targets = Dict()
+
+    #: Number of queued entries
+    count = Int()
+
+    def add(self, ptrs, data, key):
+        """ Add an event to the lane. If key is given and a setter with the
+        same key is queued it's replaced.
+
+        Returns
+        -------
+        size: int
+            The number of bytes of the replaced event or 0
+
+        """
+        entries = self.entries
+        setters = self.setters
+        size = 0
+        if key is not None:
+            ptr, bridge_id = key
+            calls = setters.get(ptr)
+            if calls is None:
+                calls = setters[ptr] = {}
+            else:
+                replaced = calls.get(bridge_id)
+                if replaced is not None:
+                    size = len(entries[replaced][1])
+                    self._remove(replaced)
+            calls[bridge_id] = len(entries)
+        elif setters:
+            for ptr in ptrs:
+                setters.pop(ptr, None)
+        entries.append((ptrs, data))
+        targets = self.targets
+        for ptr in ptrs:
+            targets[ptr] = targets.get(ptr, 0) + 1
+        self.count += 1
+        return size
+
+    def _remove(self, i):
+        """ Remove the entry at the given index """
+        ptrs, data = self.entries[i]
+        self.entries[i] = None
+        targets = self.targets
+        for ptr in ptrs:
+            n = targets[ptr] - 1
+            if n:
+                targets[ptr] = n
+            else:
+                del targets[ptr]
+        self.count -= 1
+
+    def last_index(self, ptr):
+        """ Index of the last entry that depends on the given object """
+        entries = self.entries
+        for i in range(len(entries)-1, -1, -1):
+            entry = entries[i]
+            if entry is not None and ptr in entry[0]:
+                return i
+        return -1
+
+    def take(self, end):
+        """ Remove the first entries up to end and return them """
+        entries = self.entries
+        taken = []
+        for i in range(end):
+            if entries[i] is not None:
+                taken.append(entries[i])
+                self._remove(i)
+        del entries[:end]
+        setters = {}
+        for ptr, calls in self.setters.items():
+            calls = {k: i-end for k, i in calls.items() if i >= end}
+            if calls:
+                setters[ptr] = calls
+        self.setters = setters
+        return taken
+
+
+class FrameFlushPolicy(FlushPolicy):
+    """ A policy that sends at most one batch per frame so large updates are
+    not split across several frames.
+
+    Events are sent before the next frame leaving `native_budget` seconds
+    for the native side to process them. If a frame clock is attached (ie
+    `app.on_frame` is called) the deadlines are aligned with the frames and
+    any pending events are sent on each tick.
+
+    On Android the activity's Choreographer is the frame clock. It ticks
+    after each batch is applied so updates that keep coming, such as
+    animations and scrolling, are sent in step with the frames. The first
+    batch after the UI was idle is sent on the estimated deadline. iOS has
+    no frame clock yet so only the estimated deadlines are used there.
+
+    """
+    #: Use the native frame clock
+    frame_clock = set_default(True)
+
+    #: Time between frames in seconds
+    frame_interval = Float(1/60.0)
+
+    #: Time reserved for the native side to process the batch each frame
+    native_budget = Float(0.004)
+
+    #: Time the last frame started
+    last_frame = Float()
+
+    #: Incremented each time a batch is scheduled so stale callbacks
+    #: do not send the next batch early
+    _scheduled = Int()
+
+    def _default_max_delay(self):
+        #: Only send early if a batch was somehow held for more than a frame
+        return self.frame_interval
+
+    def schedule(self, app):
+        now = time()
+        interval = self.frame_interval
+        deadline = (self.last_frame or now) + interval - self.native_budget
+        if deadline <= now:
+            #: Skip to the deadline of the next frame
+            deadline += interval * (1 + int((now - deadline) / interval))
+        self._scheduled += 1
+        app.timed_call((deadline - now) * 1000, self._on_deadline, app,
+                       self._scheduled)
+
+    def _on_deadline(self, app, scheduled):
+        """ Send the batch if it has not already been sent """
+        if scheduled == self._scheduled:
+            app._bridge_send()
+
+    def on_frame(self, app, timestamp):
+        self.last_frame = timestamp
+        app._bridge_send()
+
+
 class BridgedApplication(Application):
     """ An abstract implementation of an Enaml application.
 
@@ -85,15 +297,105 @@ class BridgedApplication(Application):
     #: Event loop
     loop = Instance(EventLoop)
 
-    #: Events to send to the bridge
-    _bridge_queue = List()
+    #: Events to send to the bridge. Events are encoded as they are queued.
+    _bridge_queue = Instance(bytearray, factory=bridge.create_batch)
+
+    #: Buffer that is swapped in for the queue when the queue is sent
+    _bridge_spare = Instance(bytearray, factory=bridge.create_batch)
+
+    #: Number of events in the queue
+    _bridge_count = Int()
+
+    #: Packer used to encode events
+    _bridge_packer = Value(factory=bridge.create_packer)
+
+    #: Byte ranges of idempotent setter events in the queue that can still
+    #: be replaced. Maps the object id to a dict of bridge id to range.
+    _bridge_setters = Dict()
+
+    #: Byte ranges of events in the queue that were replaced
+    _bridge_removed = List()
+
+    #: Ids of native objects to delete with the next batch
+    _bridge_deleted = List()
+
+    #: Resolved event handlers of bridge objects. Maps the ptr to a tuple of
+    #: a weakref to the object and a dict of the handlers by method name
+    _bridge_handlers = Dict()
+
+    #: Lanes of the events with a priority lower than HIGH. The first lane
+    #: is for the LOW priority.
+    _bridge_lanes = List()
+
+    #: Priority of events sent without one, see `priority`
+    _bridge_priority = Int()
+
+    #: Commands that may be sent with a lower priority. Anything else, such
+    #: as creating objects, must be sent right away as other events may
+    #: depend on it.
+    _bridge_deferrable = (bridge.Command.METHOD, bridge.Command.FIELD,
+                          bridge.Command.STATIC_METHOD)
+
+    #: Decides when queued events are sent
+    flush_policy = Instance(FlushPolicy, ())
+
+    #: Send the queue early once this many events are queued so a large
+    #: update does not stall the native side with a single huge payload.
+    #: This also splits a `batch`. Set to 0 to disable.
+    bridge_max_events = Int(10000)
+
+    #: Send the queue early once it's larger than this many bytes.
+    #: Set to 0 to disable.
+    bridge_max_bytes = Int(1 << 20)
+
+    #: Futures waiting for the queued events to be sent, see `drained`
+    _bridge_drained = List()
+
+    #: Callbacks to invoke before the next batch is sent, see `before_send`
+    _bridge_pre_send = List()
+
+    #: Stats about the events sent over the bridge
+    bridge_metrics = Instance(bridge.BridgeMetrics, ())
 
-    #: Time last sent
-    _bridge_max_delay = Float(0.005)
+    #: Records the bridge traffic when set
+    recorder = Value()
 
-    #: Time last sent
+    #: Commands that may read or replace the state of the object with the id
+    #: given as the first argument. Queued idempotent setters of the object
+    #: can no longer be replaced once one of these is sent.
+    _bridge_barriers = (bridge.Command.METHOD, bridge.Command.FIELD,
+                        bridge.Command.DELETE)
+
+    #: Commands whose last argument is the list of encoded arguments. Any
+    #: objects passed in it are read by the call like a barrier.
+    _bridge_ref_commands = (bridge.Command.CREATE, bridge.Command.METHOD,
+                            bridge.Command.STATIC_METHOD,
+                            bridge.Command.FIELD)
+
+    #: Time the first event of the current batch was queued
     _bridge_last_scheduled = Float()
 
+    #: Number of active `begin_batch` calls
+    _bridge_batch_depth = Int()
+
+    #: A send was requested while a batch transaction was active
+    _bridge_held = Bool()
+
+    #: If true, class and method names are only sent the first time they are
+    #: used. Afterwards events reference them by the bridge id. The native
+    #: bridge implementation must support the `Command.DEF` event.
+    bridge_schema = Bool()
+
+    #: If true, destroyed objects are deleted with a single event per batch.
+    #: The native bridge implementation must support the
+    #: `Command.BULK_DELETE` event. Otherwise a `Command.DELETE` is sent for
+    #: each object.
+    bridge_bulk_delete = Bool()
+
+    #: Definitions sent to the bridge during this session. Maps the
+    #: bridge id to the (owner, name) of the descriptor.
+    _bridge_definitions = Dict()
+
     #: Entry points to load plugins
     plugins = Dict()
 
@@ -311,32 +613,372 @@ class BridgedApplication(Application):
 
             now: boolean
                 Send the event now
+            coalesce: tuple or None
+                A key of (object id, bridge id) for idempotent setters.
+                If an event with the same key is still queued it is
+                replaced by this one.
+            label: tuple or None
+                The (native class, name) of the call used for the
+                bridge metrics.
+            priority: int
+                A `bridge.Priority` of the event. Lower priority events
+                are sent after any higher priority ones, limited by the
+                `lane_budget` of the flush policy. Events on the same
+                object are always sent in order.
 
         """
-        n = len(self._bridge_queue)
+        priority = kwargs.get('priority', self._bridge_priority)
+        if priority and name in self._bridge_deferrable:
+            self._bridge_defer(priority, name, args, kwargs)
+            return
+
+        #: Ids of the objects the event may read
+        reads = self._bridge_reads(name, args)
+
+        #: Send any deferred events of the objects first to keep the order
+        if reads and self._bridge_has_deferred():
+            for ptr in reads:
+                self._bridge_promote(ptr)
+
+        n = self._bridge_count
+        queue = self._bridge_queue
+        setters = self._bridge_setters
+        metrics = self.bridge_metrics
+        key = kwargs.get('coalesce')
+        if key is not None:
+            ptr, bridge_id = key
+            calls = setters.get(ptr)
+            if calls is None:
+                calls = setters[ptr] = {}
+            else:
+                replaced = calls.get(bridge_id)
+                if replaced is not None:
+                    #: Last write wins, drop the previous call
+                    self._bridge_removed.append(replaced)
+                    self._bridge_count -= 1
+                    if metrics.enabled:
+                        metrics.discard_event(name, kwargs.get('label'),
+                                              replaced[1] - replaced[0])
+        if setters and reads:
+            #: Any other call that reads the objects must see the previous
+            #: values
+            for ptr in reads:
+                if key is None or ptr != key[0]:
+                    setters.pop(ptr, None)
 
         # Add to queue
-        self._bridge_queue.append((name, args))
+        start = len(queue)
+        queue.extend(self._bridge_packer.pack((name, args)))
+        self._bridge_count += 1
+        if key is not None:
+            calls[bridge_id] = (start, len(queue))
 
-        if n == 0:
-            # First event, send at next available time
-            self._bridge_last_scheduled = time()
-            self.deferred_call(self._bridge_send)
-            return
-        elif kwargs.get('now'):
+        if metrics.enabled:
+            metrics.record_event(name, kwargs.get('label'), len(queue) - start)
+
+        if kwargs.get('now') or self._bridge_overflowed():
             self._bridge_send(now=True)
             return
+        elif n == 0:
+            # First event, let the policy decide when to send it
+            self._bridge_last_scheduled = time()
+            self.flush_policy.schedule(self)
+            return
 
-        # If it's been over 5 ms since we last scheduled, run now
+        # Check if the batch should be sent early
         dt = time() - self._bridge_last_scheduled
-        if dt > self._bridge_max_delay:
-            self._bridge_send(now=True)
+        if self.flush_policy.should_flush(self, dt):
+            self._bridge_send()
+
+    def _bridge_reads(self, name, args):
+        """ Get the ids of the objects an event may read. These are the
+        object a barrier is sent to and any objects passed as arguments.
+
+        """
+        reads = [args[0]] if name in self._bridge_barriers else []
+        if name in self._bridge_ref_commands:
+            reads.extend(bridge.ref_ids(args[-1]))
+        return reads
+
+    def _bridge_overflowed(self):
+        """ Check if the queue is over the event count or byte thresholds.
+        This is checked after each event is added so the queue is only ever
+        split between events.
+
+        """
+        limit = self.bridge_max_events
+        if limit and self._bridge_count >= limit:
+            return True
+        limit = self.bridge_max_bytes
+        return bool(limit and len(self._bridge_queue) >= limit)
+
+    def drained(self):
+        """ Return a future that resolves once all of the events queued so
+        far, including any lower priority ones, have been sent. Producers
+        of a large amount of events can wait on this before queueing more
+        so the native side can keep up.
+
+            for page in pages:
+                items.extend(page)
+                yield app.drained()
+
+        Returns
+        -------
+        result: Future
+            A future that resolves with True
+
+        """
+        f = self.create_future()
+        if self._bridge_has_pending():
+            #: Make sure a send happens to resolve it
+            self._bridge_drained.append(f)
+            self.flush_policy.schedule(self)
+        else:
+            self.set_future_result(f, True)
+        return f
+
+    def _bridge_has_pending(self):
+        """ Check if anything is waiting to be sent. If so a send has
+        already been scheduled.
+
+        """
+        return bool(self._bridge_count or self._bridge_deleted or
+                    self._bridge_pre_send or self._bridge_has_deferred())
+
+    def _bridge_has_deferred(self):
+        """ Check if any lower priority events are waiting to be sent """
+        for lane in self._bridge_lanes:
+            if lane.count:
+                return True
+        return False
+
+    def _bridge_defer(self, priority, name, args, kwargs):
+        """ Queue the event in the lane of the given priority.
+
+        """
+        lanes = self._bridge_lanes
+        while len(lanes) < priority:
+            lanes.append(BridgeLane())
+
+        #: The event depends on the object it's called on and any objects
+        #: passed as arguments and is depended on by any objects bound to
+        #: its result
+        if name == bridge.Command.METHOD:
+            ptrs = (args[0], args[1]) if args[1] else (args[0],)
+        elif name == bridge.Command.STATIC_METHOD:
+            result_id = args[0] if len(args) == 3 else args[1]
+            ptrs = (result_id,) if result_id else ()
+        else:
+            ptrs = (args[0],)
+        refs = bridge.ref_ids(args[-1])
+        if refs:
+            ptrs += tuple(refs)
+
+        #: If the object has events in a lower lane they must be sent first
+        index = priority - 1
+        for i in range(len(lanes)-1, index, -1):
+            targets = lanes[i].targets
+            if any(ptr in targets for ptr in ptrs):
+                index = i
+                break
+
+        scheduled = self._bridge_count or self._bridge_has_deferred()
+        data = self._bridge_packer.pack((name, args))
+        replaced = lanes[index].add(ptrs, data, kwargs.get('coalesce'))
+
+        metrics = self.bridge_metrics
+        if metrics.enabled:
+            if replaced:
+                metrics.discard_event(name, kwargs.get('label'), replaced)
+            metrics.record_event(name, kwargs.get('label'), len(data))
+
+        if not scheduled:
+            self._bridge_last_scheduled = time()
+            self.flush_policy.schedule(self)
+
+    def _bridge_append(self, entries):
+        """ Append deferred events to the queue """
+        queue = self._bridge_queue
+        setters = self._bridge_setters
+        for ptrs, data in entries:
+            queue.extend(data)
+            #: Queued setters of the objects may no longer be replaced
+            if setters:
+                for ptr in ptrs:
+                    setters.pop(ptr, None)
+        self._bridge_count += len(entries)
+
+    def _bridge_promote(self, ptr):
+        """ Move the deferred events up to the last one that depends on the
+        object with the given id into the queue so they're sent first.
+
+        """
+        for lane in self._bridge_lanes:
+            if ptr in lane.targets:
+                self._bridge_append(lane.take(lane.last_index(ptr) + 1))
+
+    def _bridge_drain_lanes(self):
+        """ Move deferred events into the queue within the lane budget. The
+        higher priority lanes are drained first.
+
+        """
+        budget = self.flush_policy.lane_budget
+        sent = False
+        for lane in self._bridge_lanes:
+            end = 0
+            for entry in lane.entries:
+                if budget <= 0 and sent:
+                    break
+                end += 1
+                if entry is not None:
+                    budget -= len(entry[1])
+                    sent = True
+            self._bridge_append(lane.take(end))
+            if budget <= 0:
+                break
+
+    def define_schema(self, bridge_id, owner, name, signature=()):
+        """ Define the owner class, name and signature of the descriptor with
+        the given bridge id. The definition is sent over the bridge the first
+        time it is used so subsequent events only need to send the id.
+
+        Parameters
+        ----------
+        bridge_id: int
+            The bridge id of the method, field, or class.
+        owner: str
+            The native class name that owns the descriptor.
+        name: str
+            The name of the method, field, or class.
+        signature: tuple
+            The signature of the method, field or constructor.
+
+        Returns
+        -------
+        result: bool
+            True if events may reference this descriptor by id only.
+
+        """
+        if not self.bridge_schema:
+            return False
+        defined = self._bridge_definitions.get(bridge_id)
+        if defined is None:
+            self._bridge_definitions[bridge_id] = (owner, name)
+            self.send_event(
+                bridge.Command.DEF,  #: method
+                bridge_id,
+                owner,
+                name,
+                list(signature),
+            )
+            return True
+
+        #: Names built at runtime (ex. with a prefix) must be sent in full
+        return defined[1] == name
+
+    def queue_delete(self, ptr):
+        """ Queue the native object with the given id to be deleted. The
+        ids are sent in a single event with the next batch. This is safe
+        to call from `__del__` as nothing is sent here. If nothing else is
+        waiting to be sent a send is scheduled.
+
+        Parameters
+        ----------
+        ptr: int
+            The id of the object to delete
+
+        """
+        if not self._bridge_has_pending():
+            self._bridge_last_scheduled = time()
+            self.flush_policy.schedule(self)
+        self._bridge_deleted.append(ptr)
+
+    def before_send(self, callback):
+        """ Invoke the callback before the next batch is sent. Use this to
+        merge updates made during a loop iteration or batch transaction
+        and send them once. Any events sent by the callback are included in
+        the batch.
+
+        Parameters
+        ----------
+        callback: callable
+            Called with no arguments
+
+        """
+        if not (self._bridge_count or self._bridge_pre_send or
+                self._bridge_has_deferred()):
+            self._bridge_last_scheduled = time()
+            self.flush_policy.schedule(self)
+        self._bridge_pre_send.append(callback)
+
+    def _bridge_run_pre_send(self):
+        """ Invoke the callbacks added with `before_send` including any
+        added while they run.
+
+        """
+        while self._bridge_pre_send:
+            callbacks = self._bridge_pre_send
+            self._bridge_pre_send = []
+            for callback in callbacks:
+                callback()
 
     def force_update(self):
         """ Force an update now. """
         #: So we don't get out of order
         self._bridge_send(now=True)
 
+    def begin_batch(self):
+        """ Hold sending events until `end_batch` is called so an update
+        is sent in a single batch. Calls can be nested.
+
+        """
+        self._bridge_batch_depth += 1
+
+    def end_batch(self):
+        """ End a batch started with `begin_batch`. When the outermost batch
+        ends any sends that were held are done now.
+
+        """
+        depth = self._bridge_batch_depth - 1
+        if depth < 0:
+            raise RuntimeError("end_batch called without a begin_batch")
+        self._bridge_batch_depth = depth
+        if depth == 0 and self._bridge_held:
+            self._bridge_held = False
+            self._bridge_send()
+
+    @contextmanager
+    def priority(self, priority):
+        """ A context manager that sends the events in the block with the
+        given priority unless one is given explicitly.
+
+            with app.priority(bridge.Priority.LOW):
+                notification.setProgress(100, progress, False)
+
+        """
+        previous = self._bridge_priority
+        self._bridge_priority = priority
+        try:
+            yield
+        finally:
+            self._bridge_priority = previous
+
+    @contextmanager
+    def batch(self):
+        """ A context manager that holds sending events until the block
+        exits.
+
+            with app.batch():
+                for item in items:
+                    view.addView(create_view(item))
+
+        """
+        self.begin_batch()
+        try:
+            yield
+        finally:
+            self.end_batch()
+
     def _bridge_send(self, now=False):
         """  Send the events over the bridge to be processed by the native
         handler.
@@ -345,36 +987,198 @@ class BridgedApplication(Application):
         ----------
         now: boolean
             Send all pending events now instead of waiting for deferred calls
-            to finish. Use this when you want to update the screen
+            to finish or a batch to end. Use this when you want to update the
+            screen
 
         """
-        if len(self._bridge_queue):
+        held = self._bridge_batch_depth and not now
+        if not held:
+            if self._bridge_pre_send:
+                self._bridge_run_pre_send()
+            if self._bridge_deleted:
+                self._bridge_queue_deleted()
+            if self._bridge_lanes:
+                self._bridge_drain_lanes()
+        n = self._bridge_count
+        if held:
+            #: Wait until the batch is complete
+            if (n or self._bridge_deleted or self._bridge_pre_send or
+                    self._bridge_has_deferred()):
+                self._bridge_held = True
+        elif n:
+            queue = self._bridge_queue
+            if self._bridge_removed:
+                data = bridge.compact_batch(queue, self._bridge_removed)
+            else:
+                data = queue
+            data = bridge.end_batch(data, n)
+            self.bridge_metrics.record(
+                n, len(data), time() - self._bridge_last_scheduled)
+
+            #: Swap in the spare so events sent during dispatch are queued
+            self._bridge_queue = self._bridge_spare or bridge.create_batch()
+            self._bridge_spare = None
+            self._bridge_count = 0
+            self._bridge_setters = {}
+            self._bridge_removed = []
+
             if self.debug:
                 print("======== Py --> Native ======")
-                for event in self._bridge_queue:
+                for event in bridge.loads(bytes(data)):
                     print(event)
                 print("===========================")
-            self.dispatch_events(bridge.dumps(self._bridge_queue))
-            self._bridge_queue = []
+            if self.recorder is not None:
+                self.recorder.record(Direction.OUT, data)
+            self.dispatch_events(memoryview(data))
+
+            #: Reuse the buffer if the dispatcher did not keep a reference
+            self._bridge_spare = bridge.reset_batch(queue)
+
+            if not self._bridge_count and self._bridge_has_deferred():
+                #: Send the rest of the lower priority events next
+                self._bridge_last_scheduled = time()
+                self.flush_policy.schedule(self)
+
+        if (not held and self._bridge_drained and
+                not self._bridge_has_pending()):
+            waiting = self._bridge_drained
+            self._bridge_drained = []
+            for f in waiting:
+                self.set_future_result(f, True)
+
+    def _bridge_queue_deleted(self):
+        """ Queue one event that deletes all the native objects that were
+        destroyed since the last batch and release their ids for reuse.
+
+        """
+        deleted = self._bridge_deleted
+        self._bridge_deleted = []
+        if self._bridge_has_deferred():
+            for ptr in deleted:
+                self._bridge_promote(ptr)
+        queue = self._bridge_queue
+        pack = self._bridge_packer.pack
+        if not self._bridge_count:
+            self._bridge_last_scheduled = time()
+        start = len(queue)
+        if self.bridge_bulk_delete:
+            command = bridge.Command.BULK_DELETE
+            queue.extend(pack((command, (deleted,))))
+            self._bridge_count += 1
+        else:
+            command = bridge.Command.DELETE
+            for ptr in deleted:
+                queue.extend(pack((command, (ptr,))))
+            self._bridge_count += len(deleted)
+
+        metrics = self.bridge_metrics
+        if metrics.enabled:
+            metrics.record_event(command, None, len(queue) - start)
+
+        #: The delete is now ordered before any reuse of the ids
+        release = bridge.CACHE.release_id
+        handlers = self._bridge_handlers
+        for ptr in deleted:
+            release(ptr)
+            handlers.pop(ptr, None)
+
+    def start_recording(self, path):
+        """ Record all of the bridge traffic to the given file so it can be
+        replayed later with a `BridgeReplayer`.
+
+        Parameters
+        ----------
+        path: str
+            Path of the file to save the recording to
+
+        """
+        self.stop_recording()
+        recorder = BridgeRecorder(path=path)
+        recorder.start()
+        self.recorder = recorder
+
+    def stop_recording(self):
+        """ Stop recording the bridge traffic and close the file """
+        recorder = self.recorder
+        if recorder is not None:
+            self.recorder = None
+            recorder.stop()
 
     def dispatch_events(self, data):
         """ Send events to the bridge using the system specific implementation.
 
+        Parameters
+        ----------
+        data: memoryview
+            A view of the encoded events. The buffer is reused once this
+            returns so implementations must copy it if it's needed later.
+
         """
         raise NotImplementedError
 
     def process_events(self, data):
         """ The native implementation must use this call to """
-        events = bridge.loads(data)
+        if self.recorder is not None:
+            self.recorder.record(Direction.IN, data)
         if self.debug:
             print("======== Py <-- Native ======")
-            for event in events:
+            for event in bridge.loads(data):
                 print(event)
             print("===========================")
-        for event in events:
+
+        #: Dispatch each event as soon as it's decoded
+        unpacker = bridge.create_unpacker()
+        unpacker.feed(data)
+        for i in range(unpacker.read_array_header()):
+            event = unpacker.unpack()
             if event[0] == 'event':
                 self.handle_event(event)
 
+    def get_handler(self, ptr, method):
+        """ Get the object and handler for an event. Handlers of bridge
+        objects are cached until the object is destroyed so frequent
+        events such as touches and sensor updates skip the lookup.
+
+        Parameters
+        ----------
+        ptr: int
+            The id of the object
+        method: str
+            The name of the method handling the event
+
+        Returns
+        -------
+        result: tuple
+            The (object, handler) of the event
+
+        """
+        obj, handler = self._bridge_resolve(ptr, method)
+        if isinstance(handler, bridge.BridgeMethod):
+            handler = handler.__fget__(obj)
+        return obj, handler
+
+    def _bridge_resolve(self, ptr, method):
+        """ Like `get_handler` but bridge methods are returned unbound, as
+        the descriptor, so events can call them without binding them first.
+
+        """
+        entry = self._bridge_handlers.get(ptr)
+        if entry is not None:
+            obj = entry[0]()
+            handler = entry[1].get(method)
+            if obj is not None and handler is not None:
+                return obj, handler
+        obj, handler = bridge.get_handler(ptr, method)
+
+        #: Only bridge methods are cached, the object is referenced weakly
+        #: so the cache does not keep it alive
+        if isinstance(handler, bridge.BoundBridgeMethod):
+            handler = handler.method
+            if entry is None or entry[0]() is not obj:
+                entry = self._bridge_handlers[ptr] = (ref(obj), {})
+            entry[1][method] = handler
+        return obj, handler
+
     def handle_event(self, event):
         """ When we get an 'event' type from the bridge
         handle it by invoking the handler and if needed
@@ -385,8 +1189,17 @@ class BridgedApplication(Application):
         obj = None
         result = None
         try:
-            obj, handler = bridge.get_handler(ptr, method)
-            result = handler(*[v for t, v in args])
+            obj, handler = self._bridge_resolve(ptr, method)
+            values = [arg[1] for arg in args]
+            if isinstance(handler, bridge.BridgeMethod):
+                if not handler.__buffers__:
+                    #: Pass typed arrays as tuples unless buffers were
+                    #: requested
+                    values = [bridge.arrays_to_tuples(v) for v in values]
+                result = handler(obj, *values)
+            else:
+                values = [bridge.arrays_to_tuples(v) for v in values]
+                result = handler(*values)
         except bridge.BridgeReferenceError as e:
             #: Log the event, don't blow up here
             msg = "Error processing event: {} - {}".format(
@@ -436,6 +1249,14 @@ class BridgedApplication(Application):
         #: Pass to event loop thread
         self.deferred_call(self.process_events, data)
 
+    def on_frame(self, timestamp):
+        """ Called by a frame clock or tick source at the start of each
+        frame. The flush policy may use this to align sending events with
+        the frames.
+
+        """
+        self.flush_policy.on_frame(self, timestamp)
+
     def on_pause(self):
         """ Called when the app is paused.
         """
@@ -9,16 +9,348 @@ Created on June 21, 2017
 
 @author: jrm
 """
+import sys
+import array
+import struct
 import msgpack
-import functools
-from atom.api import Atom, Property, Instance, ForwardInstance, Dict, Unicode, Tuple, Int
-from weakref import WeakValueDictionary
+from atom.api import (
+    Atom, Property, Instance, ForwardInstance, Dict, Unicode, Tuple, Int,
+    Float, Bool, List
+)
+from bisect import bisect_left
+from collections import deque
+from time import time
+from weakref import WeakValueDictionary, ref
 from contextlib import contextmanager
 
-CACHE = WeakValueDictionary()
+#: Number of low bits of an id used for the generation of the slot. Ids
+#: are (slot << GENERATION_BITS) | generation so up to 256 live objects
+#: are encoded with at most 3 bytes and 16 million with 5. Free slots are
+#: reused in the order they were released so a stale id only aliases a
+#: new object after its slot was reused 256 times.
+GENERATION_BITS = 8
+GENERATION_MASK = (1 << GENERATION_BITS) - 1
+
+
+def _reserved():
+    """ Placeholder for a slot that was allocated but not yet bound """
+    return None
+
+
+def _retired():
+    """ Placeholder for a slot of a destroyed object that is waiting for the
+    native object to be deleted before it can be reused.
+    """
+    return None
+
+
+class HandleTable(object):
+    """ A table of the objects that can be referenced over the bridge.
+
+    Ids index a slot in an array of weak references so lookups do not need
+    to hash and slots of released objects are reused, keeping the ids small.
+    Each slot has a generation that changes every time it's reused, so a
+    stale id held by the native side does not resolve to the new object.
+
+    Ids of released objects are reused oldest first. Bridge objects are
+    retired when they're destroyed and their ids are released once the
+    delete of the native object is queued, so an id is never reused before
+    the native side is done with it. Objects that are never released
+    explicitly (such as futures) are collected by a sweep of the dead
+    references when the table needs to grow. If `on_collect` is set the
+    collected ids are retired and passed to it so the native side can drop
+    any result it stored with them, otherwise they're released.
+
+    Ids less than one (such as the -1 of the Activity) are not allocated by
+    the table and are stored separately.
+
+    """
+    __slots__ = ('refs', 'generations', 'free', 'external', 'sweep_at',
+                 'on_collect')
+
+    def __init__(self):
+        #: Slot 0 is never used as an id of 0 means "no result"
+        self.refs = [None]
+        self.generations = [0]
+        self.free = deque()
+        self.external = {}
+        self.sweep_at = 1024
+        self.on_collect = None
+
+    def allocate(self, obj=None):
+        """ Allocate an id for the object. If no object is given the id is
+        reserved until an object is bound to it.
+
+        """
+        free = self.free
+        refs = self.refs
+        if not free and len(refs) >= self.sweep_at:
+            self.sweep()
+        r = _reserved if obj is None else ref(obj)
+        if free:
+            slot = free.popleft()
+            refs[slot] = r
+        else:
+            slot = len(refs)
+            refs.append(r)
+            self.generations.append(0)
+        return (slot << GENERATION_BITS) | self.generations[slot]
+
+    def sweep(self):
+        """ Collect the slots of any objects that no longer exist """
+        refs = self.refs
+        generations = self.generations
+        free = self.free
+        on_collect = self.on_collect
+        collected = []
+        for slot in range(1, len(refs)):
+            r = refs[slot]
+            if r is not None and r is not _reserved and r is not _retired \
+                    and r() is None:
+                if on_collect is not None:
+                    #: Released once the delete is queued
+                    refs[slot] = _retired
+                    collected.append((slot << GENERATION_BITS) |
+                                     generations[slot])
+                    continue
+                refs[slot] = None
+                generations[slot] = (generations[slot] + 1) & GENERATION_MASK
+                free.append(slot)
+        self.sweep_at = max(1024, 2 * (len(refs) - len(free)))
+        if collected:
+            on_collect(collected)
+
+    def release(self, obj):
+        """ Release the id of the object so it can be reused. Nothing is
+        done if the id is now used by a different object.
+
+        """
+        id = obj.__id__
+        if id < 1:
+            r = self.external.get(id)
+            if r is not None:
+                o = r()
+                if o is obj or o is None:
+                    del self.external[id]
+            return
+        slot = id >> GENERATION_BITS
+        refs = self.refs
+        if (slot >= len(refs) or refs[slot] is None or
+                self.generations[slot] != id & GENERATION_MASK):
+            return
+        o = refs[slot]()
+        if o is obj or o is None:
+            refs[slot] = None
+            self.generations[slot] = (self.generations[slot] + 1) & \
+                GENERATION_MASK
+            self.free.append(slot)
+
+    def retire(self, obj):
+        """ Keep the slot of a destroyed object from being reused until
+        `release_id` is called after the native object is deleted.
+
+        """
+        id = obj.__id__
+        if id < 1:
+            return self.release(obj)
+        slot = id >> GENERATION_BITS
+        refs = self.refs
+        if (slot >= len(refs) or refs[slot] is None or
+                self.generations[slot] != id & GENERATION_MASK):
+            return
+        o = refs[slot]()
+        if o is obj or o is None:
+            refs[slot] = _retired
+
+    def release_id(self, id):
+        """ Release a slot that was retired so it can be reused. """
+        slot = id >> GENERATION_BITS
+        refs = self.refs
+        if (id < 1 or slot >= len(refs) or refs[slot] is not _retired or
+                self.generations[slot] != id & GENERATION_MASK):
+            return
+        refs[slot] = None
+        self.generations[slot] = (self.generations[slot] + 1) & \
+            GENERATION_MASK
+        self.free.append(slot)
+
+    def get(self, id, default=None):
+        """ Return the object with the given id or the default if it does not
+        exist or the id is stale.
+
+        """
+        if id < 1:
+            r = self.external.get(id)
+        else:
+            slot = id >> GENERATION_BITS
+            refs = self.refs
+            if slot >= len(refs) or \
+                    self.generations[slot] != id & GENERATION_MASK:
+                return default
+            r = refs[slot]
+        if r is None:
+            return default
+        obj = r()
+        return default if obj is None else obj
+
+    def __getitem__(self, id):
+        obj = self.get(id)
+        if obj is None:
+            raise KeyError(id)
+        return obj
+
+    def __setitem__(self, id, obj):
+        """ Bind the object to an id allocated by the table or an external id
+        """
+        if id < 1:
+            self.external[id] = ref(obj)
+            return
+        slot = id >> GENERATION_BITS
+        if slot >= len(self.refs) or \
+                self.generations[slot] != id & GENERATION_MASK:
+            raise BridgeReferenceError(
+                "Cannot bind to id={} it was not allocated or has been "
+                "released".format(id))
+        self.refs[slot] = ref(obj)
+
+    def __contains__(self, id):
+        return self.get(id) is not None
+
+    def __len__(self):
+        """ Number of slots in use """
+        return len(self.refs) - 1 - len(self.free) + len(self.external)
+
+
+def configure(obj, setup):
+    """ Set fields and call methods of a bridge object.
+
+    Parameters
+    ----------
+    obj: BridgeObject
+        The object to configure
+    setup: iterable
+        The (name, value) pairs to apply. If the name is a field of the
+        object it's set to the value otherwise the method with the name is
+        called with the value as the arguments.
+
+    Returns
+    -------
+    obj: BridgeObject
+        The object given
+
+    """
+    cls = type(obj)
+    for name, value in setup:
+        member = getattr(cls, name, None)
+        if isinstance(member, BridgeField):
+            setattr(obj, name, value)
+        elif isinstance(member, BridgeMethod):
+            member(obj, *value)
+        else:
+            getattr(obj, name)(*value)
+    return obj
+
+
+class InternTable(object):
+    """ A table of shared value-like bridge objects such as layout params.
+
+    Objects are keyed by their class, constructor arguments and the setup
+    done after they're created, so each distinct value is created once on
+    the native side. Shared objects must not be modified after they're
+    acquired.
+
+    The table counts the references held by their users with `retain` and
+    `release`. Once an object is no longer used it's removed from the table
+    so it's destroyed (and the native object deleted) like any other.
+
+    """
+    __slots__ = ('entries', 'owners')
+
+    def __init__(self):
+        #: Map of key to [obj, count]
+        self.entries = {}
+
+        #: Map of id(obj) to key
+        self.owners = {}
+
+    def acquire(self, cls, args=(), setup=()):
+        """ Get the shared object of the given class created with the
+        given arguments and setup.
+
+        Parameters
+        ----------
+        cls: BridgeObject subclass
+            The class of the object
+        args: tuple
+            Arguments passed to the constructor
+        setup: tuple
+            A tuple of (name, value) pairs applied with `configure` once
+            the object is created.
+
+        Returns
+        -------
+        obj: BridgeObject
+            The shared object. Users should `retain` it while it's in use.
+
+        """
+        key = (cls, args, setup)
+        entry = self.entries.get(key)
+        if entry is None:
+            obj = configure(cls(*args), setup)
+            entry = self.entries[key] = [obj, 0]
+            self.owners[id(obj)] = key
+        return entry[0]
+
+    def retain(self, obj):
+        """ Add a reference to a shared object. Does nothing if the object
+        is not in the table.
+
+        """
+        key = self.owners.get(id(obj))
+        if key is not None:
+            self.entries[key][1] += 1
+
+    def release(self, obj):
+        """ Remove a reference to a shared object and remove it from the
+        table once it's no longer referenced. Does nothing if the object is
+        not in the table.
+
+        """
+        key = self.owners.get(id(obj))
+        if key is None:
+            return
+        entry = self.entries[key]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.entries[key]
+            del self.owners[id(obj)]
+
+    def detach(self, obj):
+        """ Get an object equal to the given one that is not shared so it
+        can be modified. Objects that are not in the table are returned as
+        is.
+
+        """
+        key = self.owners.get(id(obj))
+        if key is None:
+            return obj
+        cls, args, setup = key
+        return configure(cls(*args), setup)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class BridgeReferenceError(ReferenceError):
+    pass
+
+
+CACHE = HandleTable()
+
+#: Shared value-like bridge objects
+INTERNED = InternTable()
 PROXY_CACHE = WeakValueDictionary()
 CLASS_CACHE = {}
-__global_id__ = 0
 __proxy_id__ = 0
 __property_id__ = 0
 
@@ -30,21 +362,33 @@ class Command:
     STATIC_METHOD = "sm"
     FIELD = "f"
     DELETE = "d"
+    BULK_DELETE = "bd"
     RESULT = "r"
     ERROR = "e"
     DEF = "def"
 
 
+class Priority:
+    #: Updates that respond to the user. These are all sent with every batch.
+    HIGH = 0
+
+    #: Background work such as progress updates. Sent after the high
+    #: priority events, within the lane budget of each batch.
+    LOW = 1
+
+    #: Work that can wait until the lower lanes are empty
+    IDLE = 2
+
+
 class ExtType:
     REF = 1
     PROXY = 2
+    ARRAY = 3
 
 
 def generate_id():
-    """ Generate an id for an object """
-    global __global_id__
-    __global_id__ += 1
-    return __global_id__
+    """ Reserve an id that an object will be bound to later """
+    return CACHE.allocate()
 
 
 def generate_property_id():
@@ -56,8 +400,7 @@ def generate_property_id():
 
 def tag_object_with_id(obj):
     """ Generate and assign a id for the object"""
-    obj.__id__ = generate_id()
-    CACHE[obj.__id__] = obj
+    obj.__id__ = CACHE.allocate(obj)
 
 
 def get_object_with_id(id):
@@ -66,11 +409,11 @@ def get_object_with_id(id):
 
 
 def _cleanup_id(obj):
-    """ Removes the object from the """
-    try:
-        del CACHE[obj.__id__]
-    except KeyError:
-        pass
+    """ Removes the object from the cache. A pipelined object shares the id
+    of the future it is bound to so only remove it if the entry is this
+    object.
+    """
+    CACHE.release(obj)
 
 
 def get_app_class():
@@ -81,14 +424,179 @@ def get_app_class():
     return BridgedApplication
 
 
+def _delete_collected(ids):
+    """ Queue deletes of the ids of objects that were collected without
+    being deleted, such as futures, so the native side drops any result it
+    stored with them before the ids are reused.
+    """
+    app = get_app_class().instance()
+    if app is None:
+        for id in ids:
+            CACHE.release_id(id)
+        return
+    for id in ids:
+        app.queue_delete(id)
+
+
+CACHE.on_collect = _delete_collected
+
+
+#: Typecodes of the typed array extension by kind and itemsize. The kind
+#: is "i" for signed, "u" for unsigned, and "f" for floating point.
+ARRAY_TYPECODES = {
+    ('i', 1): 'b', ('u', 1): 'B',
+    ('i', 2): 'h', ('u', 2): 'H',
+    ('i', 4): 'i', ('u', 4): 'I',
+    ('i', 8): 'q', ('u', 8): 'Q',
+    ('f', 4): 'f', ('f', 8): 'd',
+}
+
+
+def encode_array(obj):
+    """ Encode an array.array, memoryview, or numpy array as a typed array.
+
+    The data of the extension is the typecode of the items, the number of
+    dimensions, the size of each dimension as a uint32, followed by the raw
+    items in row major order. Everything is little endian.
+
+    """
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        #: Python 2 arrays do not support the new buffer protocol
+        data = obj.tostring()
+        fmt, itemsize, shape = obj.typecode, obj.itemsize, (len(obj),)
+    else:
+        data = view.tobytes()
+        fmt, itemsize, shape = view.format, view.itemsize, view.shape
+    swap = fmt[0] in '>!' or (fmt[0] not in '<' and sys.byteorder == 'big')
+    fmt = fmt.lstrip('@=<>!')
+    if fmt in 'fde':
+        kind = 'f'
+    elif fmt.islower():
+        kind = 'i'
+    else:
+        kind = 'u'
+    code = ARRAY_TYPECODES.get((kind, itemsize))
+    if code is None:
+        raise TypeError("Cannot encode an array of type {}".format(fmt))
+    if swap and itemsize > 1:
+        items = array.array(code, data)
+        items.byteswap()
+        data = items.tostring() if sys.version_info[0] < 3 else \
+            items.tobytes()
+    header = struct.pack('<cB%dI' % len(shape), code.encode(), len(shape),
+                         *shape)
+    return msgpack.ExtType(ExtType.ARRAY, header + data)
+
+
+def decode_array(data):
+    """ Decode a typed array as a memoryview over the received data. On
+    python 2 an array.array is returned.
+
+    """
+    code, ndim = struct.unpack_from('<cB', data)
+    shape = struct.unpack_from('<%dI' % ndim, data, 2)
+    data = memoryview(data)[2 + 4 * ndim:]
+    code = code.decode()
+    if not hasattr(data, 'cast'):
+        return array.array(code, data.tobytes())
+    if sys.byteorder == 'big':
+        items = array.array(code, data.tobytes())
+        items.byteswap()
+        data = memoryview(items).cast('B')
+    return data.cast(code, shape)
+
+
+def decode_ext(code, data):
+    """ Decode the extension types received from the bridge """
+    if code == ExtType.ARRAY:
+        return decode_array(data)
+    return msgpack.ExtType(code, data)
+
+
+def array_to_tuple(value):
+    """ Convert a decoded typed array into (nested) tuples of the items.
+    This is how arrays were received before typed arrays were supported.
+
+    """
+    items = value.tolist()
+    if getattr(value, 'ndim', 1) > 1:
+        def convert(items):
+            return tuple(convert(i) if isinstance(i, list) else i
+                         for i in items)
+        return convert(items)
+    return tuple(items)
+
+
+#: Types that typed arrays are decoded to
+DECODED_ARRAY_TYPES = {array.array, memoryview}
+
+
+def arrays_to_tuples(value):
+    """ Convert the decoded typed arrays in a value, including those in
+    dicts and tuples such as the values of a SensorEvent, with
+    `array_to_tuple`.
+
+    """
+    cls = value.__class__
+    if cls in DECODED_ARRAY_TYPES:
+        return array_to_tuple(value)
+    elif cls is tuple or cls is list:
+        return cls(arrays_to_tuples(v) for v in value)
+    elif cls is dict:
+        return {k: arrays_to_tuples(v) for k, v in value.items()}
+    return value
+
+
+#: Whether arrays are sent as typed arrays. The platform app sets this as
+#: not every native bridge can decode them. When disabled memoryviews are
+#: sent as binary data and other arrays as lists of their items.
+TYPED_ARRAYS = True
+
+#: Types that are encoded as typed arrays
+ARRAY_TYPES = {array.array, memoryview}
+try:
+    from numpy import ndarray
+    ARRAY_TYPES.add(ndarray)
+except ImportError:
+    pass
+
+
 def encode(obj):
     """ Encode an object for proper decoding by Java or ObjC
     """
     if hasattr(obj, '__id__'):
         return msgpack.ExtType(ExtType.REF, msgpack.packb(obj.__id__))
+    elif obj.__class__ in ARRAY_TYPES:
+        if TYPED_ARRAYS:
+            return encode_array(obj)
+        elif obj.__class__ is not memoryview:
+            return obj.tolist()
     return obj
 
 
+def ref_ids(args):
+    """ Get the ids of the objects referenced by the encoded arguments
+    including those in arrays of objects.
+
+    """
+    refs = []
+
+    def find(value):
+        cls = value.__class__
+        if cls is msgpack.ExtType:
+            if value.code == ExtType.REF:
+                refs.append(msgpack.unpackb(value.data))
+        elif cls is list or cls is tuple:
+            for v in value:
+                find(v)
+
+    for arg in args:
+        find(arg[1])
+    return refs
+
+
 def msgpack_encoder(sig, obj):
     """ When passing a BridgeObject encode it in a special way so
         it can properly be interpreted as a reference.
@@ -105,15 +613,248 @@ def dumps(data):
     return msgpack.dumps(data)
 
 
+#: Header of a msgpack array32 with a placeholder for the number of events.
+#: This allows encoding events as they are queued and filling in the count
+#: when the batch is sent.
+BATCH_HEADER = b'\xdd\x00\x00\x00\x00'
+
+
+def create_batch():
+    """ Create an empty buffer for encoding a batch of events """
+    return bytearray(BATCH_HEADER)
+
+
+def create_packer():
+    """ Create a packer for encoding events as they are queued. It uses the
+    same options as `dumps`.
+    """
+    return msgpack.Packer()
+
+
+def create_unpacker():
+    """ Create an unpacker for decoding events as they are read. It uses the
+    same options as `loads`.
+    """
+    return msgpack.Unpacker(use_list=False, raw=False, ext_hook=decode_ext)
+
+
+def end_batch(batch, count):
+    """ Fill in the number of events in the batch header """
+    struct.pack_into('>I', batch, 1, count)
+    return batch
+
+
+def compact_batch(batch, removed):
+    """ Return a copy of the batch without the removed byte ranges """
+    result = bytearray(BATCH_HEADER)
+    last = len(BATCH_HEADER)
+    for start, end in sorted(removed):
+        result += batch[last:start]
+        last = end
+    result += batch[last:]
+    return result
+
+
+def reset_batch(batch):
+    """ Clear the events from the batch so it can be reused. If the buffer is
+    still referenced (ex. by a memoryview) a new one is returned.
+    """
+    try:
+        del batch[len(BATCH_HEADER):]
+        return batch
+    except BufferError:
+        return create_batch()
+
+
 def loads(data):
     """ Decodes and processes events received from the bridge """
     #if not data:
     #    raise ValueError("Tried to load empty data!")
-    return msgpack.loads(data, use_list=False, raw=False)
+    return msgpack.loads(data, use_list=False, raw=False,
+                         ext_hook=decode_ext)
 
 
-class BridgeReferenceError(ReferenceError):
-    pass
+class Histogram(Atom):
+    """ A histogram of durations in seconds """
+
+    #: Upper bounds of each bucket, the last bucket contains anything larger
+    bounds = Tuple(default=(0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2,
+                            0.5, 1.0))
+
+    #: Number of values in each bucket
+    counts = List()
+
+    #: Number of values added
+    count = Int()
+
+    #: Sum of all values added
+    total = Float()
+
+    #: Largest value added
+    max = Float()
+
+    def _default_counts(self):
+        return [0] * (len(self.bounds) + 1)
+
+    def add(self, value):
+        """ Add a value to the histogram """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def summary(self):
+        """ Return a dict of the histogram """
+        return {
+            'bounds': list(self.bounds),
+            'counts': list(self.counts),
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0,
+            'max': self.max,
+        }
+
+
+class BridgeMetrics(Atom):
+    """ Statistics about the events sent over the bridge.
+
+    Batch stats are always recorded. The per command and per call counters
+    and the result latency histograms are only recorded when enabled.
+
+        app.bridge_metrics.enabled = True
+        ...
+        print(app.bridge_metrics.summary())
+
+    """
+
+    #: Record the per command and per call stats
+    enabled = Bool()
+
+    #: Number of batches sent
+    batches = Int()
+
+    #: Total number of events sent
+    events = Int()
+
+    #: Total number of bytes sent
+    bytes = Int()
+
+    #: Largest number of events sent in a batch
+    max_events = Int()
+
+    #: Largest number of bytes sent in a batch
+    max_bytes = Int()
+
+    #: Total time in seconds between the first event of each batch being
+    #: queued and the batch being sent
+    latency = Float()
+
+    #: Largest latency of a batch in seconds
+    max_latency = Float()
+
+    #: Latency of the last batch
+    last_latency = Float()
+
+    #: Count and encoded bytes of each command. Maps the command to a
+    #: list of [count, bytes]
+    commands = Dict()
+
+    #: Count and encoded bytes of each call. Maps the (native class, name)
+    #: to a list of [count, bytes]
+    calls = Dict()
+
+    #: Time from sending a call with a result to the result being set. Maps
+    #: the (native class, name) to a Histogram
+    results = Dict()
+
+    def record(self, events, size, latency):
+        """ Record a batch that was sent """
+        self.batches += 1
+        self.events += events
+        self.bytes += size
+        self.latency += latency
+        self.last_latency = latency
+        self.max_events = max(self.max_events, events)
+        self.max_bytes = max(self.max_bytes, size)
+        self.max_latency = max(self.max_latency, latency)
+
+    def record_event(self, command, label, size):
+        """ Record an event that was queued
+
+        Parameters
+        ----------
+        command: str
+            The Command of the event
+        label: tuple or None
+            The (native class, name) of the call
+        size: int
+            Number of bytes the event was encoded to
+
+        """
+        stats = self.commands.get(command)
+        if stats is None:
+            stats = self.commands[command] = [0, 0]
+        stats[0] += 1
+        stats[1] += size
+        if label is not None:
+            stats = self.calls.get(label)
+            if stats is None:
+                stats = self.calls[label] = [0, 0]
+            stats[0] += 1
+            stats[1] += size
+
+    def discard_event(self, command, label, size):
+        """ Remove an event recorded with `record_event` that was replaced
+        before it was sent
+
+        """
+        stats = self.commands.get(command)
+        if stats is not None:
+            stats[0] -= 1
+            stats[1] -= size
+        stats = self.calls.get(label) if label is not None else None
+        if stats is not None:
+            stats[0] -= 1
+            stats[1] -= size
+
+    def record_result(self, label, duration):
+        """ Record the time it took for the result of a call to be set """
+        histogram = self.results.get(label)
+        if histogram is None:
+            histogram = self.results[label] = Histogram()
+        histogram.add(duration)
+
+    def reset(self):
+        """ Clear all of the stats """
+        for name, member in self.members().items():
+            if isinstance(member, Float):
+                setattr(self, name, 0.0)
+            elif isinstance(member, Int):
+                setattr(self, name, 0)
+            elif isinstance(member, Dict):
+                setattr(self, name, {})
+
+    def summary(self):
+        """ Return a dict of the stats that can be encoded as json """
+        n = max(1, self.batches)
+        stats = {name: getattr(self, name) for name in (
+            'batches', 'events', 'bytes', 'max_events', 'max_bytes',
+            'latency', 'max_latency', 'last_latency')}
+        stats.update({
+            'avg_events': self.events / float(n),
+            'avg_bytes': self.bytes / float(n),
+            'avg_latency': self.latency / n,
+            'commands': {
+                k: {'count': v[0], 'bytes': v[1]}
+                for k, v in self.commands.items()},
+            'calls': {
+                "{}.{}".format(*k): {'count': v[0], 'bytes': v[1]}
+                for k, v in self.calls.items()},
+            'results': {
+                "{}.{}".format(*k): v.summary()
+                for k, v in self.results.items()},
+        })
+        return stats
 
 
 def get_handler(ptr, method):
@@ -129,6 +870,47 @@ def get_handler(ptr, method):
     return obj, getattr(obj, method)
 
 
+class BoundBridgeMethod(object):
+    """ A bridge method bound to an object. This replaces the partials that
+    were created on every access with a single small object.
+
+    The binding is not cached on the object. Holding the object strongly
+    from the cache would create a reference cycle and delay deleting the
+    native object, and holding it weakly breaks calls on temporary objects.
+    Hot paths call the method through the class instead, which does not
+    bind it:
+
+        cls = type(view)
+        cls.setAlpha(view, 0.5)
+
+    """
+    __slots__ = ('method', 'obj')
+
+    def __init__(self, method, obj):
+        self.method = method
+        self.obj = obj
+
+    def __call__(self, *args, **kwargs):
+        return self.method(self.obj, *args, **kwargs)
+
+    def suppressed(self):
+        """ Suppress calls within this context to avoid feedback loops"""
+        return self.method.suppressed(self.obj)
+
+
+class BoundBridgeCallback(BoundBridgeMethod):
+    """ A bridge callback bound to an object """
+    __slots__ = ()
+
+    def connect(self, callback):
+        """ Set the callback to be fired when the event occurs. """
+        self.method.connect(self.obj, callback)
+
+    def disconnect(self, callback):
+        """ Remove the callback to be fired when the event occurs. """
+        self.method.disconnect(self.obj, callback)
+
+
 class BridgeMethod(Property):
     """ A method that is callable via the bridge.
     When called, this serializes the call, packs the arguments,
@@ -145,14 +927,33 @@ class BridgeMethod(Property):
     #: Use it
     view.addView(view2)
 
+    Setters that only update the state of the object they're called on can
+    be declared as `idempotent`. If an idempotent method is called multiple
+    times on the same object before the queued events are sent only the last
+    call is sent.
+
+        setAlpha = BridgeMethod('float', idempotent=True)
+
+    Typed arrays received by a callback, including those nested in the
+    dicts of packed objects, are passed to it as tuples. Pass `buffers=True`
+    to receive them as memoryviews over the received data instead, this
+    avoids boxing every item of large arrays.
+
+        onRecycleViews = BridgeCallback('[I', '[I', buffers=True)
+
     """
-    __slots__ = ('__signature__', '__returns__', '__cache__', '__bridge_id__')
+    __slots__ = ('__signature__', '__returns__', '__cache__', '__bridge_id__',
+                 '__idempotent__', '__packer__', '__buffers__')
 
     def __init__(self, *args, **kwargs):
         self.__returns__ = kwargs.get('returns', None)
         self.__signature__ = args
         self.__cache__ = {}  # Result cache otherwise gc cleans up
+        self.__packer__ = None  # Compiled by pack_args on first use
         self.__bridge_id__ = generate_property_id()
+        self.__idempotent__ = (kwargs.get('idempotent', False) and
+                               not self.__returns__)
+        self.__buffers__ = kwargs.get('buffers', False)
         super(BridgeMethod, self).__init__(self.__fget__)
 
     @contextmanager
@@ -163,9 +964,8 @@ class BridgeMethod(Property):
         obj.__suppressed__[self.name] = False
 
     def __fget__(self, obj):
-        f = functools.partial(self.__call__, obj)
-        f.suppressed = functools.partial(self.suppressed, obj)
-        return f
+        """ Bind to the object """
+        return BoundBridgeMethod(self, obj)
 
     def __call__(self, obj, *args, **kwargs):
         """ The Swift like syntax is used"""
@@ -175,30 +975,57 @@ class BridgeMethod(Property):
         #: Format the args as needed
         method_name, method_args = self.pack_args(obj, *args, **kwargs)
 
+        app = obj.__app__
+        metrics = app.bridge_metrics
+
         #: Create a future to retrieve the result if needed
-        result = obj.__app__.create_future() if self.__returns__ else None
+        result = app.create_future() if self.__returns__ else None
+
+        label = (obj.__nativeclass__, self.name) if metrics.enabled else None
 
         if result:
             #: Store in local cache or global cache (weakref) removes it
             #: resulting in a Reference error when the result is returned
             self.__cache__[result.__id__] = result
 
-            def resolve(r, f=result):
+            def resolve(r, f=result, sent=time()):
                 #: Remove from local cache to free future
                 del self.__cache__[f.__id__]
+                if label is not None:
+                    metrics.record_result(label, time() - sent)
 
             #: Delete from the local cache once resolved.
             result.then(resolve)
 
-        obj.__app__.send_event(
-            Command.METHOD,  #: method
-            obj.__id__,
-            result.__id__ if result else 0,
-            self.__bridge_id__,
-            obj.__prefix__ + method_name,  #: method name
-            method_args,  #: args
-            **kwargs  #: kwargs to send_event
-        )
+        method_name = obj.__prefix__ + method_name
+
+        #: Only the last call of an idempotent setter needs sent
+        if self.__idempotent__ and not obj.__prefix__:
+            kwargs['coalesce'] = (obj.__id__, self.__bridge_id__)
+        if label is not None:
+            kwargs['label'] = label
+
+        if app.define_schema(self.__bridge_id__, obj.__nativeclass__,
+                             method_name, self.__signature__):
+            #: Name is defined by the bridge id so only send the id
+            app.send_event(
+                Command.METHOD,  #: method
+                obj.__id__,
+                result.__id__ if result else 0,
+                self.__bridge_id__,
+                method_args,  #: args
+                **kwargs  #: kwargs to send_event
+            )
+        else:
+            app.send_event(
+                Command.METHOD,  #: method
+                obj.__id__,
+                result.__id__ if result else 0,
+                self.__bridge_id__,
+                method_name,  #: method name
+                method_args,  #: args
+                **kwargs  #: kwargs to send_event
+            )
         return result
 
     def pack_args(self, obj, *args, **kwargs):
@@ -224,13 +1051,14 @@ class BridgeStaticMethod(Property):
 
     """
     __slots__ = ('__signature__', '__returns__', '__cache__', '__owner__',
-                 '__bridge_id__')
+                 '__bridge_id__', '__packer__')
 
     def __init__(self, *args, **kwargs):
         self.__returns__ = kwargs.get('returns', None)
         self.__signature__ = args
         self.__owner__ = None
         self.__cache__ = {}  # Result cache otherwise gc cleans up
+        self.__packer__ = None  # Compiled by pack_args on first use
         self.__bridge_id__ = generate_property_id()
         super(BridgeStaticMethod, self).__init__()
 
@@ -245,6 +1073,11 @@ class BridgeStaticMethod(Property):
         method_name, method_args = self.pack_args(*args, **kwargs)
 
         app = get_app_class().instance()
+        owner = self.__owner__.__nativeclass__.default_value_mode[1]
+        metrics = app.bridge_metrics
+        label = (owner, self.name) if metrics.enabled else None
+        if label is not None:
+            kwargs['label'] = label
 
         #: Create a future to retrieve the result if needed
         result = app.create_future() if self.__returns__ else None
@@ -254,22 +1087,35 @@ class BridgeStaticMethod(Property):
             #: resulting in a Reference error when the result is returned
             self.__cache__[result.__id__] = result
 
-            def resolve(r, f=result):
+            def resolve(r, f=result, sent=time()):
                 #: Remove from local cache to free future
                 del self.__cache__[f.__id__]
+                if label is not None:
+                    metrics.record_result(label, time() - sent)
 
             #: Delete from the local cache once resolved.
             result.then(resolve)
 
-        app.send_event(
-            Command.STATIC_METHOD,  #: method
-            self.__owner__.__nativeclass__.default_value_mode[1],
-            result.__id__ if result else 0,
-            self.__bridge_id__,
-            method_name,  #: method name
-            method_args,  #: args
-            **kwargs  #: kwargs to send_event
-        )
+        if app.define_schema(self.__bridge_id__, owner, method_name,
+                             self.__signature__):
+            #: Class and name are defined by the bridge id
+            app.send_event(
+                Command.STATIC_METHOD,  #: method
+                result.__id__ if result else 0,
+                self.__bridge_id__,
+                method_args,  #: args
+                **kwargs  #: kwargs to send_event
+            )
+        else:
+            app.send_event(
+                Command.STATIC_METHOD,  #: method
+                owner,
+                result.__id__ if result else 0,
+                self.__bridge_id__,
+                method_name,  #: method name
+                method_args,  #: args
+                **kwargs  #: kwargs to send_event
+            )
         return result
 
     def pack_args(self, obj, *args, **kwargs):
@@ -295,13 +1141,19 @@ class BridgeField(Property):
     #: Set field
     view.width = 200
 
+    Fields that can be set multiple times without side effects can be
+    declared as `idempotent` so only the last value set before the queued
+    events are sent is sent.
+
     """
-    __slots__ = ('__signature__', '__bridge_id__', '__bridge_cached_')
+    __slots__ = ('__signature__', '__bridge_id__', '__bridge_cached_',
+                 '__idempotent__')
 
-    def __init__(self, arg):
+    def __init__(self, arg, idempotent=False):
         self.__signature__ = arg
         self.__bridge_id__ = generate_property_id()
         self.__bridge_cached_ = False
+        self.__idempotent__ = idempotent
         super(BridgeField, self).__init__(self.__fget__, self.__fset__)
 
     @contextmanager
@@ -314,13 +1166,35 @@ class BridgeField(Property):
     def __fset__(self, obj, arg):
         if obj.__suppressed__.get(self.name):
             return
-        obj.__app__.send_event(
-            Command.FIELD,  #: method
-            obj.__id__,
-            self.__bridge_id__,
-            obj.__prefix__ + self.name,  #: method name
-            [msgpack_encoder(self.__signature__, arg)]  #: args
-        )
+        app = obj.__app__
+        name = obj.__prefix__ + self.name
+        args = [msgpack_encoder(self.__signature__, arg)]
+        key = None
+        if self.__idempotent__ and not obj.__prefix__:
+            key = (obj.__id__, self.__bridge_id__)
+        label = None
+        if app.bridge_metrics.enabled:
+            label = (obj.__nativeclass__, self.name)
+        if app.define_schema(self.__bridge_id__, obj.__nativeclass__, name,
+                             (self.__signature__,)):
+            app.send_event(
+                Command.FIELD,  #: method
+                obj.__id__,
+                self.__bridge_id__,
+                args,  #: args
+                coalesce=key,
+                label=label
+            )
+        else:
+            app.send_event(
+                Command.FIELD,  #: method
+                obj.__id__,
+                self.__bridge_id__,
+                name,  #: method name
+                args,  #: args
+                coalesce=key,
+                label=label
+            )
         self.__bridge_cached_ = True
 
     def __fget__(self, obj):
@@ -367,11 +1241,8 @@ class BridgeCallback(BridgeMethod):
     """
 
     def __fget__(self, obj):
-        f = super(BridgeCallback, self).__fget__(obj)
-        #: Add a method so it can be connected like in Qt
-        f.connect = functools.partial(self.connect, obj)
-        f.disconnect = functools.partial(self.disconnect, obj)
-        return f
+        #: Adds methods so it can be connected like in Qt
+        return BoundBridgeCallback(self, obj)
 
     def __call__(self, obj, *args):
         """ Fire the callback if one is connected """
@@ -419,6 +1290,18 @@ class BridgeObject(Atom):
             then the __id__ of he future will be used. When the future 
             completes this object will then be put into the cache. This allows
             passing results directly instead of using the `.then()` method.
+            
+            Methods and fields of the object can be used before the future
+            completes. The bridge stores the result under the id of the 
+            future and processes events in order, so the calls are queued 
+            against the pending result. A chain of dependent calls only 
+            takes a single round trip, for example:
+            
+                window = Window(__id__=activity.getWindow())
+                window.addFlags(Window.FLAG_KEEP_SCREEN_ON)
+            
+            If the result is null the calls are dropped and any results
+            they return resolve to None.
 
     """
     __slots__ = ('__weakref__', )
@@ -436,7 +1319,7 @@ class BridgeObject(Atom):
     __callbacks__ = Dict()
 
     #: Bridge object ID
-    __id__ = Int(0, factory=generate_id)
+    __id__ = Int()
 
     #: ID of this class
     __bridge_id__ = Int()
@@ -451,6 +1334,9 @@ class BridgeObject(Atom):
     def _default___app__(self):
         return get_app_class().instance()
 
+    def _default___id__(self):
+        return CACHE.allocate(self)
+
     def _default___bridge_id__(self):
         cls = self.__class__
         if cls not in CLASS_CACHE:
@@ -473,7 +1359,7 @@ class BridgeObject(Atom):
                 #: If a future is given don't store this object in the cache
                 #: until after the future completes
                 f = __id__
-                f.then(lambda *args, **kwargs: CACHE.update({f.__id__: self}))
+                f.then(lambda *args, **kwargs: CACHE.__setitem__(f.__id__, self))
 
                 #: The future is used to return the result
                 kwargs['__id__'] = f.__id__
@@ -493,24 +1379,38 @@ class BridgeObject(Atom):
             CACHE[self.__id__] = self
 
         if __id__ is None:
-            self.__app__.send_event(
-                Command.CREATE,  #: method
-                self.__id__,  #: id to assign in bridge cache
-                self.__bridge_id__,
-                self.__nativeclass__,
-                [msgpack_encoder(sig, arg)
-                 for sig, arg in zip(self.__signature__, args)],
-            )
+            app = self.__app__
+            cls = self.__nativeclass__
+            args = [msgpack_encoder(sig, arg)
+                    for sig, arg in zip(self.__signature__, args)]
+            label = (cls, '<init>') if app.bridge_metrics.enabled else None
+            if app.define_schema(self.__bridge_id__, cls, cls,
+                                 self.__signature__):
+                app.send_event(
+                    Command.CREATE,  #: method
+                    self.__id__,  #: id to assign in bridge cache
+                    self.__bridge_id__,
+                    args,
+                    label=label
+                )
+            else:
+                app.send_event(
+                    Command.CREATE,  #: method
+                    self.__id__,  #: id to assign in bridge cache
+                    self.__bridge_id__,
+                    cls,
+                    args,
+                    label=label
+                )
 
     def __del__(self):
-        """ Destroy this object and send a command to destroy the actual object
-        reference the bridge implementation holds (allowing it to be released).
+        """ Destroy this object and queue a command to destroy the actual
+        object reference the bridge implementation holds (allowing it to be
+        released). This may run at any point during garbage collection so
+        the delete is only queued here and sent with the next batch.
         """
-        self.__app__.send_event(
-            Command.DELETE,  #: method
-            self.__id__,  #: id to assign in java
-        )
-        _cleanup_id(self)
+        CACHE.retire(self)
+        self.__app__.queue_delete(self.__id__)
 
 
 class NestedBridgeObject(BridgeObject):
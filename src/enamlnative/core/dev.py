@@ -12,6 +12,7 @@ The full license is in the file LICENSE, distributed with this software.
 import os
 import sys
 import json
+import zlib
 import shutil
 import inspect
 import traceback
@@ -277,6 +278,61 @@ FILE_TMPL = """
 """
 
 
+#: Flag byte of a compressed bridge frame. A bridge batch is always a
+#: msgpack array so an uncompressed frame never starts with this byte and
+#: the receiver can accept either.
+FRAME_ZLIB = 0x01
+
+#: Compression codecs this side of the remote debug bridge can read
+FRAME_CODECS = ['zlib']
+
+
+def encode_frame(data, threshold=1024, level=1):
+    """ Compress a bridge batch if it's at least threshold bytes and
+    compressing it makes it smaller.
+
+    Parameters
+    ----------
+    data: bytes
+        The encoded batch
+    threshold: int
+        Minimum size to compress
+    level: int
+        The zlib compression level
+
+    Returns
+    -------
+    frame: bytes
+        The batch as is or a FRAME_ZLIB flag followed by the compressed batch
+
+    """
+    if len(data) < threshold:
+        return data
+    compressed = zlib.compress(data, level)
+    if len(compressed) + 1 >= len(data):
+        return data
+    return bytearray((FRAME_ZLIB,)) + compressed
+
+
+def decode_frame(data):
+    """ Decode a frame created with `encode_frame`
+
+    Parameters
+    ----------
+    data: bytes
+        The frame as received
+
+    Returns
+    -------
+    data: bytes
+        The encoded batch
+
+    """
+    if data and bytearray(data[:1])[0] == FRAME_ZLIB:
+        return zlib.decompress(bytes(data[1:]))
+    return data
+
+
 def get_app():
     from .app import BridgedApplication
     return BridgedApplication
@@ -324,7 +380,6 @@ class TornadoDevClient(DevClient):
             #: Create local references
             mode = session.mode
             process_events = session.app.process_events
-            app = session.app
 
             try:
                 print("Dev client connecting {}...".format(session.url))
@@ -334,14 +389,17 @@ class TornadoDevClient(DevClient):
 
                 #: Start remote debugger
                 if mode == 'remote':
-                    app.load_view(app)
+                    session.start_framing(conn.write_message)
 
                 while True:
                     msg = yield conn.read_message()
                     if msg is None:
                         break
                     if mode == 'remote':
-                        process_events(msg)
+                        if isinstance(msg, bytes):
+                            process_events(decode_frame(msg))
+                        else:
+                            session.handle_framing(msg)
                     else:
                         r = session.handle_message(msg)
                         conn.write_message(json.dumps(r))
@@ -383,7 +441,6 @@ class TwistedDevClient(DevClient):
 
         #: Create local references
         mode = session.mode
-        app = session.app
         process_events = session.app.process_events
 
         class DevClient(WebSocketClientProtocol):
@@ -392,16 +449,18 @@ class TwistedDevClient(DevClient):
                 session.connected = True
                 client.connection = self
 
+            def onOpen(self):
                 #: Start remote debugger
                 if mode == 'remote':
-                    app.load_view(app)
-
-            def onOpen(self):
-                pass
+                    session.start_framing(
+                        lambda msg: self.sendMessage(msg.encode('utf-8')))
 
             def onMessage(self, payload, isBinary):
                 if mode == 'remote':
-                    process_events(payload)
+                    if isBinary:
+                        process_events(decode_frame(payload))
+                    else:
+                        session.handle_framing(payload.decode('utf-8'))
                 else:
                     r = session.handle_message(payload)
                     self.sendMessage(json.dumps(r))
@@ -745,6 +804,27 @@ class DevServerSession(Atom):
     #: Dev session mode
     mode = Enum('client', 'server', 'remote')
 
+    #: Compress the bridge batches sent in remote mode. They are only
+    #: compressed once the other side accepts the `framing_offer`.
+    compression = Bool(True)
+
+    #: Codec the other side accepted, if any
+    codec = Unicode()
+
+    #: Bridge batches smaller than this are sent uncompressed
+    compression_threshold = Int(1024)
+
+    #: The zlib compression level. Low levels are much faster and still
+    #: compress the repetitive bridge batches well.
+    compression_level = Int(1)
+
+    #: Milliseconds to wait for the reply to the `framing_offer` before the
+    #: view is loaded without compression
+    framing_timeout = Int(1000)
+
+    #: Whether the view was loaded in remote mode
+    remote_view_loaded = Bool()
+
     #: Hotswap support class
     hotswap = Instance(Hotswapper)
 
@@ -849,11 +929,67 @@ class DevServerSession(Atom):
     # Dev Session API
     # -------------------------------------------------------------------------
     def write_message(self, data, binary=False):
-        """ Write a message to the active client
+        """ Write a message to the active client. In remote mode binary
+        messages are bridge batches and are compressed if the other side
+        supports it.
 
         """
+        if binary and self.codec:
+            data = bytes(encode_frame(data, self.compression_threshold,
+                                      self.compression_level))
         self.client.write_message(data, binary=binary)
 
+    def framing_offer(self):
+        """ The message sent when a remote session connects listing the
+        codecs this side can read.
+
+        """
+        return json.dumps({
+            'type': 'framing',
+            'codecs': FRAME_CODECS if self.compression else [],
+        })
+
+    def handle_framing(self, data):
+        """ Handle the reply to the `framing_offer`. The reply lists the
+        codecs the other side can read.
+
+        """
+        msg = json.loads(data)
+        if msg.get('type') != 'framing':
+            print("Warning: Unhandled message: {}".format(msg))
+            return
+        codecs = [c for c in FRAME_CODECS if c in msg.get('codecs', [])]
+        self.codec = codecs[0] if codecs and self.compression else ''
+        print("Dev session bridge compression: {}".format(
+            self.codec or 'disabled'))
+        self.load_remote_view()
+
+    def load_remote_view(self):
+        """ Load the view in remote mode once the framing is agreed on or
+        the `framing_timeout` expired, whichever is first.
+
+        """
+        if self.remote_view_loaded:
+            return
+        self.remote_view_loaded = True
+        self.app.load_view(self.app)
+
+    def start_framing(self, send):
+        """ Send the `framing_offer` using the given callable and load the
+        view without compression if no reply comes within the
+        `framing_timeout`. When no codecs are offered there is nothing to
+        agree on (and older clients never reply) so the view is loaded
+        right away.
+
+        """
+        self.remote_view_loaded = False
+        send(self.framing_offer())
+        if not self.compression:
+            self.codec = ''
+            self.load_remote_view()
+            return
+        self.app.timed_call(self.framing_timeout, self.load_remote_view)
+
     def handle_message(self, data):
         """ When we get a message """
         msg = json.loads(data)
@@ -926,6 +1062,20 @@ class DevServerSession(Atom):
             #: Display the error
             app.send_event(Command.ERROR, traceback.format_exc())
 
+    def do_metrics(self, msg):
+        """ Return the bridge metrics. The message may set `enabled` to
+        start or stop recording the per call metrics and `reset` to clear
+        them after they're returned.
+
+        """
+        metrics = self.app.bridge_metrics
+        result = metrics.summary()
+        if msg.get('reset'):
+            metrics.reset()
+        if 'enabled' in msg:
+            metrics.enabled = bool(msg['enabled'])
+        return result
+
     # -------------------------------------------------------------------------
     # Utility methods
     # -------------------------------------------------------------------------
@@ -41,6 +41,7 @@ class EventLoop(Atom):
                 TornadoEventLoop,
                 TwistedEventLoop,
                 BuiltinEventLoop,
+                AsyncioEventLoop,
             ]:
                 if impl.available():
                     print("Using {} event loop!".format(impl))
@@ -296,6 +297,149 @@ class TwistedEventLoop(EventLoop):
         self.loop.doIteration(0.000001)
 
 
+class AsyncioEventLoop(EventLoop):
+    """ Eventloop using asyncio. The futures are `asyncio.Future` instances
+    so the results of bridge calls, http requests, permission requests, etc.
+    can be awaited in coroutines.
+
+        async def load(app):
+            allowed = await app.has_permission(Camera.CAMERA_PERMISSION)
+
+    Callbacks added with `then` and `catch` are invoked as soon as the
+    result is set like the other event loops. Callbacks added with
+    `add_done_callback` and awaiting coroutines are scheduled by asyncio.
+
+    The builtin event loop is always available so this is only used when
+    passed to the application explicitly.
+
+        app = AndroidApplication(loop=AsyncioEventLoop(), ...)
+
+    """
+
+    @classmethod
+    def available(cls):
+        try:
+            import asyncio
+            return True
+        except ImportError as e:
+            print("Asyncio event loop not available {}".format(e))
+            return False
+
+    def _default_name(self):
+        return "asyncio"
+
+    def _default_loop(self):
+        import asyncio
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        return loop
+
+    def _default_future(self):
+        import asyncio
+        loop = self
+
+        class Future(asyncio.Future):
+            def __init__(self, **kwargs):
+                super(Future, self).__init__(**kwargs)
+                self._then = []
+                bridge.tag_object_with_id(self)
+
+            def then(self, callback):
+                """ Add a callback invoked with the result """
+                return self._add_callback(callback, False)
+
+            def catch(self, callback):
+                """ Add a callback invoked with the exception if one is set
+                """
+                return self._add_callback(callback, True)
+
+            def _add_callback(self, callback, catch):
+                if self.done():
+                    self.safe_callback(callback, catch)
+                else:
+                    self._then.append((callback, catch))
+                return self
+
+            def set_result(self, result):
+                super(Future, self).set_result(result)
+                self._run_callbacks()
+
+            def set_exception(self, exception):
+                super(Future, self).set_exception(exception)
+                self._run_callbacks()
+
+            def _run_callbacks(self):
+                callbacks = self._then
+                self._then = []
+                for callback, catch in callbacks:
+                    self.safe_callback(callback, catch)
+
+            def safe_callback(self, callback, catch):
+                try:
+                    if self.cancelled():
+                        return
+                    error = self.exception()
+                    if catch:
+                        if error is not None:
+                            callback(error)
+                    elif error is None:
+                        callback(self.result())
+                except Exception as e:
+                    if loop._handler:
+                        loop._handler(callback)
+                    else:
+                        raise
+
+        return Future
+
+    def start(self):
+        self.loop.run_forever()
+
+    def deferred_call(self, callback, *args, **kwargs):
+        if kwargs:
+            callback = partial(callback, **kwargs)
+        return self.loop.call_soon(callback, *args)
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        if kwargs:
+            callback = partial(callback, **kwargs)
+        return self.loop.call_later(ms/1000.0, callback, *args)
+
+    def create_future(self):
+        """ Create a future bound to this event loop """
+        return self.future(loop=self.loop)
+
+    def run_iteration(self):
+        """ Run one iteration of the event loop """
+        loop = self.loop
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+
+    def set_error_handler(self, handler):
+        """ Asyncio passes a context to the handler, re-raise the error
+        so the handler can format the traceback like the other loops.
+
+        """
+        self._handler = handler
+
+        def handle_exception(loop, context):
+            error = context.get('exception')
+            if error is None:
+                loop.default_exception_handler(context)
+                return
+            try:
+                raise error
+            except Exception:
+                handler(context.get('handle') or context.get('message'))
+
+        self.loop.set_exception_handler(handle_exception)
+
+    def set_future_result(self, future, result):
+        """ Set the result unless the future was cancelled """
+        if not future.done():
+            future.set_result(result)
+
+
 class BuiltinEventLoop(TornadoEventLoop):
     """ Use the built in event loop. It's a stripped down version of tornado,
     It's currently slightly slower than tornado at the moment so use tornado 
@@ -0,0 +1,180 @@
+"""
+Copyright (c) 2026, enaml-native contributors.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+"""
+import io
+import msgpack
+from time import time, sleep
+from atom.api import Atom, Unicode, Value, Float, Int, Bool, List
+from . import bridge
+
+
+class Direction:
+    #: Events sent from python to native (dispatch_events)
+    OUT = "o"
+
+    #: Events sent from native to python (process_events)
+    IN = "i"
+
+
+#: Identifies a recording file and it's format version
+RECORDING_HEADER = ("enaml-native-recording", 1)
+
+
+class BridgeRecorder(Atom):
+    """ Records all of the bridge traffic to a file so it can be replayed
+    later using a `BridgeReplayer`.
+
+    The file is a stream of msgpack encoded records. The first record is the
+    header, each following record is a tuple of (timestamp, direction, data)
+    where the timestamp is the time in seconds since recording started
+    and data is the raw msgpack payload that was sent over the bridge.
+
+    """
+    #: Path of the file to record to
+    path = Unicode()
+
+    #: File the records are written to
+    file = Value()
+
+    #: Time recording started
+    started = Float()
+
+    #: Number of records written
+    records = Int()
+
+    #: Encoder for the records
+    packer = Value()
+
+    def _default_packer(self):
+        #: Pack the payloads as binary so they are read back as bytes
+        return msgpack.Packer(use_bin_type=True)
+
+    def start(self):
+        """ Open the file and write the header """
+        self.file = io.open(self.path, 'wb')
+        self.started = time()
+        self.records = 0
+        self.file.write(self.packer.pack(RECORDING_HEADER))
+
+    def stop(self):
+        """ Stop recording and close the file """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def record(self, direction, data):
+        """ Write a record of a payload sent over the bridge
+
+        Parameters
+        ----------
+        direction: str
+            Direction.OUT or Direction.IN
+        data: bytes or memoryview
+            The payload sent
+
+        """
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        self.file.write(self.packer.pack(
+            (time() - self.started, direction, bytes(data))))
+        self.records += 1
+
+
+def load_recording(path):
+    """ Load the records of a recording file.
+
+    Parameters
+    ----------
+    path: str
+        Path of a file created by a BridgeRecorder
+
+    Returns
+    -------
+    records: list
+        List of (timestamp, direction, data) records
+
+    """
+    with io.open(path, 'rb') as f:
+        unpacker = bridge.create_unpacker()
+        unpacker.feed(f.read())
+        header = tuple(next(unpacker))
+        if header != RECORDING_HEADER:
+            raise ValueError("{} is not a supported recording: {}".format(
+                path, header))
+        return [record for record in unpacker]
+
+
+class BridgeReplayer(Atom):
+    """ Replays the incoming events of a recording through the
+    `process_events` method of an app. This allows benchmarking the python
+    side handling of a real session without a device.
+
+    The ids of the bridge objects must match the recorded session, so the
+    app should load the same view before the recording is replayed.
+
+        app = MockApplication.instance('android')
+        app.view = ContentView()
+        app.get_view()
+        replayer = BridgeReplayer(app=app, path='session.rec')
+        replayer.replay()
+        print(replayer.stats())
+
+    """
+    #: App to replay the events with
+    app = Value()
+
+    #: Path of the recording
+    path = Unicode()
+
+    #: Loaded records
+    records = List()
+
+    #: Wait between records to match the timing of the recording. Otherwise
+    #: the records are processed as fast as possible.
+    realtime = Bool()
+
+    #: Time spent processing each incoming payload
+    durations = List()
+
+    def _default_records(self):
+        return load_recording(self.path)
+
+    def replay(self):
+        """ Feed each incoming payload to the app's `process_events` method.
+        Any events queued in response are sent before the next payload so
+        the app sees them in the recorded order.
+
+        """
+        app = self.app
+        durations = []
+        started = time()
+        for timestamp, direction, data in self.records:
+            if direction != Direction.IN:
+                continue
+            if self.realtime:
+                delay = timestamp - (time() - started)
+                if delay > 0:
+                    sleep(delay)
+            t = time()
+            app.process_events(data)
+            app.force_update()
+            durations.append(time() - t)
+        self.durations = durations
+        return durations
+
+    def stats(self):
+        """ Return a summary of the time spent processing the payloads """
+        durations = self.durations
+        n = len(durations)
+        total = sum(durations)
+        return {
+            'payloads': n,
+            'total': total,
+            'avg': total / n if n else 0,
+            'max': max(durations) if n else 0,
+        }
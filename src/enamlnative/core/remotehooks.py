@@ -27,5 +27,8 @@ def log(msg):
 
 def publish(data):
     from enamlnative.core.dev import DevServerSession
+    if isinstance(data, memoryview):
+        #: The websocket clients require bytes
+        data = data.tobytes()
     DevServerSession.instance().write_message(data, True)
 
@@ -15,6 +15,7 @@ from enaml.application import ProxyResolver
 from . import factories
 from .bridge import ObjcBridgeObject, ObjcMethod
 from ..core.app import BridgedApplication
+from ..core import bridge
 
 
 class ENBridge(ObjcBridgeObject):
@@ -51,6 +52,9 @@ class ENBridge(ObjcBridgeObject):
             by calling the processEvents method via ctypes. """
         objc = self.objc
         bridge = self.bridge
+        if isinstance(data, memoryview):
+            #: ctypes c_char_p requires bytes
+            data = data.tobytes()
         #: This must come after the above as it changes the arguments!
         objc.objc_msgSend.argtypes = [ctypes.c_void_p, ctypes.c_void_p,
                                       ctypes.c_char_p, ctypes.c_int]
@@ -137,6 +141,9 @@ class IPhoneApplication(BridgedApplication):
         super(IPhoneApplication, self).__init__(*args, **kwargs)
         self.resolver = ProxyResolver(factories=factories.IOS_FACTORIES)
 
+        #: ENBridge.m can't decode typed arrays, send them as before
+        bridge.TYPED_ARRAYS = False
+
     # -------------------------------------------------------------------------
     # Bridge API Implementation
     # -------------------------------------------------------------------------
@@ -12,7 +12,7 @@ Created on June 21, 2017
 from atom.api import Atom, Int
 from ..core import bridge
 from ..core.bridge import (
-    Command, msgpack_encoder,
+    Command, msgpack_encoder, encode,
     BridgeMethod, BridgeField, BridgeCallback, BridgeObject, NestedBridgeObject
 )
 
@@ -66,29 +66,47 @@ class ObjcMethod(BridgeMethod):
         if not signature:
             return (self.name, [])
 
-        #: Build args, first is a string, subsequent are dictionaries
-        method_name = [self.name]
-        bridge_args = []
-        for i, sig in enumerate(signature):
-            if i == 0:
-                method_name.append(":")
-                bridge_args.append(msgpack_encoder(sig, args[0]))
-                continue
+        #: The selector only depends on which kwargs are given
+        packers = self.__packer__
+        if packers is None:
+            packers = self.__packer__ = {}
+        key = tuple(kwargs)
+        packer = packers.get(key)
+        if packer is None:
+            packer = packers[key] = self.compile_selector(kwargs)
+        selector, sig, names = packer
+
+        bridge_args = [(sig, encode(args[0]))]
+        for k, t in names:
+            bridge_args.append((t, encode(kwargs[k])))
+        return (selector, bridge_args)
+
+    def compile_selector(self, kwargs):
+        """ Build the selector and the types of the arguments for a call
+        using the given kwargs.
+
+        Returns
+        -------
+        result: tuple
+            A tuple of the (selector, type of the first argument,
+            [(kwarg name, type), ...]).
 
+        """
+        signature = self.__signature__
+        method_name = [self.name, ":"]
+        names = []
+        for i, sig in enumerate(signature[1:]):
             #: Sig is a dict so we must pull out the matching kwarg
-            found = False
             for k in sig:
                 if k in kwargs:
                     method_name.append("{}:".format(k))
-                    bridge_args.append(msgpack_encoder(sig[k], kwargs[k]))
-                    found = True
+                    names.append((k, sig[k]))
                     break
-            if not found:
+            else:
                 #: If we get here something is wrong
                 raise ValueError("Unexpected or missing argument at index {}. "
-                                 "Expected {}".format(i, sig))
-
-        return ("".join(method_name), bridge_args)
+                                 "Expected {}".format(i+1, sig))
+        return ("".join(method_name), signature[0], names)
 
 
 class ObjcProperty(BridgeField):
@@ -33,7 +33,7 @@ from .card_view import CardView
 #from .text_switcher import TextSwitcher
 from .image_view import ImageView
 from .web_view import WebView
-from .list_view import ListView, ListItem
+from .list_view import ListView, ListItem, ListDataSource
 from .surface_view import SurfaceView
 from .texture_view import TextureView
 from .video_view import VideoView
@@ -9,8 +9,10 @@ Created on May 20, 2017
 
 @author: jrm
 """
+from collections import OrderedDict
 from atom.api import (
-    Typed, ForwardTyped, Value, Bool, Int, Enum, ContainerList, Event, observe
+    Atom, Typed, ForwardTyped, Value, Bool, Int, Enum, ContainerList, Event,
+    Callable, Dict, observe
 )
 
 from enaml.core.declarative import d_
@@ -28,6 +30,18 @@ class ProxyListView(ProxyViewGroup):
     def set_items(self, items):
         raise NotImplementedError
 
+    def set_data_source(self, source):
+        raise NotImplementedError
+
+    def set_view_type(self, view_type):
+        raise NotImplementedError
+
+    def set_pool_sizes(self, sizes):
+        raise NotImplementedError
+
+    def set_batch_binding(self, enabled):
+        raise NotImplementedError
+
     def set_span_count(self, count):
         raise NotImplementedError
 
@@ -55,6 +69,128 @@ class ProxyListItem(ProxyToolkitObject):
     declaration = ForwardTyped(lambda: ListItem)
 
 
+class ListDataSource(Atom):
+    """ A source of rows for a ListView that loads them on demand a page at
+    a time. Use this instead of `items` when the rows don't all fit in
+    memory.
+
+    Subclasses must implement `__len__` and `fetch`. Rows are requested
+    as the list is scrolled and the most recently used pages are kept in
+    a cache. If `fetch` returns a future, the `placeholder` is shown for
+    the rows of the page until it resolves.
+
+    """
+
+    #: Number of rows fetched at a time
+    page_size = Int(50)
+
+    #: Maximum number of pages kept in the cache
+    cache_size = Int(20)
+
+    #: Number of pages to load ahead of and behind the page being viewed
+    prefetch = Int(1)
+
+    #: Row shown while its page is loading
+    placeholder = Value()
+
+    #: Fired with a (start, count) tuple when rows have been loaded
+    loaded = Event(tuple)
+
+    #: Fired when the data changed and the view must be refreshed
+    invalidated = Event()
+
+    #: Loaded pages from least to most recently used
+    _pages = Typed(OrderedDict, ())
+
+    #: Pages being fetched
+    _pending = Dict()
+
+    def __len__(self):
+        """ Return the total number of rows """
+        raise NotImplementedError
+
+    def fetch(self, page):
+        """ Load the rows of the given page.
+
+        Parameters
+        ----------
+        page: int
+            The page to load. It holds the rows from
+            `page*page_size` to `(page+1)*page_size`.
+
+        Returns
+        -------
+        rows: list or future
+            The rows of the page or a future that resolves with them.
+
+        """
+        raise NotImplementedError
+
+    def get(self, position):
+        """ Return the row at the given position, or the placeholder
+        if its page is not loaded yet.
+
+        """
+        page, offset = divmod(position, self.page_size)
+        rows = self.load(page)
+        for p in range(page - self.prefetch, page + self.prefetch + 1):
+            if p != page and 0 <= p*self.page_size < len(self):
+                self.load(p)
+        if rows is None or offset >= len(rows):
+            return self.placeholder
+        return rows[offset]
+
+    def load(self, page):
+        """ Return the rows of the page if it's loaded, otherwise start
+        fetching it and return None.
+
+        """
+        pages = self._pages
+        rows = pages.get(page)
+        if rows is not None:
+            #: Mark as most recently used
+            del pages[page]
+            pages[page] = rows
+            return rows
+        if page in self._pending:
+            return None
+        result = self.fetch(page)
+        if hasattr(result, 'then'):
+            self._pending[page] = result
+            result.then(lambda rows: self._on_fetched(page, result, rows))
+            if hasattr(result, 'catch'):
+                #: Allow the page to be fetched again
+                result.catch(lambda e: self._on_fetched(page, result, None))
+            return None
+        self._add_page(page, result)
+        return result
+
+    def invalidate(self):
+        """ Drop all the loaded pages and refresh the view. Pages being
+        fetched are ignored when they arrive.
+
+        """
+        self._pages.clear()
+        self._pending = {}
+        self.invalidated()
+
+    def _on_fetched(self, page, future, rows):
+        """ Add a page once it's fetched and let the view know """
+        if self._pending.get(page) is not future:
+            return  #: Invalidated while loading
+        del self._pending[page]
+        if rows is not None:
+            self._add_page(page, rows)
+            self.loaded((page*self.page_size, len(rows)))
+
+    def _add_page(self, page, rows):
+        """ Cache the page and evict the least recently used pages """
+        pages = self._pages
+        pages[page] = rows
+        while len(pages) > max(1, self.cache_size):
+            pages.popitem(last=False)
+
+
 class ListView(ViewGroup):
     """ A widget for displaying a large scrollable list of items.
 
@@ -63,6 +199,29 @@ class ListView(ViewGroup):
     #: List of items to display
     items = d_(ContainerList())
 
+    #: Loads the items a page at a time as they are needed. If set this is
+    #: used instead of the items.
+    data_source = d_(Typed(ListDataSource))
+
+    #: A callable that returns a unique key of an item. When the items are
+    #: sorted, reversed or replaced the rows are matched up by their keys so
+    #: only the rows that moved or changed are updated. If not given the
+    #: rows are matched by the identity of the items.
+    key = d_(Callable())
+
+    #: A callable that returns the view type of an item as an int. Rows are
+    #: only displayed by ListItems with the same `view_type`, so a feed with
+    #: different kinds of rows does not rebind one kind of template with
+    #: the data of another. Only used with `items`.
+    view_type = d_(Callable())
+
+    #: Maximum number of detached views of each view type kept for reuse
+    pool_sizes = d_(Dict())
+
+    #: Update the rows bound during a frame with one callback instead of a
+    #: callback for each row. This makes flinging a long list cheaper.
+    batch_binding = d_(Bool())
+
     #:  use this setting to improve performance if you know that changes
     #: in content do not change the layout size of the RecyclerView
     fixed_size = d_(Bool())
@@ -82,7 +241,8 @@ class ListView(ViewGroup):
     # -------------------------------------------------------------------------
     # Observers
     # -------------------------------------------------------------------------
-    @observe('items', 'arrangement',  'orientation', 'span_count',
+    @observe('items', 'data_source', 'view_type', 'pool_sizes',
+             'batch_binding', 'arrangement',  'orientation', 'span_count',
              'fixed_size')
     def _update_proxy(self, change):
         """ An observer which sends the state change to the proxy.
@@ -115,5 +275,8 @@ class ListItem(ToolkitObject):
     #: The position of this item within the ListView
     index = d_(Int(), writable=False)
 
+    #: The type of the items this view displays. See `ListView.view_type`.
+    view_type = d_(Int())
+
     #: A reference to the ProxyLabel object.
     proxy = Typed(ProxyListItem)
@@ -36,6 +36,8 @@ class TestBridge(Atom):
         return self.app.create_future()
 
     def process_events(self, data):
+        if self.data.done():
+            self.data = self._default_data()
         self.app.set_future_result(self.data, data)
 
     def addTarget(self, *args, **kwargs):
@@ -51,6 +53,8 @@ class MockApplication(BridgedApplication):
     profile = Bool()
     profiler = Instance(Profile, ())
     error = Value()
+    #: Total bytes dispatched to the mock bridge
+    bytes_sent = Int()
     #: Events
     done = Value()
 
@@ -73,6 +77,8 @@ class MockApplication(BridgedApplication):
         app = cls()
         if platform:
             app.reset(platform)
+        #: Make the mock the app the bridge objects send events to
+        Application._instance = app
         return app
 
     def __init__(self, platform="ios"):
@@ -135,6 +141,7 @@ class MockApplication(BridgedApplication):
 
     def dispatch_events(self, data):
         print("Dispatch {} kbytes".format(len(data)/1000))
+        self.bytes_sent += len(data)
         self.bridge.process_events(data)
 
     def load_plugin_factories(self):
@@ -12,6 +12,7 @@ Created on Oct 4, 2017
 
 import re
 import os
+import sys
 import sh
 import time
 import pytest
@@ -179,5 +180,348 @@ def parse_stats(output):
     return stats
 
 
+# -----------------------------------------------------------------------------
+# Bridge benchmarks
+# -----------------------------------------------------------------------------
+if 'src' not in sys.path:
+    sys.path.append('src')
 
 
+def test_bridge_handle_table_benchmark():
+    """ Compare the handle table to a WeakValueDictionary with increasing
+    ids by creating and destroying screens of objects like navigating
+    between pages of an app.
+    """
+    import gc
+    import msgpack
+    from time import time
+    from weakref import WeakValueDictionary
+    from enamlnative.core.bridge import HandleTable
+    try:
+        import tracemalloc
+    except ImportError:
+        tracemalloc = None
+
+    class Obj(object):
+        __slots__ = ('__id__', '__weakref__')
+
+    def churn_table(screens, n):
+        table = HandleTable()
+        for i in range(screens):
+            live = []
+            for j in range(n):
+                o = Obj()
+                o.__id__ = table.allocate(o)
+                live.append(o)
+            for o in live:
+                assert table.get(o.__id__) is o
+            if i < screens-1:
+                for o in live:
+                    table.release(o)
+        return table, live
+
+    def churn_dict(screens, n):
+        cache = WeakValueDictionary()
+        next_id = 0
+        for i in range(screens):
+            live = []
+            for j in range(n):
+                next_id += 1
+                o = Obj()
+                o.__id__ = next_id
+                cache[next_id] = o
+                live.append(o)
+            for o in live:
+                assert cache.get(o.__id__) is o
+        return cache, live
+
+    screens, n = 200, 1000
+    for name, run in (('WeakValueDictionary', churn_dict),
+                      ('HandleTable', churn_table)):
+        gc.collect()
+        t = time()
+        run(screens, n)
+        dt = time() - t
+
+        #: Measure memory separately as tracing slows it down
+        size = 0
+        if tracemalloc:
+            tracemalloc.start()
+            cache, live = run(1, n)
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+        cache, live = run(screens, n)
+        id_bytes = sum(len(msgpack.packb(o.__id__)) for o in live)
+        print("{}: {:.1f}ms, {} kbytes for {} objects, {} bytes of ids "
+              "after {} screens".format(name, dt*1000, size/1000, n,
+                                        id_bytes, screens))
+
+
+def test_bridge_pack_args_benchmark():
+    """ Compare the per call overhead of packing the arguments of a method
+    with a compiled packer to doing the same work on every call.
+    """
+    from time import time
+    from enamlnative.core.bridge import msgpack_encoder
+    from enamlnative.android.bridge import compile_packer
+
+    def pack_args(name, signature, *args):
+        """ How the arguments were packed before """
+        name = name.rstrip("_")
+        vargs = signature and signature[-1].endswith("...")
+        if not vargs and (len(args) != len(signature)):
+            raise ValueError("Invalid number of arguments")
+        if vargs:
+            varg = signature[-1].replace('...', '')
+            return (name, [
+                msgpack_encoder(
+                    signature[i] if i+1 < len(signature) else varg, args[i])
+                for i in range(len(args))
+            ])
+        return (name, [msgpack_encoder(sig, arg)
+                       for sig, arg in zip(signature, args)])
+
+    cases = [
+        ('setText', ('java.lang.CharSequence',), ('Hello',)),
+        ('setPadding', ('int', 'int', 'int', 'int'), (1, 2, 3, 4)),
+        ('format', ('java.lang.String', 'java.lang.Object...'),
+         ('%s %s', 'a', 'b')),
+    ]
+    n = 20000
+    for name, signature, args in cases:
+        packer = compile_packer(name, signature)
+        assert packer(args) == pack_args(name, signature, *args)
+
+        t = time()
+        for i in range(n):
+            pack_args(name, signature, *args)
+        before = time() - t
+
+        t = time()
+        for i in range(n):
+            packer(args)
+        after = time() - t
+        print("{}: {:.2f}us per call before, {:.2f}us after".format(
+            name, before/n*1e6, after/n*1e6))
+
+
+def test_bridge_remote_framing_benchmark(monkeypatch):
+    """ Measure the throughput of sending bridge batches over a loopback
+    websocket with and without compressed framing.
+    """
+    tornado = pytest.importorskip('tornado')
+    from time import time
+    from tornado import gen
+    from tornado.httpserver import HTTPServer
+    from tornado.ioloop import IOLoop
+    from tornado.netutil import bind_sockets
+    from tornado.web import Application
+    from tornado.websocket import WebSocketHandler, websocket_connect
+    from enamlnative.core.dev import encode_frame, decode_frame
+    from enamlnative.core import bridge
+    from enamlnative.android.android_text_view import TextView
+    from app import MockApplication
+
+    #: Capture the batches of rendering a screen
+    app = MockApplication.instance('android')
+    app.debug = False
+    batches = []
+    monkeypatch.setattr(MockApplication, 'dispatch_events',
+                        lambda self, data: batches.append(data.tobytes()))
+    views = []
+    with app.batch():
+        for i in range(1000):
+            tv = TextView(app)
+            tv.setText("Item {}".format(i))
+            tv.setTextSize(14)
+            tv.setAlpha(1.0)
+            views.append(tv)
+    app.force_update()
+    data = batches[-1]
+    assert decode_frame(bytes(encode_frame(data))) == data
+    assert bridge.loads(decode_frame(bytes(encode_frame(data))))
+
+    class EchoHandler(WebSocketHandler):
+        def on_message(self, message):
+            self.write_message(str(len(decode_frame(message))))
+
+    sockets = bind_sockets(0, '127.0.0.1')
+    port = sockets[0].getsockname()[1]
+    server = HTTPServer(Application([(r"/dev", EchoHandler)]))
+    server.add_sockets(sockets)
+    n = 50
+
+    @gen.coroutine
+    def run(compress):
+        conn = yield websocket_connect('ws://127.0.0.1:{}/dev'.format(port))
+        frame = data
+        t = time()
+        for i in range(n):
+            if compress:
+                frame = bytes(encode_frame(data))
+            conn.write_message(frame, True)
+            size = yield conn.read_message()
+            assert int(size) == len(data)
+        dt = time() - t
+        conn.close()
+        raise gen.Return((dt, len(frame)))
+
+    loop = IOLoop.current()
+    for compress in (False, True):
+        dt, size = loop.run_sync(lambda: run(compress))
+        print("{}: {} kbytes per batch on the wire, {:.1f} MB/s of "
+              "events, {:.2f}s at 10 Mbit/s".format(
+                "zlib" if compress else "raw", size/1000,
+                len(data)*n/dt/1e6, size*n*8/10e6))
+    server.stop()
+
+
+def test_event_loop_benchmark():
+    """ Compare the overhead of dispatching callbacks and resolving futures
+    of the asyncio event loop to the builtin one.
+    """
+    pytest.importorskip('asyncio')
+    from time import time
+    from enamlnative.core.loop import AsyncioEventLoop, BuiltinEventLoop
+    n = 10000
+    for impl in (BuiltinEventLoop, AsyncioEventLoop):
+        loop = impl()
+        calls = []
+
+        t = time()
+        for i in range(n):
+            loop.deferred_call(calls.append, i)
+        loop.deferred_call(loop.stop)
+        loop.start()
+        deferred = time() - t
+        assert len(calls) == n
+
+        t = time()
+        for i in range(n):
+            f = loop.create_future()
+            f.then(calls.append)
+            loop.set_future_result(f, i)
+        futures = time() - t
+        assert len(calls) == 2*n
+
+        print("{}: {:.2f}us per deferred call, {:.2f}us per future".format(
+            loop.name, deferred/n*1e6, futures/n*1e6))
+
+
+def test_init_plan_benchmark(monkeypatch):
+    """ Compare initializing a screen of 1000 widgets with the compiled
+    init plans to looking up the setters for each widget.
+    """
+    from time import time
+    from utils import load
+    from app import MockApplication
+    from enamlnative.core import bridge
+    from enamlnative.android import android_view
+    from enamlnative.android.android_view import AndroidView
+
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        flex_direction = "column"
+        Looper:
+            iterable = range(1000)
+            TextView:
+                text = "Item {}".format(loop_item)
+                text_size = 14
+                alpha = 0.5
+                width = 100
+                margin = (1, 1, 1, 1)
+    """)
+
+    def init_widget(self):
+        """ How the widgets were initialized before """
+        super(AndroidView, self).init_widget()
+        for k, v in self.get_declared_items():
+            handler = getattr(self, 'set_'+k, None)
+            if handler:
+                handler(v)
+
+    def render():
+        app = MockApplication.instance('android')
+        app.debug = False
+        app.bridge_metrics.enabled = True
+        app.view = ContentView()
+        t = time()
+        app.get_view()
+        dt = time() - t
+        app.force_update()
+        #: Deletes of ids that were collected depend on when the handle
+        #: table was swept
+        commands = app.bridge_metrics.commands
+        return dt, {k: v[0] for k, v in commands.items()
+                    if k != bridge.Command.DELETE}
+
+    after, events = render()
+    assert android_view.INIT_PLANS
+
+    monkeypatch.setattr(AndroidView, 'init_widget', init_widget)
+    before, expected = render()
+    assert events == expected
+    print("1000 widgets: {:.1f}ms before, {:.1f}ms with init plans".format(
+        before*1000, after*1000))
+
+
+def test_list_view_fling_benchmark():
+    """ Compare binding the rows of a fling one callback at a time to
+    binding the rows of each frame with one callback
+    """
+    from time import time
+    from utils import load
+    from enamlnative.core import bridge
+    from app import MockApplication
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        alias list_view
+        ListView: list_view:
+            items = list(range(10000))
+            Looper:
+                iterable = range(12)
+                ListItem:
+                    TextView:
+                        text << "Item {}".format(parent.item)
+    """)
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.view = ContentView()
+    app.get_view()
+    app.force_update()
+    adapter = app.view.list_view.proxy.adapter
+    frames = 300
+    rows = 8
+
+    def fling(batched, start):
+        t = time()
+        batches = app.bridge_metrics.batches
+        for frame in range(frames):
+            positions = [start + frame*rows + i for i in range(rows)]
+            indexes = [p % 12 for p in positions]
+            if batched:
+                events = [('event', (0, adapter.__id__, 'onRecycleViews', [
+                    ('int[]', indexes), ('int[]', positions)]))]
+            else:
+                events = [('event', (0, adapter.__id__, 'onRecycleView', [
+                    ('int', i), ('int', p)]))
+                    for i, p in zip(indexes, positions)]
+            for event in events:
+                app.process_events(bridge.dumps([event]))
+                app.force_update()
+        return time() - t, app.bridge_metrics.batches - batches
+
+    #: Each fling binds new positions so every frame changes the rows
+    before, before_batches = fling(False, 0)
+    after, after_batches = fling(True, frames*rows)
+    assert after_batches == frames
+    print("Fling of {} frames: {:.1f}ms with {} batches before, {:.1f}ms "
+          "with {} batches batched".format(frames, before*1000,
+                                           before_batches, after*1000,
+                                           after_batches))
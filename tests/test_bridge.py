@@ -0,0 +1,1207 @@
+'''
+Copyright (c) 2026, enaml-native contributors.
+
+Distributed under the terms of the MIT License.
+
+The full license is in the file LICENSE, distributed with this software.
+
+'''
+import sys
+import pytest
+from array import array
+from app import MockApplication
+
+if 'src' not in sys.path:
+    sys.path.append('src')
+
+
+def render_text_views(app, count, update=True):
+    """ Create a bunch of views and update them like a screen would """
+    from enamlnative.android.android_text_view import TextView
+    views = []
+    for i in range(count):
+        tv = TextView(app)
+        tv.setText("Item {}".format(i))
+        tv.setTextSize(14)
+        tv.setAlpha(1.0)
+        views.append(tv)
+    if update:
+        app.force_update()
+    return views
+
+
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def test_bridge_schema_size(count):
+    """ Compare the number of bytes sent with and without the schema """
+    app = MockApplication.instance('android')
+    app.debug = False
+    render_text_views(app, count)
+    full = app.bytes_sent
+
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.bridge_schema = True
+    render_text_views(app, count)
+    compact = app.bytes_sent
+
+    print("Schema with {} views: {} bytes vs {} bytes ({:.1f}%)".format(
+        count, compact, full, 100.0*compact/full))
+    if count > 1:
+        assert compact < full
+
+
+def test_bridge_schema_defined_once():
+    """ Definitions are only sent once per session """
+    app = MockApplication.instance('android')
+    app.bridge_schema = True
+    render_text_views(app, 10)
+
+    #: The class and the three methods used
+    assert len(app._bridge_definitions) == 4
+
+
+def test_bridge_batch():
+    """ Events sent during a batch transaction are sent together """
+    app = MockApplication.instance('android')
+    app.debug = False
+    with app.batch():
+        #: Keep the views so no deletes are queued
+        views = render_text_views(app, 10, update=False)
+        app._bridge_send()
+        views += render_text_views(app, 10, update=False)
+        app._bridge_send()
+        assert app.bridge_metrics.batches == 0
+    assert app.bridge_metrics.batches == 1
+    assert app.bridge_metrics.max_events == 80
+
+
+def test_bridge_frame_flush():
+    """ The frame policy uses the native frame clock and sends the pending
+    events on each frame
+    """
+    from time import time
+    from enamlnative.core.app import FlushPolicy, FrameFlushPolicy
+    app = MockApplication.instance('android')
+    app.debug = False
+    assert not FlushPolicy().frame_clock
+    app.flush_policy = FrameFlushPolicy()
+    assert app.flush_policy.frame_clock
+    views = render_text_views(app, 10, update=False)
+    assert app.bridge_metrics.batches == 0
+    app.on_frame(time())
+    assert app.bridge_metrics.batches == 1
+    assert app.flush_policy.last_frame
+
+
+def test_bridge_coalesce():
+    """ Only the last call of an idempotent setter is sent """
+    from enamlnative.android.android_text_view import TextView
+    app = MockApplication.instance('android')
+    app.debug = False
+    tv = TextView(app)
+    for i in range(10):
+        tv.setAlpha(i/10.0)
+    #: Calls that are not idempotent must see the previous value
+    tv.setGravity(1)
+    tv.setAlpha(1.0)
+    tv.setAlpha(0.5)
+    app.force_update()
+    assert app.bridge_metrics.events == 4
+
+
+def test_bridge_coalesce_references():
+    """ Setters of an object passed to another call are not replaced and
+    replaced setters are not counted in the metrics
+    """
+    from enamlnative.android.android_view_group import ViewGroup, Bridge
+    from enamlnative.core.bridge import encode
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.force_update()
+    app.bridge_metrics.reset()
+    app.bridge_metrics.enabled = True
+    parent = ViewGroup(app)
+    tv = ViewGroup(app)
+    tv.setAlpha(0.1)
+    parent.addView(tv, 0)
+    tv.setAlpha(0.2)
+    Bridge.addViews(parent, [encode(tv)], 1, [None])
+    tv.setAlpha(0.3)
+    tv.setAlpha(0.4)
+    app.force_update()
+    #: Two creates, addView, addViews and three setters
+    assert app.bridge_metrics.events == 7
+    metrics = app.bridge_metrics.summary()
+    assert sum(c['count'] for c in metrics['commands'].values()) == 7
+    assert metrics['calls']['android.view.ViewGroup.setAlpha']['count'] == 3
+
+
+def test_bridge_record_replay(tmpdir):
+    """ Record a session and replay the incoming events """
+    from enamlnative.core import bridge
+    from enamlnative.core.recorder import BridgeReplayer, load_recording
+    from enamlnative.android.android_view import View
+    path = str(tmpdir.join('session.rec'))
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.start_recording(path)
+    view = View(app)
+    clicks = []
+    view.onClick.connect(lambda v: clicks.append(v))
+    app.force_update()
+    app.process_events(bridge.dumps([
+        ('event', (0, view.__id__, 'onClick', [('int', 1)]))
+    ]))
+    app.stop_recording()
+    assert len(load_recording(path)) == 2
+    assert clicks == [1]
+
+    replayer = BridgeReplayer(app=app, path=path)
+    replayer.replay()
+    assert clicks == [1, 1]
+    assert replayer.stats()['payloads'] == 1
+
+
+def test_bridge_metrics():
+    """ Per command and per call metrics are recorded when enabled """
+    from enamlnative.core import bridge
+    from enamlnative.android.android_activity import Activity
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.bridge_metrics.enabled = True
+    views = render_text_views(app, 10)
+    metrics = app.bridge_metrics.summary()
+    assert metrics['calls']['android.widget.TextView.setText']['count'] == 10
+    assert metrics['commands']['c']['count'] == 10
+    assert metrics['events'] == 40
+    assert metrics['batches'] == 1
+    assert metrics['bytes'] == app.bytes_sent
+    assert sum(c['count'] for c in metrics['commands'].values()) == 40
+
+    #: The time until the result of a call is returned is recorded
+    result = Activity(__id__=-1).getWindow()
+    app.force_update()
+    app.process_events(bridge.dumps([
+        ('event', (0, result.__id__, 'set_result', [('int', 1)]))]))
+    assert result.done()
+    results = app.bridge_metrics.summary()['results']
+    assert [r['count'] for r in results.values()] == [1]
+
+    app.bridge_metrics.reset()
+    metrics = app.bridge_metrics.summary()
+    assert metrics['calls'] == {}
+    assert metrics['results'] == {}
+    assert metrics['events'] == 0
+
+
+def test_bridge_pipelining():
+    """ Calls on an object bound to a pending result are sent without
+    waiting for the result to be returned
+    """
+    from enamlnative.android.android_activity import Activity
+    from enamlnative.android.android_window import Window
+    app = MockApplication.instance('android')
+    app.debug = False
+    activity = Activity(__id__=-1)
+    result = activity.getWindow()
+    window = Window(__id__=result)
+    window.addFlags(Window.FLAG_KEEP_SCREEN_ON)
+    window.clearFlags(Window.FLAG_KEEP_SCREEN_ON)
+    app.force_update()
+    assert not result.done()
+    assert window.__id__ == result.__id__
+    assert app.bridge_metrics.batches == 1
+    assert app.bridge_metrics.events == 3
+
+
+def test_bridge_handle_table():
+    """ Released ids are reused with a new generation so stale ids are
+    detected
+    """
+    from enamlnative.core import bridge
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    view = View(app)
+    stale = view.__id__
+    assert bridge.CACHE[stale] is view
+    del view
+    app.force_update()
+    view = View(app)
+    assert view.__id__ != stale
+    assert bridge.CACHE.get(stale) is None
+    with pytest.raises(bridge.BridgeReferenceError):
+        bridge.get_handler(stale, 'onClick')
+
+
+def test_bridge_handle_table_reuse():
+    """ Ids stay small when screens of objects are created and destroyed """
+    from enamlnative.core import bridge
+    from enamlnative.core.bridge import HandleTable
+
+    class Obj(object):
+        __slots__ = ('__id__', '__weakref__')
+
+    table = HandleTable()
+    for i in range(20):
+        live = []
+        for j in range(100):
+            o = Obj()
+            o.__id__ = table.allocate(o)
+            live.append(o)
+        assert all(table.get(o.__id__) is o for o in live)
+        for o in live:
+            table.release(o)
+    slots = set(o.__id__ >> bridge.GENERATION_BITS for o in live)
+    assert max(slots) <= 100
+
+
+def test_bridge_handle_table_generations():
+    """ Slots are reused oldest first and a stale id does not alias a new
+    object until its slot was reused for every generation
+    """
+    from enamlnative.core import bridge
+    from enamlnative.core.bridge import HandleTable
+
+    class Obj(object):
+        __slots__ = ('__id__', '__weakref__')
+
+    table = HandleTable()
+    a, b = Obj(), Obj()
+    a.__id__ = table.allocate(a)
+    b.__id__ = table.allocate(b)
+    table.release(a)
+    table.release(b)
+    slots = [table.allocate(Obj()) >> bridge.GENERATION_BITS
+             for i in range(2)]
+    assert slots == [a.__id__ >> bridge.GENERATION_BITS,
+                     b.__id__ >> bridge.GENERATION_BITS]
+
+    table = HandleTable()
+    o = Obj()
+    stale = o.__id__ = table.allocate(o)
+    for i in range(bridge.GENERATION_MASK):
+        table.release(o)
+        o = Obj()
+        o.__id__ = table.allocate(o)
+        assert o.__id__ != stale
+        assert table.get(stale) is None
+
+
+def test_bridge_handle_table_collect():
+    """ Ids of collected objects such as futures are deleted on the native
+    side before they're reused
+    """
+    import gc
+    from enamlnative.core import bridge
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.force_update()
+    f = app.create_future()
+    ptr = f.__id__
+    del f
+    gc.collect()
+    bridge.CACHE.sweep()
+    assert ptr in app._bridge_deleted
+    assert ptr not in [o.__id__ for o in [app.create_future()
+                                          for i in range(10)]]
+    app.force_update()
+    assert not app._bridge_deleted
+
+
+def test_bridge_bulk_delete():
+    """ Destroyed objects are deleted with a single event in the next batch
+    and their ids are not reused until then
+    """
+    from enamlnative.core import bridge
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.bridge_bulk_delete = True
+    with app.batch():
+        views = [View(app) for i in range(100)]
+    ids = set(v.__id__ for v in views)
+    app.force_update()
+    assert app.bridge_metrics.events == 100
+
+    del views
+    assert set(app._bridge_deleted) == ids
+    view = View(app)
+    assert view.__id__ not in ids
+    app.force_update()
+    assert app.bridge_metrics.batches == 2
+    assert app.bridge_metrics.events == 102
+    assert not app._bridge_deleted
+
+    #: Now the ids can be reused
+    view = View(app)
+    slots = set(i >> bridge.GENERATION_BITS for i in ids)
+    assert view.__id__ >> bridge.GENERATION_BITS in slots
+
+
+def test_bridge_delete_scheduled():
+    """ Deleting an object when nothing else is queued schedules a send """
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.bridge_bulk_delete = True
+
+    def run_loop():
+        app.deferred_call(app.loop.stop)
+        app.loop.start()
+
+    view = View(app)
+    run_loop()
+    assert app.bridge_metrics.batches == 1
+    del view
+    assert app._bridge_deleted
+    run_loop()
+    assert not app._bridge_deleted
+    assert app.bridge_metrics.batches == 2
+
+
+def test_bridge_pack_args():
+    """ Compiled packers pack the arguments like the bridge always has """
+    from enamlnative.android.bridge import compile_packer
+    from enamlnative.android.android_view import View
+    from enamlnative.core.bridge import ExtType
+    app = MockApplication.instance('android')
+    packer = compile_packer('setPadding_', ('int', 'int', 'int', 'int'))
+    assert packer((1, 2, 3, 4)) == ('setPadding', [
+        ('int', 1), ('int', 2), ('int', 3), ('int', 4)])
+    packer = compile_packer('format', ('java.lang.String',
+                                       'java.lang.Object...'))
+    assert packer(('%s %s', 'a', 'b')) == ('format', [
+        ('java.lang.String', '%s %s'), ('java.lang.Object', 'a'),
+        ('java.lang.Object', 'b')])
+    packer = compile_packer('addView', ('android.view.View',))
+    ref = packer((View(app),))[1][0][1]
+    assert ref.code == ExtType.REF
+    with pytest.raises(ValueError):
+        compile_packer('setText', ('java.lang.CharSequence',))(())
+
+
+def test_bridge_bound_methods():
+    """ Bound methods work on temporary objects and don't keep the object
+    alive once they are released
+    """
+    import weakref
+    from enamlnative.android.android_activity import Activity
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    assert Activity(__id__=-1).getWindow() is not None
+    app.force_update()
+    events = app.bridge_metrics.events
+    view = View(app)
+
+    with view.setAlpha.suppressed():
+        view.setAlpha(0.5)
+    app.force_update()
+    assert app.bridge_metrics.events == events + 1
+
+    clicks = []
+    view.onClick.connect(lambda v: clicks.append(v))
+    view.onClick(True)
+    assert clicks == [True]
+
+    ref = weakref.ref(view)
+    del view
+    assert ref() is None
+
+
+def test_bridge_typed_arrays():
+    """ Typed arrays are sent as raw buffers and decoded as memoryviews """
+    from array import array
+    from enamlnative.core import bridge
+    from enamlnative.android.android_view import View
+    MockApplication.instance('android')
+    data = array('f', [1.0, 2.5, -3.0])
+    packed = bridge.dumps([bridge.encode(data)])
+    assert len(packed) < len(bridge.dumps([data.tolist()]))
+    result = bridge.loads(packed)[0]
+    assert result.tolist() == data.tolist()
+
+    if sys.version_info[0] > 2:
+        grid = memoryview(array('d', range(6))).cast('B').cast('d', [2, 3])
+        result = bridge.loads(bridge.dumps([bridge.encode(grid)]))[0]
+        assert result.shape == (2, 3)
+        assert result.tolist() == grid.tolist()
+        assert bridge.array_to_tuple(result) == ((0, 1, 2), (3, 4, 5))
+
+    #: Received as callback arguments as tuples unless buffers are requested
+    app = MockApplication.instance('android')
+    app.debug = False
+    view = View(app)
+    received = []
+    view.onClick.connect(lambda v: received.append(v))
+    app.process_events(bridge.dumps([
+        ('event', (0, view.__id__, 'onClick',
+                   [('float[]', bridge.encode(data))]))
+    ]))
+    assert received[0] == tuple(data.tolist())
+
+    #: Including arrays in the dicts of packed objects
+    from enamlnative.android.android_sensors import Sensor
+    sensor = Sensor(app)
+    events = []
+    sensor.onSensorChanged.connect(events.append)
+    app.process_events(bridge.dumps([
+        ('event', (0, sensor.__id__, 'onSensorChanged',
+                   [('android.hardware.SensorEvent',
+                     {'acc': 3, 'data': bridge.encode(data),
+                      'samples': [bridge.encode(data)]})]))
+    ]))
+    assert events == [{'acc': 3, 'data': tuple(data.tolist()),
+                       'samples': (tuple(data.tolist()),)}]
+
+    from enamlnative.android.android_list_view import BridgedRecyclerAdapter
+    adapter = BridgedRecyclerAdapter(app)
+    adapter.onRecycleViews.connect(lambda *v: received.append(v))
+    ids = array('i', [1, 2])
+    app.process_events(bridge.dumps([
+        ('event', (0, adapter.__id__, 'onRecycleViews',
+                   [('int[]', bridge.encode(ids)),
+                    ('int[]', bridge.encode(ids))]))
+    ]))
+    assert received[1][0].__class__ in bridge.DECODED_ARRAY_TYPES
+    assert received[1][0].tolist() == [1, 2]
+
+
+def test_bridge_typed_arrays_ios():
+    """ The iOS bridge can't decode typed arrays so they're sent as they
+    were before
+    """
+    from array import array
+    from enamlnative.core import bridge
+    data = array('i', [1, 2, 3])
+    MockApplication.instance('ios')
+    try:
+        assert bridge.encode(data) == [1, 2, 3]
+        view = memoryview(b'abc')
+        assert bridge.encode(view) is view
+        assert bridge.loads(bridge.dumps([bridge.encode(data)])) == \
+            ((1, 2, 3),)
+    finally:
+        MockApplication.instance('android')
+    assert bridge.encode(data).code == bridge.ExtType.ARRAY
+
+
+def test_bridge_handler_cache(monkeypatch):
+    """ Events are dispatched as they are decoded and the handlers are
+    cached until the object is destroyed
+    """
+    from enamlnative.core import bridge
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    view = View(app)
+    clicks = []
+    view.onClick.connect(clicks.append)
+    event = ('event', (0, view.__id__, 'onClick', [('boolean', True)]))
+    app.process_events(bridge.dumps([event] * 3))
+    assert clicks == [True] * 3
+    assert 'onClick' in app._bridge_handlers[view.__id__][1]
+
+    #: Cached handlers are called without binding them to the object
+    bound = []
+    init = bridge.BoundBridgeMethod.__init__
+    monkeypatch.setattr(bridge.BoundBridgeMethod, '__init__',
+                        lambda self, *args: bound.append(init(self, *args)))
+    app.process_events(bridge.dumps([event] * 3))
+    assert clicks == [True] * 6
+    assert not bound
+
+    ptr = view.__id__
+    del view
+    app.force_update()
+    assert ptr not in app._bridge_handlers
+
+
+def test_bridge_priority_lanes(monkeypatch):
+    """ Low priority events are sent after high priority ones within the
+    lane budget and events on the same object stay in order
+    """
+    from enamlnative.core import bridge
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.flush_policy.lane_budget = 1
+    batches = []
+    monkeypatch.setattr(MockApplication, 'dispatch_events',
+                        lambda self, data: batches.append([
+                            args[0] for cmd, args in bridge.loads(
+                                data.tobytes())
+                            if cmd == bridge.Command.METHOD]))
+
+    views = [View(app) for i in range(3)]
+    app.force_update()
+    with app.priority(bridge.Priority.LOW):
+        for v in views:
+            v.setAlpha(0.1)
+            v.setAlpha(0.2)
+    views[0].setX(1.0)
+    app.force_update()
+
+    #: The deferred call on the object is sent first, then one more within
+    #: the budget
+    ptrs = [v.__id__ for v in views]
+    assert batches[1] == [ptrs[0], ptrs[0], ptrs[1]]
+
+    #: The rest is sent with the next batch
+    app.force_update()
+    assert batches[2] == [ptrs[2]]
+    assert not app._bridge_has_deferred()
+
+
+def test_bridge_priority_lanes_delete(monkeypatch):
+    """ Deferred events that pass an object as an argument are sent before
+    the object is deleted
+    """
+    import gc
+    from enamlnative.core import bridge
+    from enamlnative.android.android_view_group import ViewGroup
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.flush_policy.lane_budget = 1
+    events = []
+    monkeypatch.setattr(MockApplication, 'dispatch_events',
+                        lambda self, data: events.extend(
+                            bridge.loads(data.tobytes())))
+
+    v = ViewGroup(app)
+    app.force_update()
+    with app.priority(bridge.Priority.LOW):
+        for i in range(3):
+            v.setAlpha(0.1)
+        w = View(app)
+        ptr = w.__id__
+        v.addView(w, 0)
+    del w
+    gc.collect()
+    while app._bridge_has_pending():
+        app.force_update()
+
+    adds = [i for i, (cmd, args) in enumerate(events)
+            if cmd == bridge.Command.METHOD and
+            ptr in bridge.ref_ids(args[-1])]
+    deletes = [i for i, (cmd, args) in enumerate(events)
+               if cmd in (bridge.Command.DELETE, bridge.Command.BULK_DELETE)]
+    assert adds and deletes
+    assert adds[-1] < deletes[0]
+
+
+def test_bridge_backpressure():
+    """ The queue is sent early once it's over the thresholds and the
+    drained future resolves once everything has been sent
+    """
+    from enamlnative.android.android_view import View
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.bridge_max_events = 10
+    views = [View(app) for i in range(35)]
+    assert app.bridge_metrics.batches == 3
+    assert app.bridge_metrics.max_events == 10
+
+    f = app.drained()
+    assert not f.done()
+    app.force_update()
+    assert f.done() and f.result()
+
+    app.bridge_max_events = 0
+    app.bridge_max_bytes = 100
+    app.bridge_metrics.max_bytes = 0
+    for v in views:
+        v.setAlpha(0.5)
+    assert app.bridge_metrics.max_bytes < 200
+
+
+def test_bridge_drained():
+    """ The drained future waits for callbacks that are about to send events
+    and resolves on the next send even if it has nothing to send
+    """
+    app = MockApplication.instance('android')
+    app.debug = False
+
+    def run_loop():
+        app.deferred_call(app.loop.stop)
+        app.loop.start()
+
+    app.force_update()
+    run_loop()
+    app.before_send(lambda: None)
+    f = app.drained()
+    assert not f.done()
+    run_loop()
+    assert f.done() and f.result()
+    assert app.bridge_metrics.batches == 0
+
+    #: Nothing queued
+    assert app.drained().done()
+
+
+def test_bridge_remote_framing(monkeypatch):
+    """ Remote sessions offer compressed framing and load the view once the
+    other side replies or the offer times out
+    """
+    import json
+    from enamlnative.core.dev import (
+        DevServerSession, encode_frame, decode_frame
+    )
+    from enamlnative.core import bridge
+    app = MockApplication.instance('android')
+    app.debug = False
+    batches = []
+    messages = []
+    loaded = []
+    app.load_view = lambda app: loaded.append(app)
+    monkeypatch.setattr(MockApplication, 'dispatch_events',
+                        lambda self, data: batches.append(data.tobytes()))
+
+    #: Frames round trip
+    with app.batch():
+        views = render_text_views(app, 100, update=False)
+    app.force_update()
+    data = batches.pop()
+    assert len(encode_frame(data)) < len(data)
+    assert decode_frame(bytes(encode_frame(data))) == data
+    assert bridge.loads(decode_frame(bytes(encode_frame(data))))
+
+    try:
+        session = DevServerSession(app=app, host='remote')
+        session.start_framing(messages.append)
+        assert json.loads(messages[0])['type'] == 'framing'
+        assert not loaded
+        session.handle_framing(json.dumps({
+            'type': 'framing', 'codecs': json.loads(messages[0])['codecs']}))
+        assert loaded == [app]
+        assert session.codec
+
+        #: The timeout does not load it again
+        session.load_remote_view()
+        assert loaded == [app]
+
+        #: No reply, the view is loaded without compression on timeout
+        session.codec = ''
+        session.framing_timeout = 1
+        session.start_framing(messages.append)
+        app.timed_call(50, app.loop.stop)
+        app.loop.start()
+        assert loaded == [app, app]
+        assert not session.codec
+
+        #: Without compression no codecs are offered and it doesn't wait
+        session.compression = False
+        session.framing_timeout = 60000
+        session.start_framing(messages.append)
+        assert json.loads(messages[-1])['codecs'] == []
+        assert loaded == [app, app, app]
+        assert not session.codec
+    finally:
+        DevServerSession._instance = None
+
+
+def test_event_loop():
+    """ The builtin event loop is used unless asyncio is requested and
+    the asyncio loop runs callbacks and resolves futures like it
+    """
+    from enamlnative.core.loop import EventLoop, BuiltinEventLoop
+    impls = [BuiltinEventLoop]
+    try:
+        import asyncio
+        from enamlnative.core.loop import AsyncioEventLoop
+        impls.append(AsyncioEventLoop)
+    except ImportError:
+        asyncio = None
+    assert EventLoop.default().name != 'asyncio'
+
+    for impl in impls:
+        loop = impl()
+        if asyncio is not None and impl is AsyncioEventLoop:
+            assert loop.loop is asyncio.get_event_loop()
+            assert not loop.loop.is_closed()
+        calls = []
+        for i in range(3):
+            loop.deferred_call(calls.append, i)
+        loop.deferred_call(loop.stop)
+        loop.start()
+        assert calls == [0, 1, 2]
+
+        f = loop.create_future()
+        f.then(calls.append)
+        loop.set_future_result(f, 3)
+        loop.deferred_call(loop.stop)
+        loop.start()
+        assert calls == [0, 1, 2, 3]
+        assert f.result() == 3
+
+
+def test_bridge_interned_objects():
+    """ Identical value-like objects are created once and deleted once
+    they're no longer used
+    """
+    from enamlnative.core import bridge
+    from enamlnative.android.android_view_group import MarginLayoutParams
+    app = MockApplication.instance('android')
+    app.debug = False
+    table = bridge.InternTable()
+    setup = (('setMargins', (1, 2, 3, 4)),)
+    params = [table.acquire(MarginLayoutParams, (10, -2), setup)
+              for i in range(100)]
+    assert len(set(id(p) for p in params)) == 1
+    other = table.acquire(MarginLayoutParams, (10, -1), setup)
+    assert other is not params[0]
+    app.force_update()
+    assert app.bridge_metrics.events == 4
+
+    #: Removed once the last user releases it
+    ptr = params[0].__id__
+    for p in params:
+        table.retain(p)
+    for p in params:
+        table.release(p)
+    assert len(table) == 1
+    del params, p
+    assert ptr in app._bridge_deleted
+
+    #: Shared objects are copied before they're modified
+    assert table.detach(other) is not other
+    assert table.detach(other).__class__ is MarginLayoutParams
+    assert table.detach(app) is app
+
+
+def test_shared_layout_params():
+    """ Children of a Flexbox with the same layout share their params and
+    a child is given its own once its layout changes
+    """
+    from utils import load
+    from enamlnative.core import bridge
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        Looper:
+            iterable = range(10)
+            TextView:
+                text = "Item {}".format(loop_item)
+                margin = (1, 1, 1, 1)
+    """)
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.view = ContentView()
+    app.get_view()
+    app.force_update()
+    children = [c.proxy for c in app.view.children if hasattr(c, 'proxy')]
+    params = children[0].layout_params
+    assert all(c.layout_params is params for c in children)
+
+    children[0].declaration.margin = (2, 2, 2, 2)
+    app.force_update()
+    assert children[0].layout_params is not params
+    assert children[1].layout_params is params
+    app.view.destroy()
+    assert not bridge.INTERNED.owners.get(id(params))
+
+
+def test_init_plans(monkeypatch):
+    """ Widgets initialized with the compiled init plans send the same
+    events as looking up the setters for each widget
+    """
+    from enamlnative.core import bridge
+    from utils import load
+    from enamlnative.android import android_view
+    from enamlnative.android.android_view import AndroidView
+    from enamlnative.android.android_text_view import AndroidTextView
+
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        flex_direction = "column"
+        Looper:
+            iterable = range(10)
+            TextView:
+                text = "Item {}".format(loop_item)
+                text_size = 14
+                alpha = 0.5
+                width = 100
+                margin = (1, 1, 1, 1)
+    """)
+
+    def init_widget(self):
+        """ How the widgets were initialized before """
+        super(AndroidView, self).init_widget()
+        for k, v in self.get_declared_items():
+            handler = getattr(self, 'set_'+k, None)
+            if handler:
+                handler(v)
+
+    def render():
+        app = MockApplication.instance('android')
+        app.debug = False
+        events = []
+        monkeypatch.setattr(MockApplication, 'dispatch_events',
+                            lambda self, data: events.extend(
+                                bridge.loads(data.tobytes())))
+        app.view = ContentView()
+        app.get_view()
+        app.force_update()
+        #: Release the shared layout params so the next render creates them
+        app.view.destroy()
+        #: Object ids differ between the renders
+        return [(cmd, args[1:-1], tuple(
+                 (sig, 'ref' if bridge.ref_ids([(sig, v)]) else v)
+                 for sig, v in args[-1]))
+                for cmd, args in events
+                if cmd in (bridge.Command.CREATE, bridge.Command.METHOD)]
+
+    android_view.INIT_PLANS.clear()
+    events = render()
+    assert len(events) > 40
+    assert [k for k in android_view.INIT_PLANS if k[0] is AndroidTextView]
+
+    #: The plans don't keep the engines of the templates alive
+    from enaml.core.expression_engine import ExpressionEngine
+    assert not [k for k in android_view.INIT_PLANS
+                if isinstance(k[1], ExpressionEngine)]
+
+    monkeypatch.setattr(AndroidView, 'init_widget', init_widget)
+    expected = render()
+    assert events == expected
+
+
+def test_layout_transactions(monkeypatch):
+    """ Layout updates made before the next batch are applied once """
+    from utils import load
+    ContentView = load("""
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        alias tv
+        TextView: tv:
+            text = "Hello"
+    """)
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.view = ContentView()
+    app.get_view()
+    app.force_update()
+    proxy = app.view.tv.proxy
+    applied = []
+    cls = type(proxy.parent())
+    apply_layout = cls.apply_layout
+
+    def record(self, child, layout):
+        applied.append(dict(layout))
+        apply_layout(self, child, layout)
+    monkeypatch.setattr(cls, 'apply_layout', record)
+
+    with app.batch():
+        proxy.set_x(1)
+        proxy.set_y(2)
+        proxy.set_padding((1, 2, 3, 4))
+        proxy.set_x(3)
+    assert not applied
+
+    #: Applied by the next send
+    app.deferred_call(app.loop.stop)
+    app.loop.start()
+    assert applied == [{'x': 3, 'y': 2, 'padding': (1, 2, 3, 4)}]
+
+
+@pytest.mark.parametrize("change", [
+    lambda items: sorted(items, key=lambda item: -item['id']),
+    lambda items: items[::-1],
+    lambda items: items[:3] + items[4:],
+    lambda items: [{'id': 100}] + items[5:] + items[:5],
+    lambda items: [dict(item) for item in items],
+])
+def test_list_view_diff(change):
+    """ Applying the diff of the items gives the new items """
+    from enamlnative.android.android_list_view import diff_items
+    old = [{'id': i} for i in range(20)]
+    new = change(old)
+    ops = diff_items(old, new, key=lambda item: item['id'])
+    rows = list(old)
+    for op, a, b in ops:
+        if op == 'remove':
+            del rows[a:a+b]
+        elif op == 'move':
+            rows.insert(b, rows.pop(a))
+        elif op == 'insert':
+            rows[a:a] = new[a:a+b]
+        else:
+            rows[a:a+b] = new[a:a+b]
+    assert rows == new
+    #: Items that did not change are not updated
+    if new == old:
+        assert not ops
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_list_view_recycle_views(monkeypatch, batched):
+    """ The rows are bound one callback at a time unless batch binding is
+    enabled, then the rows bound during a frame are updated with one
+    callback and sent in one batch
+    """
+    from utils import load
+    from enamlnative.core import bridge
+    from enamlnative.android.android_list_view import BridgedRecyclerAdapter
+    calls = []
+    monkeypatch.setattr(BridgedRecyclerAdapter, 'setBatchBinding',
+                        lambda self, enabled: calls.append(enabled))
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        alias list_view
+        ListView: list_view:
+            items = list(range(100))
+            batch_binding = {}
+            Looper:
+                iterable = range(4)
+                ListItem:
+                    TextView:
+                        text << "Item {{}}".format(parent.item)
+    """.format(batched))
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.view = ContentView()
+    app.get_view()
+    app.force_update()
+    assert calls == ([True] if batched else [])
+    proxy = app.view.list_view.proxy
+    adapter = proxy.adapter
+    batches = app.bridge_metrics.batches
+
+    if batched:
+        #: The view at index 0 is bound twice, only the last one is shown
+        events = [('event', (0, adapter.__id__, 'onRecycleViews', [
+            ('int[]', bridge.encode(array('i', [0, 1, 0]))),
+            ('int[]', bridge.encode(array('i', [10, 11, 12])))]))]
+    else:
+        events = [('event', (0, adapter.__id__, 'onRecycleView', [
+            ('int', i), ('int', p)])) for i, p in ((1, 11), (0, 12))]
+    app.process_events(bridge.dumps(events))
+    app.force_update()
+    assert app.bridge_metrics.batches == batches + 1
+    items = proxy.list_items
+    assert proxy.item_mapping[12] is items[0]
+    assert proxy.item_mapping[11] is items[1]
+    assert [c.text for c in items[0].declaration.children] == ["Item 12"]
+    assert [c.text for c in items[1].declaration.children] == ["Item 11"]
+
+    #: It can be toggled
+    app.view.list_view.batch_binding = not batched
+    assert calls[-1] == (not batched)
+
+
+def test_list_view_data_source():
+    """ Rows of a data source are loaded by page as they are displayed and
+    show the placeholder until the page arrives
+    """
+    from utils import load
+    from enamlnative.widgets.api import ListDataSource
+    app = MockApplication.instance('android')
+    pages = {}
+
+    class Catalog(ListDataSource):
+        def __len__(self):
+            return 500000
+
+        def fetch(self, page):
+            f = pages[page] = app.create_future()
+            return f
+
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        attr source
+        alias list_view
+        ListView: list_view:
+            data_source = source
+            Looper:
+                iterable = range(4)
+                ListItem:
+                    TextView:
+                        text = "{}".format(parent.item)
+    """)
+    source = Catalog(page_size=10, cache_size=2, placeholder='Loading')
+    app.view = ContentView(source=source)
+    app.get_view()
+    app.force_update()
+    proxy = app.view.list_view.proxy
+    list_items = [li.declaration for li in proxy.list_items]
+    assert [li.item for li in list_items] == ['Loading'] * 4
+    assert sorted(pages) == [0, 1]
+
+    pages[0].set_result(['Row {}'.format(i) for i in range(10)])
+    pages[1].set_result(['Row {}'.format(i) for i in range(10, 20)])
+    assert [li.item for li in list_items] == ['Row 0', 'Row 1', 'Row 2',
+                                              'Row 3']
+
+    #: Scrolling far away loads new pages and evicts old ones
+    proxy.on_recycle_view(0, 250000)
+    assert list_items[0].item == 'Loading'
+    pages[25000].set_result(['Far {}'.format(i) for i in range(10)])
+    assert list_items[0].item == 'Far 0'
+    assert 0 not in source._pages
+
+    #: Invalidation drops the cache
+    source.invalidate()
+    assert not source._pages
+
+
+def test_list_view_view_types(monkeypatch):
+    """ The adapter is told the view type of each item and of each view so
+    rows are only recycled into views of the same type
+    """
+    from utils import load
+    from enamlnative.android.android_list_view import BridgedRecyclerAdapter
+    calls = {}
+
+    def spy(name):
+        def method(self, *args):
+            calls[name] = [list(a) if hasattr(a, 'tolist') else a
+                           for a in args]
+        return method
+
+    for name in ('setItemViewTypes', 'setRecycleViewTypes',
+                 'setMaxRecycledViews'):
+        monkeypatch.setattr(BridgedRecyclerAdapter, name, spy(name))
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        alias list_view
+        ListView: list_view:
+            items = ['Header', 1, 2, 3, 'Footer']
+            view_type = lambda item: 0 if isinstance(item, int) else 1
+            pool_sizes = {1: 2}
+            Looper:
+                iterable = range(4)
+                ListItem:
+                    TextView:
+                        text = "{}".format(parent.item)
+            ListItem:
+                view_type = 1
+                TextView:
+                    text = "{}".format(parent.item)
+    """)
+    app = MockApplication.instance('android')
+    app.view = ContentView()
+    app.get_view()
+    assert calls['setItemViewTypes'] == [[1, 0, 0, 0, 1]]
+    assert calls['setRecycleViewTypes'] == [[0, 0, 0, 0, 1]]
+    assert calls['setMaxRecycledViews'] == [1, 2]
+
+    #: Types follow changes to the items
+    app.view.list_view.items.insert(1, 'Ad')
+    assert calls['setItemViewTypes'] == [[1, 1, 0, 0, 0, 1]]
+
+
+def test_view_group_bulk_add(monkeypatch):
+    """ Children added during a batch are inserted with one call per run
+    of adjacent children
+    """
+    from utils import load
+    from enamlnative.android.android_view_group import AndroidViewGroup
+    calls = []
+    monkeypatch.setattr(
+        AndroidViewGroup, 'add_views',
+        lambda self, start, views, params: calls.append(
+            (start, len(views))))
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        attr rows = list(range(3))
+        TextView:
+            text = "Header"
+        Looper:
+            iterable << rows
+            TextView:
+                text = "{}".format(loop_item)
+        TextView:
+            text = "Footer"
+    """)
+    app = MockApplication.instance('android')
+    app.view = ContentView()
+    app.get_view()
+    app.force_update()
+    assert calls == [(0, 5)]
+
+    #: Hundreds of new rows are inserted before the footer in one call
+    del calls[:]
+    with app.batch():
+        app.view.rows = list(range(300))
+    app.force_update()
+    assert len(calls) == 1
+    start, count = calls[0]
+    assert start + count == 301
+
+
+def test_view_group_child_index(monkeypatch):
+    """ The index of each child's view is kept up to date as children are
+    added, removed, and moved and a move is one native call
+    """
+    from utils import load
+    from enamlnative.android.android_view_group import Bridge
+    moves = []
+    monkeypatch.setattr(Bridge, 'moveView', staticmethod(
+        lambda parent, view, index: moves.append((view, index))))
+    ContentView = load("""
+    from enaml.core.api import Looper
+    from enamlnative.widgets.api import *
+
+    enamldef ContentView(Flexbox):
+        attr rows = list(range(3))
+        TextView:
+            text = "Header"
+        Looper:
+            iterable << rows
+            TextView:
+                text = "{}".format(loop_item)
+        TextView:
+            text = "Footer"
+    """)
+    app = MockApplication.instance('android')
+    app.debug = False
+    app.view = ContentView()
+    app.get_view()
+    app.force_update()
+    proxy = app.view.proxy
+
+    def texts():
+        index = proxy._child_index
+        assert [index[c] for c in proxy._child_views] == \
+            list(range(len(index)))
+        return [c.declaration.text for c in proxy._child_views]
+
+    assert texts() == ['Header', '0', '1', '2', 'Footer']
+
+    with app.batch():
+        app.view.rows = [0, 1, 2, 3, 4]
+    app.force_update()
+    assert texts() == ['Header', '0', '1', '2', '3', '4', 'Footer']
+
+    header = app.view.children[0]
+    header.destroy()
+    assert texts() == ['0', '1', '2', '3', '4', 'Footer']
+
+    #: Move the footer to the front and the first row to the end
+    footer = app.view.children[-1]
+    row = proxy._child_views[0].declaration
+    for before, child in ((0, footer), (None, row)):
+        app.view.insert_children(before, [child])
+        proxy.child_moved(child.proxy)
+    assert texts() == ['Footer', '1', '2', '3', '4', '0']
+    assert moves == [(footer.proxy.widget, 0), (row.proxy.widget, 5)]